@@ -0,0 +1,45 @@
+# Sistema de registro de vehículos: validación por expresiones regulares,
+# almacenamiento de registros e interfaz gráfica.
+#
+# Los nombres públicos se cargan al usarlos por primera vez, así que
+# `import Aplicacion_regex` no importa nada más, y la validación y el
+# almacenamiento se pueden usar sin tkinter ni pantalla: solo
+# RegistroVehiculoApp, VisualizadorRegistros, VentanaMetricas y
+# VentanaEstadisticas cargan la interfaz gráfica.
+from importlib import import_module
+
+# Nombre público -> módulo que lo define
+_PEREZOSOS = {
+    "CAMPOS": "validacion",
+    "REGLAS": "validacion",
+    "Validacion": "validacion",
+    "Vehiculo": "vehiculo",
+    "EstadisticasRegistros": "estadisticas",
+    "Repositorio": "repositorio",
+    "RegistroDuplicadoError": "repositorio",
+    "abrir_repositorio": "repositorio",
+    "AlmacenParticionado": "almacen_particionado",
+    "validar_archivo": "bulk",
+    "exportar": "exportacion",
+    "importar": "importacion",
+    "ServidorValidacion": "servidor",
+    "RegistroVehiculoApp": "registro_vehiculo",
+    "VisualizadorRegistros": "visualizador_registros",
+    "VentanaMetricas": "ventana_metricas",
+    "VentanaEstadisticas": "ventana_estadisticas",
+}
+
+__all__ = sorted(_PEREZOSOS)
+
+
+def __getattr__(nombre):
+    modulo = _PEREZOSOS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(f".{modulo}", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PEREZOSOS))
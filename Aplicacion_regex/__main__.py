@@ -0,0 +1,60 @@
+import sys
+from importlib import import_module
+
+# Comando -> (módulo, argumentos que se anteponen). Cada módulo se importa
+# solo al ejecutar su comando: los comandos sin interfaz gráfica nunca
+# cargan tkinter
+COMANDOS = {
+    "validar": ("bulk", ["validar"]),
+    "revalidar": ("bulk", ["revalidar"]),
+    "exportar": ("exportacion", []),
+    "importar": ("importacion", []),
+    "particionar": ("almacen_particionado", []),
+    "servidor": ("servidor", []),
+    "benchmark": ("benchmark", []),
+    "metricas": ("metricas", []),
+    "datos": ("datos_sinteticos", []),
+    "gui": ("registro_vehiculo", None),
+}
+
+AYUDA = """uso: python -m Aplicacion_regex <comando> [argumentos]
+
+comandos:
+  validar     valida un archivo CSV, JSONL o JSON y reporta los errores por fila
+  revalidar   vuelve a validar los registros guardados en un almacén
+  exportar    exporta los registros a CSV, JSONL o formato columnar
+  importar    importa registros desde CSV, JSONL o JSON, validados y por lotes
+  particionar copia un almacén a un directorio particionado por placa
+  servidor    servicio HTTP local de validación y registro
+  benchmark   mediciones de rendimiento
+  metricas    muestra un volcado de métricas
+  datos       genera registros sintéticos
+  gui         abre la interfaz gráfica (requiere tkinter y pantalla)
+
+Use `python -m Aplicacion_regex <comando> -h` para ver los argumentos de cada comando"""
+
+
+def main(argv=None):
+    """Punto de entrada sin interfaz gráfica del paquete"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(AYUDA)
+        return 0
+    comando, argumentos = argv[0], argv[1:]
+    if comando not in COMANDOS:
+        print(f"❌ Comando desconocido: {comando}\n\n{AYUDA}", file=sys.stderr)
+        return 2
+
+    nombre_modulo, previos = COMANDOS[comando]
+    try:
+        modulo = import_module(f".{nombre_modulo}", __package__)
+    except ImportError as e:
+        print(f"❌ No se pudo cargar '{comando}': {e}", file=sys.stderr)
+        return 1
+    if previos is None:
+        return modulo.main() or 0
+    return modulo.main(previos + argumentos)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,855 @@
+import gc
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from operator import attrgetter
+
+try:
+    from .repositorio import (
+        Repositorio, RegistroDuplicadoError, iterar_json_legado,
+        modelo_en_rango, validar_filtros
+    )
+    from .bloqueo_archivo import BloqueoArchivo
+    from .estadisticas import EstadisticasRegistros
+    from .indice_busqueda import IndiceBusqueda
+    from .instantanea import cargar_instantanea, guardar_instantanea
+    from .orden_columnas import OrdenColumnas, pagina
+    from .vehiculo import Vehiculo
+except ImportError:
+    from repositorio import (
+        Repositorio, RegistroDuplicadoError, iterar_json_legado,
+        modelo_en_rango, validar_filtros
+    )
+    from bloqueo_archivo import BloqueoArchivo
+    from estadisticas import EstadisticasRegistros
+    from indice_busqueda import IndiceBusqueda
+    from instantanea import cargar_instantanea, guardar_instantanea
+    from orden_columnas import OrdenColumnas, pagina
+    from vehiculo import Vehiculo
+
+
+# Cada cuántas líneas se informa el avance de la carga
+LINEAS_POR_AVANCE = 10000
+
+# Campos con índice hash: placa y chasis únicos, cédula con varios registros
+CAMPOS_INDICE = ("placa", "chasis", "cedula")
+
+# Líneas aplicadas después de la instantánea a partir de las cuales se
+# vuelve a escribir al cargar
+LINEAS_INSTANTANEA = 10000
+
+# Bytes que se guardan, como máximo, de la última línea aplicada
+VENTANA_LINEA = 1 << 16
+
+
+def _clave(valor):
+    """
+    Normaliza un valor para usarlo como clave de índice
+    """
+    return str(valor if valor is not None else '').strip().upper()
+
+
+def _firma(archivo):
+    """
+    Identidad del archivo en disco (dispositivo, inodo), o None si no existe.
+    Cambia cuando el archivo es reemplazado con os.replace, salvo que el
+    sistema reutilice el inodo (Linux lo hace): por eso además se compara
+    la última línea aplicada (ver AlmacenRegistros._reemplazado)
+    """
+    try:
+        estado = os.stat(archivo)
+    except FileNotFoundError:
+        return None
+    return (estado.st_dev, estado.st_ino)
+
+
+def _ultima_linea(archivo, desplazamiento):
+    """
+    Última línea completa que termina en el byte `desplazamiento` (a lo sumo
+    sus últimos VENTANA_LINEA bytes), o b'' si no hay ninguna
+    """
+    inicio = max(0, desplazamiento - VENTANA_LINEA)
+    with open(archivo, 'rb') as file:
+        file.seek(inicio)
+        datos = file.read(desplazamiento - inicio)
+    return datos[datos.rfind(b'\n', 0, len(datos) - 1) + 1:]
+
+
+def _serializar(objeto):
+    """
+    Convierte un vehículo o una lápida en una línea JSON compacta
+    """
+    if isinstance(objeto, Vehiculo):
+        objeto = objeto.a_dict()
+    return json.dumps(objeto, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _sincronizar_directorio(archivo):
+    """
+    Fuerza a disco la entrada de directorio de un archivo recién
+    reemplazado con os.replace (no disponible en Windows)
+    """
+    if os.name != 'posix':
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(archivo)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class AlmacenRegistros(Repositorio):
+    """
+    Almacén de registros en un archivo JSON por líneas (un registro por línea).
+    Guardar un registro es un solo anexado al final del archivo, sin releer
+    ni reescribir los registros anteriores.
+
+    En memoria cada registro es un Vehiculo (con __slots__ y cadenas
+    compartidas) con un identificador estable en "id". Eliminar
+    un registro anexa una lápida {"eliminado": id}; cuando la proporción de
+    líneas muertas supera el umbral, el archivo se compacta en segundo plano.
+
+    Mantiene índices hash en memoria: placa y chasis son únicos, y una
+    cédula puede tener varios vehículos. La búsqueda libre usa un
+    IndiceBusqueda que se construye en la primera búsqueda y desde entonces
+    se mantiene con cada alta y eliminación, los órdenes por columna de
+    la tabla se guardan en un OrdenColumnas y los conteos por marca, color,
+    década y propietario en un EstadisticasRegistros.
+
+    Varias instancias (de uno o más procesos) pueden escribir el mismo
+    archivo: cada escritura toma un BloqueoArchivo sobre archivo + ".lock",
+    aplica primero lo que los demás anexaron y después escribe.
+
+    Para arrancar rápido se guarda junto al archivo una instantánea binaria
+    (ver instantanea.py) con los registros, los órdenes por columna y las
+    estadísticas: si sigue vigente, la carga la restaura y solo lee del
+    archivo las líneas posteriores. Si falta o está vencida se carga el
+    archivo completo y se reescribe en segundo plano
+    """
+
+    def __init__(self, archivo, fsync_cada=1, umbral_compactacion=0.5,
+                 prefijo_id="", instantanea_automatica=True):
+        """
+        fsync_cada: 0 = nunca forzar a disco (solo flush),
+                    1 = cada alta o eliminación está en disco al retornar;
+                        las escrituras concurrentes comparten un solo
+                        fsync (group commit),
+                    N = fsync cada N registros
+        umbral_compactacion: proporción de líneas muertas (registros
+                    eliminados y lápidas) que dispara la compactación
+        prefijo_id: texto que se antepone a los ids de los registros nuevos
+                    (AlmacenParticionado lo usa para saber de qué
+                    partición es cada id)
+        instantanea_automatica: si es False, cargar no reescribe la
+                    instantánea en segundo plano (los procesos trabajadores
+                    terminan antes de que el hilo acabe)
+        """
+        self.archivo = archivo
+        self.fsync_cada = fsync_cada
+        self.umbral_compactacion = umbral_compactacion
+        self.prefijo_id = prefijo_id
+        self.instantanea_automatica = instantanea_automatica
+        self._manejador = None
+        self._sin_fsync = 0
+        self._bloqueo = BloqueoArchivo(archivo + '.lock')
+
+        # Group commit: escrituras anexadas y confirmadas en disco, y si
+        # algún hilo está haciendo el fsync del grupo
+        self._disco = threading.Condition()
+        self._escrituras = 0
+        self._confirmadas = 0
+        self._sincronizando = False
+
+        # Estado en memoria: registros vivos por id, líneas y bytes del
+        # archivo ya aplicados y versión (cambia con cada alta o eliminación)
+        self._registros = None
+        self._orden = []
+        self._orden_valido = True
+        self._lineas = 0
+        self._desplazamiento = 0
+        self._firma = None
+        # Última línea aplicada, que termina en _desplazamiento: si ya no
+        # está ahí, el archivo fue reemplazado aunque conserve el inodo
+        self._ultima = b''
+        self._version = 0
+        # Cargas completas hechas: cambia cuando el archivo aplicado deja de
+        # ser el mismo (reemplazado por otro proceso), aunque el inodo no
+        self._generacion = 0
+        self._por_placa = {}
+        self._por_chasis = {}
+        self._por_cedula = {}
+        self._busqueda = None
+        self._ordenes = OrdenColumnas()
+        self._estadisticas = EstadisticasRegistros()
+        self._candado = threading.RLock()
+        self._compactando = False
+        self._guardando_instantanea = False
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _asegurar_cargado(self, al_progreso=None):
+        """
+        Reproduce el archivo una sola vez para reconstruir los registros vivos.
+        Si la carga se interrumpe, el almacén queda sin cargar
+        """
+        if self._registros is not None:
+            return
+        self._registros = {}
+        self._por_placa = {}
+        self._por_chasis = {}
+        self._por_cedula = {}
+        self._busqueda = None
+        self._ordenes = OrdenColumnas()
+        self._estadisticas = EstadisticasRegistros()
+        self._orden = []
+        self._orden_valido = True
+        self._lineas = 0
+        self._desplazamiento = 0
+        self._ultima = b''
+        # La carga crea cientos de miles de objetos que viven hasta el final:
+        # el recolector de ciclos los recorrería una y otra vez sin liberar nada
+        recolector = gc.isenabled()
+        gc.disable()
+        try:
+            self._firma = _firma(self.archivo)
+            desde = self._restaurar_instantanea()
+            aplicadas = self._aplicar_desde(desde, al_progreso)
+        except BaseException:
+            self._registros = None
+            raise
+        finally:
+            if recolector:
+                gc.enable()
+        self._version += 1
+        self._generacion += 1
+        if self.instantanea_automatica and self._firma is not None and (desde == 0 or aplicadas >= LINEAS_INSTANTANEA):
+            self.guardar_instantanea_en_segundo_plano()
+
+    def _restaurar_instantanea(self):
+        """
+        Restaura los registros, los índices y los órdenes por columna desde
+        la instantánea binaria si sigue vigente. Retorna el byte desde el
+        que falta aplicar el archivo (0 si no había instantánea válida)
+        """
+        leida = cargar_instantanea(self.archivo, self._firma)
+        if leida is None:
+            return 0
+        registros, indices, ordenes, estadisticas, lineas, desplazamiento = leida
+        if set(indices) != set(CAMPOS_INDICE):
+            return 0
+        ids = list(map(attrgetter('id'), registros))
+        self._registros = dict(zip(ids, registros))
+        self._orden = ids
+        self._por_placa = dict(zip(indices['placa'], ids))
+        self._por_chasis = dict(zip(indices['chasis'], ids))
+        for cedula, id_registro in zip(indices['cedula'], ids):
+            self._por_cedula.setdefault(cedula, set()).add(id_registro)
+        for campo, posiciones in ordenes.items():
+            self._ordenes.restaurar(campo, list(map(registros.__getitem__, posiciones)))
+        if estadisticas is not None:
+            self._estadisticas = EstadisticasRegistros.desde_dict(estadisticas, indices['cedula'])
+        else:
+            self._estadisticas = EstadisticasRegistros.desde_registros(registros)
+        self._lineas = lineas
+        self._desplazamiento = desplazamiento
+        self._ultima = _ultima_linea(self.archivo, desplazamiento)
+        return desplazamiento
+
+    def _aplicar_desde(self, desde, al_progreso=None):
+        """
+        Lee el archivo a partir del byte `desde` y aplica cada línea completa:
+        altas a los registros e índices y lápidas como eliminaciones.
+        Una última línea incompleta (escritura interrumpida o en curso) se
+        deja sin aplicar. al_progreso(fracción leída) se llama cada
+        LINEAS_POR_AVANCE líneas. Retorna la cantidad de líneas aplicadas
+        """
+        if not os.path.exists(self.archivo):
+            return 0
+        pendiente = max(1, os.path.getsize(self.archivo) - desde)
+        aplicadas = 0
+        with open(self.archivo, 'rb') as file:
+            file.seek(desde)
+            for linea in file:
+                if not linea.endswith(b'\n'):
+                    print(f"⚠️ Última línea incompleta en {self.archivo}, se omite")
+                    break
+                self._desplazamiento += len(linea)
+                self._lineas += 1
+                self._ultima = linea
+                aplicadas += 1
+                if al_progreso is not None and aplicadas % LINEAS_POR_AVANCE == 0:
+                    al_progreso(min(1.0, (self._desplazamiento - desde) / pendiente))
+                if not linea.strip():
+                    continue
+                try:
+                    objeto = json.loads(linea)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    print(f"⚠️ Línea {self._lineas} dañada en {self.archivo}, se omite")
+                    continue
+                self._aplicar(objeto)
+        return aplicadas
+
+    def _aplicar(self, objeto):
+        """
+        Aplica una línea ya decodificada al estado en memoria
+        """
+        if 'eliminado' in objeto:
+            eliminado = self._registros.pop(objeto['eliminado'], None)
+            if eliminado is not None:
+                self._desindexar(eliminado)
+                self._orden_valido = False
+            return
+        # Registros sin id (migrados antes de existir los ids):
+        # su número de línea es estable hasta la siguiente compactación,
+        # que lo deja escrito en el archivo
+        vehiculo = Vehiculo.desde_dict(objeto, id=objeto.get('id') or f"l{self._lineas}")
+        self._registros[vehiculo.id] = vehiculo
+        self._orden.append(vehiculo.id)
+        self._indexar(vehiculo)
+
+    def sincronizar(self, al_progreso=None):
+        """
+        Incorpora los cambios que otros procesos hicieron al archivo y retorna
+        la versión actual. Si el archivo solo creció se leen las líneas nuevas
+        desde el último desplazamiento conocido; si fue reemplazado (por
+        ejemplo, compactado) o se achicó, se vuelve a cargar completo
+        """
+        with self._candado:
+            if self._registros is None:
+                self._asegurar_cargado(al_progreso)
+                return self._version
+            if self._reemplazado():
+                self.cerrar()
+                self._registros = None
+                self._asegurar_cargado(al_progreso)
+            elif self._firma is not None and os.path.getsize(self.archivo) > self._desplazamiento:
+                if self._aplicar_desde(self._desplazamiento, al_progreso):
+                    self._version += 1
+            return self._version
+
+    def _reemplazado(self):
+        """
+        Indica si el archivo en disco ya no es el que se aplicó: cambió de
+        identidad, se achicó o la última línea aplicada ya no termina en
+        el desplazamiento conocido (otro proceso lo reemplazó y el sistema
+        reutilizó el inodo)
+        """
+        if _firma(self.archivo) != self._firma:
+            return True
+        if self._firma is None or not self._ultima:
+            return False
+        try:
+            with open(self.archivo, 'rb') as file:
+                file.seek(self._desplazamiento - len(self._ultima))
+                return file.read(len(self._ultima)) != self._ultima
+        except OSError:
+            return True
+
+    def guardar_instantanea(self):
+        """
+        Escribe la instantánea binaria con el estado en memoria. El estado
+        se copia bajo el candado y se serializa fuera de él. Retorna False
+        si no se escribió
+        """
+        with self._candado:
+            if self._registros is None or self._firma is None:
+                return False
+            registros = list(self._registros.values())
+            ordenes = self._ordenes.calculados()
+            estadisticas = self._estadisticas.a_dict()
+            estado = (self._lineas, self._desplazamiento, self._firma)
+        indices = {
+            campo: [_clave(getattr(registro, campo)) for registro in registros]
+            for campo in CAMPOS_INDICE
+        }
+        return guardar_instantanea(self.archivo, registros, indices, ordenes, estadisticas, *estado)
+
+    def guardar_instantanea_en_segundo_plano(self):
+        """
+        Escribe la instantánea en un hilo aparte si no hay otra escritura en curso
+        """
+        with self._candado:
+            if self._guardando_instantanea:
+                return
+            self._guardando_instantanea = True
+
+        def guardar():
+            try:
+                self.guardar_instantanea()
+            except OSError as e:
+                print(f"⚠️ No se pudo guardar la instantánea de {self.archivo}: {e}")
+            finally:
+                with self._candado:
+                    self._guardando_instantanea = False
+
+        threading.Thread(target=guardar, daemon=True).start()
+
+    def version(self):
+        """
+        Marca de cambios: aumenta con cada alta o eliminación aplicada
+        """
+        with self._candado:
+            return self._version
+
+    def obtener_rango(self, inicio, cantidad, orden=None, descendente=False):
+        """
+        Página de registros en orden de inserción. Se apoya en una lista de
+        ids que tras una eliminación se reconstruye una sola vez, en la
+        siguiente lectura, para que eliminar siga siendo O(1).
+        Si se indica un campo de orden, la página sale del orden en caché
+        de esa columna
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            if orden is not None:
+                lista = self._ordenes.ordenado(orden, self._registros.values)
+                return pagina(lista, inicio, cantidad, descendente)
+            if not self._orden_valido:
+                self._orden = list(self._registros)
+                self._orden_valido = True
+            return [self._registros[id_registro] for id_registro in self._orden[inicio:inicio + cantidad]]
+
+    @contextmanager
+    def ordenado(self, campo):
+        """
+        Entrega la lista de registros ordenada por una columna, la misma que
+        el almacén mantiene al día, con el candado tomado: no se copia, así
+        que solo se lee y solo dentro del bloque with
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            yield self._ordenes.ordenado(campo, self._registros.values)
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+    def _indexar(self, registro):
+        """
+        Agrega un registro a los índices de placa, chasis y cédula,
+        a los órdenes por columna, a las estadísticas y, si ya existe, al
+        índice de búsqueda
+        """
+        id_registro = registro.id
+        self._por_placa[_clave(registro.placa)] = id_registro
+        self._por_chasis[_clave(registro.chasis)] = id_registro
+        self._por_cedula.setdefault(_clave(registro.cedula), set()).add(id_registro)
+        self._ordenes.agregar(registro)
+        self._estadisticas.agregar(registro)
+        if self._busqueda is not None:
+            self._busqueda.agregar(registro)
+
+    def _desindexar(self, registro):
+        """
+        Quita un registro de los índices
+        """
+        id_registro = registro.id
+        for indice, valor in ((self._por_placa, registro.placa), (self._por_chasis, registro.chasis)):
+            clave = _clave(valor)
+            if indice.get(clave) == id_registro:
+                del indice[clave]
+        clave = _clave(registro.cedula)
+        ids = self._por_cedula.get(clave)
+        if ids is not None:
+            ids.discard(id_registro)
+            if not ids:
+                del self._por_cedula[clave]
+        self._ordenes.quitar(registro)
+        self._estadisticas.quitar(registro)
+        if self._busqueda is not None:
+            self._busqueda.quitar(registro)
+
+    def _verificar_unicos(self, registros):
+        """
+        Lanza RegistroDuplicadoError si alguna placa o chasis ya existe,
+        en el almacén o repetido dentro de los mismos registros
+        """
+        placas = set()
+        chasises = set()
+        for registro in registros:
+            placa = _clave(registro.placa)
+            if placa in self._por_placa or placa in placas:
+                raise RegistroDuplicadoError('placa', placa, "Placa ya registrada")
+            chasis = _clave(registro.chasis)
+            if chasis in self._por_chasis or chasis in chasises:
+                raise RegistroDuplicadoError('chasis', chasis, "Chasis ya registrado")
+            placas.add(placa)
+            chasises.add(chasis)
+
+    def buscar_por_placa(self, placa):
+        """
+        Retorna el registro con la placa dada, o None
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            id_registro = self._por_placa.get(_clave(placa))
+            return self._registros.get(id_registro) if id_registro else None
+
+    def buscar_por_chasis(self, chasis):
+        """
+        Retorna el registro con el número de chasis dado, o None
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            id_registro = self._por_chasis.get(_clave(chasis))
+            return self._registros.get(id_registro) if id_registro else None
+
+    def buscar_por_cedula(self, cedula):
+        """
+        Retorna la lista de registros del propietario con la cédula dada
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            ids = self._por_cedula.get(_clave(cedula), ())
+            return [self._registros[id_registro] for id_registro in ids]
+
+    def buscar(self, texto):
+        """
+        Búsqueda libre con el índice en memoria
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            if self._busqueda is None:
+                self._busqueda = IndiceBusqueda()
+                for registro in self._registros.values():
+                    self._busqueda.agregar(registro)
+            return self._busqueda.buscar(texto)
+
+    def precargar(self, al_progreso=None):
+        """
+        Reproduce el archivo en memoria informando el avance
+        """
+        with self._candado:
+            self._asegurar_cargado(al_progreso)
+
+    def cargado(self):
+        """
+        Indica si los registros ya están en memoria
+        """
+        with self._candado:
+            return self._registros is not None
+
+    def iterar(self):
+        """
+        Genera los registros vivos en orden de inserción
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            registros = list(self._registros.values())
+        yield from registros
+
+    def cargar(self):
+        """
+        Carga todos los registros vivos en una lista
+        """
+        return list(self.iterar())
+
+    def obtener(self, id_registro):
+        """
+        Retorna el registro con el id dado, o None si no existe
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            return self._registros.get(id_registro)
+
+    def contar(self):
+        """
+        Cantidad de registros vivos
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            return len(self._registros)
+
+    def estadisticas(self):
+        """
+        Resumen de los conteos que se mantienen con cada alta y eliminación
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            return self._estadisticas.resumen()
+
+    def sumar_estadisticas(self, destino):
+        """
+        Suma los conteos de este almacén a `destino` (un EstadisticasRegistros)
+        """
+        with self._candado:
+            self._asegurar_cargado()
+            destino.sumar(self._estadisticas)
+
+    def filtrar(self, modelo_desde=None, modelo_hasta=None, **campos):
+        """
+        Retorna los registros que coinciden con los filtros dados
+        """
+        validar_filtros(campos)
+        return [
+            registro for registro in self.iterar()
+            if all(getattr(registro, campo) == str(valor) for campo, valor in campos.items())
+            and modelo_en_rango(registro.modelo, modelo_desde, modelo_hasta)
+        ]
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def agregar(self, registro):
+        """
+        Anexa un registro al final del archivo y retorna su id.
+        Lanza RegistroDuplicadoError, sin escribir nada, si la placa o el
+        chasis ya están registrados
+        """
+        return self.agregar_lote([registro])[0]
+
+    def agregar_lote(self, registros):
+        """
+        Anexa varios registros con una sola escritura y retorna sus ids.
+        Si alguno está duplicado no se escribe ninguno
+        """
+        registros = [Vehiculo.desde_dict(registro, id=self.prefijo_id + uuid.uuid4().hex) for registro in registros]
+        with self._candado, self._bloqueo:
+            self._ponerse_al_dia()
+            self._verificar_unicos(registros)
+            escritura = self._anexar(''.join(_serializar(registro) for registro in registros), len(registros))
+            for registro in registros:
+                self._registros[registro.id] = registro
+                self._orden.append(registro.id)
+                self._indexar(registro)
+        self._confirmar(escritura)
+        return [registro.id for registro in registros]
+
+    def eliminar(self, id_registro):
+        """
+        Elimina un registro anexando una lápida. Retorna False si no existe
+        (o si otro proceso ya lo eliminó)
+        """
+        with self._candado, self._bloqueo:
+            self._ponerse_al_dia()
+            if id_registro not in self._registros:
+                return False
+            escritura = self._anexar(_serializar({'eliminado': id_registro}))
+            self._desindexar(self._registros.pop(id_registro))
+            self._orden_valido = False
+            requiere_compactar = self._proporcion_muertas() > self.umbral_compactacion
+        self._confirmar(escritura)
+        if requiere_compactar:
+            self.compactar_en_segundo_plano()
+        return True
+
+    def _ponerse_al_dia(self):
+        """
+        Se llama con el bloqueo entre procesos tomado, antes de escribir:
+        aplica las líneas que otros procesos anexaron (o recarga todo si
+        reemplazaron el archivo, lo que además cierra el manejador viejo)
+        y recorta una última línea incompleta que haya dejado una escritura
+        interrumpida, para no anexar detrás de ella
+        """
+        self.sincronizar()
+        if self._firma is not None and os.path.getsize(self.archivo) > self._desplazamiento:
+            print(f"⚠️ Se recorta una línea incompleta al final de {self.archivo}")
+            if self._manejador is not None:
+                self._manejador.flush()
+            os.truncate(self.archivo, self._desplazamiento)
+
+    def _anexar(self, texto, lineas=1):
+        """
+        Escribe líneas al final del archivo. Retorna el número de la
+        escritura, que se pasa a _confirmar una vez soltados los candados
+        """
+        datos = texto.encode('utf-8')
+        manejador = self._abrir_para_anexar()
+        manejador.write(datos)
+        manejador.flush()
+        self._lineas += lineas
+        self._desplazamiento += len(datos)
+        self._ultima = datos[datos.rfind(b'\n', 0, len(datos) - 1) + 1:]
+        self._version += 1
+        self._escrituras += 1
+
+        self._sin_fsync += lineas
+        if self.fsync_cada > 1 and self._sin_fsync >= self.fsync_cada:
+            os.fsync(manejador.fileno())
+            self._sin_fsync = 0
+        return self._escrituras
+
+    def _confirmar(self, escritura):
+        """
+        Group commit (con fsync_cada=1): retorna cuando la escritura dada
+        ya está en disco. El primer hilo que llega hace un solo fsync que
+        cubre todo lo anexado hasta ese momento; los que escriben mientras
+        tanto esperan y se confirman juntos en el fsync siguiente. El fsync
+        se hace sobre un duplicado del descriptor, fuera del candado, así
+        las escrituras siguientes no esperan al disco
+        """
+        if self.fsync_cada != 1:
+            return
+        with self._disco:
+            while self._confirmadas < escritura and self._sincronizando:
+                self._disco.wait()
+            if self._confirmadas >= escritura:
+                return
+            self._sincronizando = True
+
+        confirmadas = self._confirmadas
+        try:
+            with self._candado:
+                objetivo = self._escrituras
+                descriptor = os.dup(self._manejador.fileno()) if self._manejador is not None else None
+            # Sin manejador, cerrar() o la compactación ya forzaron los datos a disco
+            if descriptor is not None:
+                try:
+                    os.fsync(descriptor)
+                finally:
+                    os.close(descriptor)
+            confirmadas = objetivo
+        finally:
+            with self._disco:
+                self._confirmadas = max(self._confirmadas, confirmadas)
+                self._sincronizando = False
+                self._disco.notify_all()
+
+    def _reescribir(self, registros):
+        """
+        Reemplaza todo el contenido del archivo de forma atómica.
+        registros puede ser cualquier iterable: se escribe a medida que se
+        recorre. Retorna la cantidad de registros escritos
+        """
+        self.cerrar()
+        temporal = self.archivo + '.tmp'
+        cantidad = 0
+        with open(temporal, 'w', encoding='utf-8') as file:
+            for registro in registros:
+                file.write(_serializar(registro))
+                cantidad += 1
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporal, self.archivo)
+        _sincronizar_directorio(self.archivo)
+        return cantidad
+
+    def cerrar(self):
+        """
+        Cierra el archivo abierto para anexar, forzando los datos pendientes a disco
+        """
+        with self._candado:
+            if self._manejador is not None:
+                if self._sin_fsync and self.fsync_cada:
+                    os.fsync(self._manejador.fileno())
+                self._manejador.close()
+                self._manejador = None
+                self._sin_fsync = 0
+            self._bloqueo.cerrar()
+
+    def _abrir_para_anexar(self):
+        """
+        Abre el archivo en modo anexado (la cola ya fue reparada por
+        _ponerse_al_dia) y recuerda su identidad, para notar cuando otro
+        proceso lo reemplace
+        """
+        if self._manejador is None:
+            self._manejador = open(self.archivo, 'ab')
+            self._firma = _firma(self.archivo)
+        return self._manejador
+
+    # ------------------------------------------------------------------
+    # Compactación
+    # ------------------------------------------------------------------
+    def _proporcion_muertas(self):
+        """
+        Proporción de líneas del archivo que ya no corresponden a registros vivos
+        """
+        if not self._lineas:
+            return 0.0
+        return (self._lineas - len(self._registros)) / self._lineas
+
+    def compactar_en_segundo_plano(self):
+        """
+        Lanza la compactación en un hilo aparte si no hay otra en curso
+        """
+        with self._candado:
+            if self._compactando:
+                return
+            self._compactando = True
+        threading.Thread(target=self.compactar, daemon=True).start()
+
+    def compactar(self):
+        """
+        Reescribe el archivo solo con los registros vivos.
+        La copia se escribe sin bloquear las inserciones; al final, bajo el
+        candado y el bloqueo entre procesos, se agregan las líneas anexadas
+        mientras tanto (por este u otros procesos) y se reemplaza el
+        archivo de forma atómica. Si otro proceso reemplazó el archivo
+        entretanto (se notó al ponerse al día y se recargó, aunque el inodo
+        se haya reutilizado), la copia ya no sirve y se descarta
+        """
+        # Nombre propio: otros procesos pueden estar compactando el mismo archivo
+        temporal = f"{self.archivo}.{uuid.uuid4().hex[:8]}.compactando"
+        try:
+            with self._candado:
+                self._asegurar_cargado()
+                if self._manejador is not None:
+                    self._manejador.flush()
+                vivos = list(self._registros.values())
+                desplazamiento = self._desplazamiento
+                generacion = self._generacion
+
+            with open(temporal, 'w', encoding='utf-8') as file:
+                for registro in vivos:
+                    file.write(_serializar(registro))
+
+            with self._candado, self._bloqueo:
+                self._ponerse_al_dia()
+                if self._generacion != generacion or self._desplazamiento < desplazamiento:
+                    os.remove(temporal)
+                    return
+                self.cerrar()
+                lineas = len(vivos)
+                with open(temporal, 'ab') as destino:
+                    if os.path.exists(self.archivo):
+                        with open(self.archivo, 'rb') as origen:
+                            origen.seek(desplazamiento)
+                            cola = origen.read(self._desplazamiento - desplazamiento)
+                        destino.write(cola)
+                        lineas += cola.count(b'\n')
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                os.replace(temporal, self.archivo)
+                _sincronizar_directorio(self.archivo)
+                self._lineas = lineas
+                self._desplazamiento = os.path.getsize(self.archivo)
+                self._firma = _firma(self.archivo)
+                self._ultima = _ultima_linea(self.archivo, self._desplazamiento)
+            print(f"🧹 {self.archivo} compactado: {len(vivos)} registros vivos")
+            # El archivo fue reemplazado: la instantánea anterior ya no sirve
+            self.guardar_instantanea_en_segundo_plano()
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        finally:
+            with self._candado:
+                self._compactando = False
+
+    # ------------------------------------------------------------------
+    # Migración
+    # ------------------------------------------------------------------
+    def migrar_desde_json(self, archivo_json):
+        """
+        Migración única desde el formato anterior (un arreglo JSON con todos
+        los registros). Solo se realiza si el archivo por líneas aún no existe;
+        el archivo original se conserva sin cambios. El arreglo se lee en
+        modo streaming, así que la memoria no depende de su tamaño
+        """
+        if os.path.exists(self.archivo) or not os.path.exists(archivo_json):
+            return 0
+        registros = (
+            Vehiculo.desde_dict(registro, id=self.prefijo_id + uuid.uuid4().hex)
+            for registro in iterar_json_legado(archivo_json)
+        )
+        with self._candado, self._bloqueo:
+            # Otro proceso pudo migrar mientras se esperaba el bloqueo
+            if os.path.exists(self.archivo):
+                return 0
+            migrados = self._reescribir(registros)
+            self._registros = None
+        print(f"📦 {migrados} registros migrados de {archivo_json} a {self.archivo}")
+        return migrados
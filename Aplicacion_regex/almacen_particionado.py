@@ -0,0 +1,603 @@
+import json
+import os
+import sys
+import threading
+import uuid
+import zlib
+from contextlib import ExitStack
+from itertools import chain
+
+# argparse y concurrent.futures se importan donde se usan: solo la línea
+# de comandos y el trabajo en paralelo los necesitan
+
+try:
+    from . import metricas
+    from .almacen import AlmacenRegistros, _clave, _firma, _serializar, _sincronizar_directorio
+    from .bloqueo_archivo import BloqueoArchivo
+    from .bulk import contar_lote, entero_positivo
+    from .estadisticas import EstadisticasRegistros
+    from .instantanea import instantanea_vigente
+    from .orden_columnas import clave_orden, pagina_intercalada
+    from .repositorio import (
+        Repositorio, RegistroDuplicadoError, abrir_repositorio, iterar_json_legado,
+        validar_filtros
+    )
+    from .vehiculo import Vehiculo
+except ImportError:
+    import metricas
+    from almacen import AlmacenRegistros, _clave, _firma, _serializar, _sincronizar_directorio
+    from bloqueo_archivo import BloqueoArchivo
+    from bulk import contar_lote, entero_positivo
+    from estadisticas import EstadisticasRegistros
+    from instantanea import instantanea_vigente
+    from orden_columnas import clave_orden, pagina_intercalada
+    from repositorio import (
+        Repositorio, RegistroDuplicadoError, abrir_repositorio, iterar_json_legado,
+        validar_filtros
+    )
+    from vehiculo import Vehiculo
+
+# Particiones de un directorio nuevo. Una vez creado, la cantidad queda en
+# su manifiesto: cambiarla movería los registros de partición
+PARTICIONES = 8
+MANIFIESTO = "particiones.json"
+
+# Los ids se escriben como "p<partición>-<uuid>"
+SEPARADOR_ID = "-"
+
+# Bytes anexados después de la instantánea a partir de los cuales la
+# partición se carga en un proceso trabajador, que reescribe la instantánea
+BYTES_COLA = 1 << 20
+
+
+def particion_de_placa(placa, particiones):
+    """
+    Partición de un registro: CRC32 de su placa normalizada módulo la
+    cantidad de particiones. No se usa hash(), que cambia entre procesos
+    """
+    return zlib.crc32(_clave(placa).encode("utf-8")) % particiones
+
+
+def ruta_particion(directorio, numero):
+    """
+    Archivo JSON por líneas de una partición
+    """
+    return os.path.join(directorio, f"particion_{numero:03d}.jsonl")
+
+
+def _requiere_preparar(archivo):
+    """
+    Indica si cargar una partición obliga a leer mucho JSON: no tiene
+    instantánea vigente o tiene más de BYTES_COLA anexados después de ella
+    """
+    firma = _firma(archivo)
+    if firma is None:
+        return False
+    vigente = instantanea_vigente(archivo, firma)
+    return vigente is None or os.path.getsize(archivo) - vigente[1] > BYTES_COLA
+
+
+# ----------------------------------------------------------------------
+# Trabajo de los procesos trabajadores: cada uno abre su partición
+# ----------------------------------------------------------------------
+def _cargar_particion(archivo):
+    """
+    Abre y carga una partición dentro de un proceso trabajador. Si su
+    instantánea estaba vencida se reescribe aquí mismo, así el proceso
+    principal (y los trabajos siguientes) la restauran en lugar de releer
+    el JSON
+    """
+    almacen = AlmacenRegistros(archivo, instantanea_automatica=False)
+    vencida = _requiere_preparar(archivo)
+    almacen.precargar()
+    if vencida:
+        almacen.guardar_instantanea()
+    return almacen
+
+
+def _preparar_particion(archivo):
+    _cargar_particion(archivo).cerrar()
+    return archivo
+
+
+def _filtrar_particion(archivo, modelo_desde, modelo_hasta, campos):
+    almacen = _cargar_particion(archivo)
+    try:
+        return almacen.filtrar(modelo_desde, modelo_hasta, **campos)
+    finally:
+        almacen.cerrar()
+
+
+def _revalidar_particion(archivo):
+    almacen = _cargar_particion(archivo)
+    try:
+        return almacen.contar(), almacen.revalidar()
+    finally:
+        almacen.cerrar()
+
+
+class AlmacenParticionado(Repositorio):
+    """
+    Almacén repartido en N particiones dentro de un directorio: cada una es
+    un AlmacenRegistros (JSON por líneas, con su instantánea y su bloqueo)
+    y cada registro vive en la partición que indica el CRC32 de su placa.
+
+    Las operaciones de un solo registro tocan una sola partición: la
+    búsqueda por placa va a la de la placa, y obtener y eliminar a la que
+    indica el prefijo del id ("p3-..."). Solo esa partición se carga.
+
+    Cargar, filtrar sin tener los datos en memoria y revalidar todo el
+    almacén se reparten en un ProcessPoolExecutor, una partición por
+    trabajo, y los resultados se juntan en el orden de las particiones.
+    Para la carga, los trabajadores dejan al día la instantánea de cada
+    partición y este proceso solo las restaura, que es mucho más rápido
+    que interpretar el JSON.
+
+    El orden de inserción se conserva dentro de cada partición; el
+    recorrido completo va partición por partición. Placa y chasis son
+    únicos en todo el almacén: las altas toman un BloqueoArchivo sobre el
+    directorio y verifican las demás particiones antes de escribir
+    """
+
+    def __init__(self, directorio, particiones=None, procesos=None, **opciones):
+        """
+        particiones: cantidad al crear el directorio (por defecto
+                     PARTICIONES); si ya existe se usa la de su manifiesto
+        procesos:    procesos trabajadores para cargar, filtrar y
+                     revalidar; por defecto, uno por núcleo
+        opciones:    se pasan a cada AlmacenRegistros (fsync_cada,
+                     umbral_compactacion)
+        """
+        self.directorio = directorio
+        self.procesos = procesos or os.cpu_count() or 1
+        os.makedirs(directorio, exist_ok=True)
+        self._bloqueo = BloqueoArchivo(os.path.join(directorio, "particiones.lock"))
+        self.particiones = self._leer_manifiesto(particiones)
+        self._almacenes = [
+            AlmacenRegistros(ruta_particion(directorio, numero), prefijo_id=f"p{numero}{SEPARADOR_ID}", **opciones)
+            for numero in range(self.particiones)
+        ]
+        self._candado = threading.RLock()
+        self._cargado = False
+        # Resumen de estadísticas, que vale mientras no cambie la versión
+        self._resumen = None
+
+    def _leer_manifiesto(self, particiones):
+        """
+        Lee la cantidad de particiones del manifiesto del directorio, o lo
+        crea con la pedida si aún no existe
+        """
+        ruta = os.path.join(self.directorio, MANIFIESTO)
+        with self._bloqueo:
+            if os.path.exists(ruta):
+                with open(ruta, 'r', encoding='utf-8') as file:
+                    existentes = int(json.load(file)["particiones"])
+                if particiones and particiones != existentes:
+                    print(f"⚠️ {self.directorio} ya tiene {existentes} particiones, se ignoran las {particiones} pedidas")
+                return existentes
+            particiones = particiones or PARTICIONES
+            if particiones < 1:
+                raise ValueError("Se necesita al menos una partición")
+            temporal = ruta + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as file:
+                json.dump({"particiones": particiones}, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporal, ruta)
+            _sincronizar_directorio(ruta)
+        return particiones
+
+    def _particion(self, placa):
+        return self._almacenes[particion_de_placa(placa, self.particiones)]
+
+    def _almacenes_de_id(self, id_registro):
+        """
+        Particiones donde puede estar un id: la de su prefijo o, si no lo
+        tiene (ids de otro almacén), todas
+        """
+        prefijo, separador, _ = str(id_registro).partition(SEPARADOR_ID)
+        if separador and prefijo[:1] == "p" and prefijo[1:].isdigit():
+            numero = int(prefijo[1:])
+            if numero < self.particiones:
+                return [self._almacenes[numero]]
+        return self._almacenes
+
+    def _en_paralelo(self, funcion, archivos, *argumentos):
+        """
+        Ejecuta funcion(archivo, *argumentos) por cada partición en un
+        ProcessPoolExecutor y genera los resultados en el orden recibido.
+        Si el consumidor se interrumpe, los trabajos sin empezar se cancelan
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Las métricas de los procesos trabajadores se perderían: se apagan
+        ejecutor = ProcessPoolExecutor(
+            max_workers=min(self.procesos, len(archivos)), initializer=metricas.desactivar
+        )
+        try:
+            futuros = [ejecutor.submit(funcion, archivo, *argumentos) for archivo in archivos]
+            for futuro in futuros:
+                yield futuro.result()
+        finally:
+            ejecutor.shutdown(cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+    def precargar(self, al_progreso=None):
+        """
+        Carga todas las particiones. Si hay más de una sin instantánea
+        vigente, primero se preparan en paralelo; después se restaura cada
+        partición en este proceso. al_progreso(fracción) se llama con el
+        avance de cada partición y puede lanzar una excepción para cancelar
+        """
+        with self._candado:
+            if self._cargado:
+                return
+            pendientes = [
+                almacen.archivo for almacen in self._almacenes
+                if not almacen.cargado() and _requiere_preparar(almacen.archivo)
+            ]
+            if len(pendientes) < 2 or self.procesos < 2:
+                pendientes = []
+            pasos = len(pendientes) + self.particiones
+            hechos = 0
+            if pendientes:
+                for _ in self._en_paralelo(_preparar_particion, pendientes):
+                    hechos += 1
+                    if al_progreso is not None:
+                        al_progreso(hechos / pasos)
+            for almacen in self._almacenes:
+                if al_progreso is None:
+                    almacen.precargar()
+                else:
+                    almacen.precargar(lambda fraccion: al_progreso((hechos + fraccion) / pasos))
+                hechos += 1
+                if al_progreso is not None:
+                    al_progreso(hechos / pasos)
+            self._cargado = True
+
+    def _asegurar_cargado(self):
+        if not self._cargado:
+            self.precargar()
+
+    def sincronizar(self, al_progreso=None):
+        """
+        Carga las particiones la primera vez o incorpora en cada una los
+        cambios de otros procesos. Retorna la versión
+        """
+        with self._candado:
+            if not self._cargado:
+                self.precargar(al_progreso)
+            else:
+                for almacen in self._almacenes:
+                    almacen.sincronizar()
+            return self.version()
+
+    def version(self):
+        """
+        Marca de cambios: la suma de las versiones de las particiones, que
+        solo aumentan
+        """
+        return sum(almacen.version() for almacen in self._almacenes)
+
+    def guardar_instantanea(self):
+        """
+        Escribe la instantánea de cada partición. Retorna False si alguna
+        no se escribió
+        """
+        return all([almacen.guardar_instantanea() for almacen in self._almacenes])
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def obtener(self, id_registro):
+        """
+        Retorna el registro con el id dado, o None
+        """
+        for almacen in self._almacenes_de_id(id_registro):
+            registro = almacen.obtener(id_registro)
+            if registro is not None:
+                return registro
+        return None
+
+    def buscar_por_placa(self, placa):
+        """
+        Retorna el registro con la placa dada, o None
+        """
+        return self._particion(placa).buscar_por_placa(placa)
+
+    def buscar_por_chasis(self, chasis):
+        """
+        Retorna el registro con el número de chasis dado, o None
+        """
+        self._asegurar_cargado()
+        for almacen in self._almacenes:
+            registro = almacen.buscar_por_chasis(chasis)
+            if registro is not None:
+                return registro
+        return None
+
+    def buscar_por_cedula(self, cedula):
+        """
+        Retorna la lista de registros del propietario con la cédula dada
+        """
+        self._asegurar_cargado()
+        return [registro for almacen in self._almacenes for registro in almacen.buscar_por_cedula(cedula)]
+
+    def buscar(self, texto):
+        """
+        Búsqueda libre con el índice en memoria de cada partición
+        """
+        self._asegurar_cargado()
+        return [registro for almacen in self._almacenes for registro in almacen.buscar(texto)]
+
+    def iterar(self):
+        """
+        Genera los registros partición por partición
+        """
+        self._asegurar_cargado()
+        for almacen in self._almacenes:
+            yield from almacen.iterar()
+
+    def contar(self):
+        """
+        Cantidad de registros vivos
+        """
+        self._asegurar_cargado()
+        return sum(almacen.contar() for almacen in self._almacenes)
+
+    def obtener_rango(self, inicio, cantidad, orden=None, descendente=False):
+        """
+        Página de registros. Sin orden, las particiones se recorren una
+        tras otra. Con orden, la página se intercala de los órdenes de las
+        particiones (ver _pagina_ordenada)
+        """
+        self._asegurar_cargado()
+        if orden is not None:
+            return self._pagina_ordenada(orden, inicio, cantidad, descendente)
+        registros = []
+        for almacen in self._almacenes:
+            if len(registros) >= cantidad:
+                break
+            total = almacen.contar()
+            if inicio >= total:
+                inicio -= total
+                continue
+            registros += almacen.obtener_rango(inicio, cantidad - len(registros))
+            inicio = 0
+        return registros
+
+    def _pagina_ordenada(self, campo, inicio, cantidad, descendente=False):
+        """
+        Página de todo el almacén ordenado por una columna. Cada partición
+        mantiene su propio orden, que se actualiza con cada alta o
+        eliminación; la página se intercala de esos órdenes sin copiarlos ni
+        volver a ordenar (ver pagina_intercalada). Los candados de las
+        particiones se toman siempre en el mismo orden y se sueltan al
+        terminar la página
+        """
+        with ExitStack() as pila:
+            listas = [pila.enter_context(almacen.ordenado(campo)) for almacen in self._almacenes]
+            return pagina_intercalada(listas, clave_orden(campo), inicio, cantidad, descendente)
+
+    def estadisticas(self):
+        """
+        Suma los conteos que cada partición mantiene con sus altas y
+        eliminaciones. El resumen se conserva hasta el siguiente cambio
+        """
+        self._asegurar_cargado()
+        with self._candado:
+            version = self.version()
+            if self._resumen is None or self._resumen[0] != version:
+                total = EstadisticasRegistros()
+                for almacen in self._almacenes:
+                    almacen.sumar_estadisticas(total)
+                self._resumen = (version, total.resumen())
+            return self._resumen[1]
+
+    def filtrar(self, modelo_desde=None, modelo_hasta=None, **campos):
+        """
+        Retorna los registros que coinciden con los filtros dados. Si las
+        particiones ya están en memoria se recorren aquí; si no, cada una
+        se filtra en un proceso trabajador y solo viajan las coincidencias
+        """
+        validar_filtros(campos)
+        if self._cargado or self.procesos < 2:
+            return [
+                registro for almacen in self._almacenes
+                for registro in almacen.filtrar(modelo_desde, modelo_hasta, **campos)
+            ]
+        archivos = [almacen.archivo for almacen in self._almacenes]
+        return list(chain.from_iterable(
+            self._en_paralelo(_filtrar_particion, archivos, modelo_desde, modelo_hasta, campos)
+        ))
+
+    def revalidar(self):
+        """
+        Revalida cada partición en un proceso trabajador y junta los
+        resultados en el orden de las particiones
+        """
+        if self.procesos < 2:
+            return [invalido for almacen in self._almacenes for invalido in almacen.revalidar()]
+        invalidos = []
+        archivos = [almacen.archivo for almacen in self._almacenes]
+        for resultado in self._en_paralelo(_revalidar_particion, archivos):
+            invalidos += contar_lote(resultado)[1]
+        return invalidos
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def agregar(self, registro):
+        """
+        Guarda un registro en la partición de su placa y retorna su id.
+        Lanza RegistroDuplicadoError si la placa o el chasis ya existen
+        """
+        return self.agregar_lote([registro])[0]
+
+    def agregar_lote(self, registros):
+        """
+        Reparte los registros por placa y los anexa a sus particiones (una
+        escritura por partición). Bajo el bloqueo del directorio se ponen al
+        día todas las particiones y se verifica cada placa y chasis antes de
+        escribir: si alguno está duplicado no se guarda ninguno.
+        Retorna los ids en el orden recibido
+        """
+        registros = [Vehiculo.desde_dict(registro) for registro in registros]
+        grupos = {}
+        for posicion, registro in enumerate(registros):
+            grupos.setdefault(particion_de_placa(registro.placa, self.particiones), []).append(posicion)
+        ids = [None] * len(registros)
+        self._asegurar_cargado()
+        with self._bloqueo:
+            for almacen in self._almacenes:
+                almacen.sincronizar()
+            self._verificar_unicos(registros)
+            for numero, posiciones in grupos.items():
+                nuevos = self._almacenes[numero].agregar_lote([registros[posicion] for posicion in posiciones])
+                for posicion, id_registro in zip(posiciones, nuevos):
+                    ids[posicion] = id_registro
+        return ids
+
+    def _verificar_unicos(self, registros):
+        """
+        Lanza RegistroDuplicadoError si alguna placa (en su partición) o
+        chasis (en cualquiera) ya existe, o si se repite en el lote
+        """
+        placas = set()
+        chasises = set()
+        for registro in registros:
+            placa = _clave(registro.placa)
+            if placa in placas or self._particion(placa).buscar_por_placa(placa) is not None:
+                raise RegistroDuplicadoError('placa', placa, "Placa ya registrada")
+            chasis = _clave(registro.chasis)
+            if chasis in chasises or any(almacen.buscar_por_chasis(chasis) is not None for almacen in self._almacenes):
+                raise RegistroDuplicadoError('chasis', chasis, "Chasis ya registrado")
+            placas.add(placa)
+            chasises.add(chasis)
+
+    def eliminar(self, id_registro):
+        """
+        Elimina un registro de su partición. Retorna False si no existe
+        """
+        return any(almacen.eliminar(id_registro) for almacen in self._almacenes_de_id(id_registro))
+
+    def cerrar(self):
+        """
+        Cierra las particiones y el bloqueo del directorio
+        """
+        for almacen in self._almacenes:
+            almacen.cerrar()
+        self._bloqueo.cerrar()
+
+    # ------------------------------------------------------------------
+    # Migración
+    # ------------------------------------------------------------------
+    def _tiene_datos(self):
+        return any(os.path.exists(almacen.archivo) for almacen in self._almacenes)
+
+    def _repartir(self, registros):
+        """
+        Escribe los registros (diccionarios o Vehiculo) como el contenido de
+        particiones nuevas, cada uno en la de su placa y con el prefijo de
+        esa partición antepuesto a su id (o a uno nuevo). Se escribe en
+        temporales que reemplazan a las particiones al terminar. Retorna la
+        cantidad escrita
+        """
+        temporales = [almacen.archivo + '.tmp' for almacen in self._almacenes]
+        archivos = []
+        cantidad = 0
+        try:
+            for temporal in temporales:
+                archivos.append(open(temporal, 'w', encoding='utf-8'))
+            for registro in registros:
+                numero = particion_de_placa(registro.get("placa"), self.particiones)
+                id_registro = self._almacenes[numero].prefijo_id + (registro.get("id") or uuid.uuid4().hex)
+                archivos[numero].write(_serializar(Vehiculo.desde_dict(registro, id=id_registro)))
+                cantidad += 1
+            for archivo in archivos:
+                archivo.flush()
+                os.fsync(archivo.fileno())
+        except BaseException:
+            for archivo in archivos:
+                archivo.close()
+            for temporal in temporales:
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+            raise
+        for archivo in archivos:
+            archivo.close()
+
+        for almacen, temporal in zip(self._almacenes, temporales):
+            almacen.cerrar()
+            os.replace(temporal, almacen.archivo)
+            # Una partición ya cargada nota el archivo nuevo y se recarga
+            if almacen.cargado():
+                almacen.sincronizar()
+        _sincronizar_directorio(temporales[0])
+        self._cargado = False
+        return cantidad
+
+    def copiar_desde(self, repositorio):
+        """
+        Llena las particiones, que deben estar vacías, con los registros de
+        otro almacén. Los ids se conservan con el prefijo de su partición.
+        Retorna la cantidad copiada
+        """
+        with self._candado, self._bloqueo:
+            if self._tiene_datos():
+                raise ValueError(f"{self.directorio} ya tiene registros")
+            return self._repartir(repositorio.iterar())
+
+    def migrar_desde_json(self, archivo_json):
+        """
+        Migración única desde el arreglo JSON del formato anterior,
+        repartiendo los registros entre las particiones. Solo se realiza si
+        aún no existe ninguna; el archivo original se conserva sin cambios
+        """
+        if not os.path.exists(archivo_json):
+            return 0
+        with self._candado, self._bloqueo:
+            # Otro proceso pudo migrar mientras se esperaba el bloqueo
+            if self._tiene_datos():
+                return 0
+            migrados = self._repartir(iterar_json_legado(archivo_json))
+        print(f"📦 {migrados} registros migrados de {archivo_json} a {self.particiones} particiones en {self.directorio}")
+        return migrados
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.almacen_particionado",
+        description="Copia un almacén de registros a un directorio particionado por placa"
+    )
+    parser.add_argument("origen", help="Almacén de origen (.jsonl o .db)")
+    parser.add_argument("destino", help="Directorio del almacén particionado (por ejemplo registros.particiones)")
+    parser.add_argument("--particiones", type=entero_positivo, default=None,
+                        help=f"Cantidad de particiones del directorio nuevo (por defecto {PARTICIONES}); "
+                             "un directorio existente conserva las suyas")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    origen = abrir_repositorio(args.origen)
+    destino = AlmacenParticionado(args.destino, args.particiones)
+    try:
+        copiados = destino.copiar_desde(origen)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        origen.cerrar()
+        destino.cerrar()
+    print(json.dumps({"copiados": copiados, "particiones": destino.particiones}, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
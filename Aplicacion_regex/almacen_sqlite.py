@@ -0,0 +1,442 @@
+import os
+import sqlite3
+import threading
+import uuid
+from itertools import islice
+
+try:
+    from .estadisticas import MAYORES_PROPIETARIOS, armar_resumen, claves_conteo
+    from .indice_busqueda import plegar, texto_coincide
+    from .repositorio import Repositorio, RegistroDuplicadoError, iterar_json_legado, validar_filtros
+    from .validacion import CAMPOS
+    from .vehiculo import Vehiculo
+except ImportError:
+    from estadisticas import MAYORES_PROPIETARIOS, armar_resumen, claves_conteo
+    from indice_busqueda import plegar, texto_coincide
+    from repositorio import Repositorio, RegistroDuplicadoError, iterar_json_legado, validar_filtros
+    from validacion import CAMPOS
+    from vehiculo import Vehiculo
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    orden INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    placa TEXT NOT NULL,
+    marca TEXT,
+    modelo TEXT,
+    color TEXT,
+    chasis TEXT NOT NULL,
+    motor TEXT,
+    cedula TEXT,
+    nombre TEXT,
+    correo TEXT,
+    telefono TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_registros_placa ON registros (upper(trim(placa)));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_registros_chasis ON registros (upper(trim(chasis)));
+CREATE INDEX IF NOT EXISTS idx_registros_cedula ON registros (upper(trim(cedula)));
+CREATE INDEX IF NOT EXISTS idx_registros_marca ON registros (marca);
+CREATE INDEX IF NOT EXISTS idx_registros_modelo ON registros (CAST(modelo AS INTEGER));
+"""
+
+# Conteos agregados (ver estadisticas.py): tipo es marca, color, decada o
+# cedula, más las filas "resumen" con el total de registros, de
+# propietarios y de propietarios con varios vehículos. Cada escritura suma
+# en la misma transacción los cambios de todo su lote, con una fila por
+# clave distinta
+ESQUEMA_CONTEOS = """
+CREATE TABLE IF NOT EXISTS conteos (
+    tipo TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    etiqueta TEXT NOT NULL DEFAULT '',
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (tipo, clave)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_conteos_cantidad ON conteos (tipo, cantidad);
+"""
+
+# Parámetros por consulta al leer los conteos previos de las cédulas
+PARAMETROS_POR_CONSULTA = 500
+
+SQL_RESUMEN_INICIAL = (
+    "INSERT OR IGNORE INTO conteos (tipo, clave, cantidad) VALUES "
+    "('resumen', 'registros', 0), ('resumen', 'propietarios', 0), ('resumen', 'varios', 0)"
+)
+SQL_SUMAR_CONTEO = (
+    "INSERT INTO conteos (tipo, clave, etiqueta, cantidad) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (tipo, clave) DO UPDATE SET cantidad = cantidad + excluded.cantidad"
+)
+SQL_PODAR_CONTEO = "DELETE FROM conteos WHERE tipo = ? AND clave = ? AND tipo <> 'resumen' AND cantidad <= 0"
+SQL_CONTEOS = "SELECT tipo, clave, etiqueta, cantidad FROM conteos WHERE tipo IN ('marca', 'color', 'decada', 'resumen')"
+SQL_MAYORES_PROPIETARIOS = (
+    "SELECT clave, cantidad FROM conteos WHERE tipo = 'cedula' AND cantidad > 1 "
+    "ORDER BY cantidad DESC, clave LIMIT ?"
+)
+
+COLUMNAS = ("id",) + CAMPOS
+
+# Sentencias fijas: el módulo sqlite3 las prepara una vez y las reutiliza
+SQL_INSERTAR = (
+    f"INSERT INTO registros ({', '.join(COLUMNAS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNAS)})"
+)
+SQL_SELECCIONAR = f"SELECT {', '.join(COLUMNAS)} FROM registros"
+SQL_ELIMINAR = "DELETE FROM registros WHERE id = ?"
+SQL_POR_ID = SQL_SELECCIONAR + " WHERE id = ?"
+SQL_POR_PLACA = SQL_SELECCIONAR + " WHERE upper(trim(placa)) = upper(trim(?))"
+SQL_POR_CHASIS = SQL_SELECCIONAR + " WHERE upper(trim(chasis)) = upper(trim(?))"
+SQL_POR_CEDULA = SQL_SELECCIONAR + " WHERE upper(trim(cedula)) = upper(trim(?)) ORDER BY orden"
+SQL_CONTAR = "SELECT COUNT(*) FROM registros"
+SQL_RANGO = SQL_SELECCIONAR + " ORDER BY orden LIMIT ? OFFSET ?"
+
+# Expresión de orden de cada columna de la tabla: las que tienen índice lo
+# usan y las demás se comparan plegadas, como en el almacén JSON por líneas
+EXPRESIONES_ORDEN = {campo: f"plegar({campo})" for campo in CAMPOS}
+EXPRESIONES_ORDEN.update({
+    "placa": "upper(trim(placa))",
+    "chasis": "upper(trim(chasis))",
+    "cedula": "upper(trim(cedula))",
+    "modelo": "CAST(modelo AS INTEGER)",
+})
+
+# Búsqueda libre: los prefijos de placa y cédula usan sus índices como
+# rangos; nombre y marca se comparan plegados (sin tildes) fila por fila
+SQL_BUSCAR = (
+    SQL_SELECCIONAR
+    + " WHERE upper(trim(placa)) >= :desde AND upper(trim(placa)) < :hasta"
+    + " OR upper(trim(cedula)) >= :desde AND upper(trim(cedula)) < :hasta"
+    + " OR texto_coincide(nombre, marca, :texto)"
+    + " ORDER BY orden"
+)
+
+
+class AlmacenSQLite(Repositorio):
+    """
+    Almacén de registros en SQLite con modo WAL: lectores y escritor no se
+    bloquean entre sí y varias instancias de la aplicación pueden compartir
+    la base de datos. Placa, chasis y cédula están indexados en la base
+    """
+
+    def __init__(self, archivo, tamano_lote=1000):
+        self.archivo = archivo
+        self.tamano_lote = tamano_lote
+        self._candado = threading.RLock()
+        self._cambios = 0
+        self._nueva = not os.path.exists(archivo)
+        self._conexion = sqlite3.connect(archivo, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        con_conteos = self._conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conteos'"
+        ).fetchone()
+        self._conexion.executescript(ESQUEMA_CONTEOS + SQL_RESUMEN_INICIAL + ";")
+        self._conexion.create_function("texto_coincide", 3, texto_coincide, deterministic=True)
+        self._conexion.create_function("plegar", 1, plegar, deterministic=True)
+        if not con_conteos:
+            self._recontar()
+
+    def _recontar(self):
+        """
+        Calcula la tabla de conteos recorriendo los registros: para las
+        bases creadas antes de que existiera
+        """
+        with self._candado, self._conexion:
+            self._conexion.execute("DELETE FROM conteos")
+            self._conexion.execute(SQL_RESUMEN_INICIAL)
+            lote = []
+            for registro in self.iterar():
+                lote.append(registro)
+                if len(lote) >= self.tamano_lote:
+                    self._sumar_conteos(lote, 1)
+                    lote = []
+            self._sumar_conteos(lote, 1)
+
+    def _sumar_conteos(self, registros, signo):
+        """
+        Suma (signo 1) o resta (signo -1) los registros a la tabla de
+        conteos, dentro de la transacción en curso (que ya escribió los
+        registros, así que tiene la base bloqueada para escribir): una fila
+        por clave distinta del lote
+        """
+        if not registros:
+            return
+        deltas = {("resumen", "registros"): ["", signo * len(registros)]}
+        for registro in registros:
+            for tipo, clave, etiqueta in claves_conteo(registro):
+                delta = deltas.get((tipo, clave))
+                if delta is None:
+                    deltas[(tipo, clave)] = [etiqueta, signo]
+                else:
+                    delta[1] += signo
+
+        # Propietarios: cuántas cédulas pasan a tener (o dejan de tener)
+        # uno y más de un vehículo, según su cantidad antes del lote
+        cedulas = [clave for tipo, clave in deltas if tipo == "cedula"]
+        previas = {}
+        for inicio in range(0, len(cedulas), PARAMETROS_POR_CONSULTA):
+            parte = cedulas[inicio:inicio + PARAMETROS_POR_CONSULTA]
+            previas.update(self._conexion.execute(
+                "SELECT clave, cantidad FROM conteos WHERE tipo = 'cedula' "
+                f"AND clave IN ({', '.join('?' for _ in parte)})", parte
+            ))
+        propietarios = varios = 0
+        for cedula in cedulas:
+            antes = previas.get(cedula, 0)
+            despues = antes + deltas[("cedula", cedula)][1]
+            propietarios += (despues > 0) - (antes > 0)
+            varios += (despues > 1) - (antes > 1)
+        deltas[("resumen", "propietarios")] = ["", propietarios]
+        deltas[("resumen", "varios")] = ["", varios]
+
+        self._conexion.executemany(SQL_SUMAR_CONTEO, [
+            (tipo, clave, etiqueta, cantidad)
+            for (tipo, clave), (etiqueta, cantidad) in deltas.items() if cantidad
+        ])
+        if signo < 0:
+            self._conexion.executemany(SQL_PODAR_CONTEO, list(deltas))
+
+    def _a_registro(self, fila):
+        """
+        Convierte una fila de la consulta (id y CAMPOS) en un Vehiculo
+        """
+        return Vehiculo(*fila)
+
+    def _consultar(self, sql, parametros=()):
+        """
+        Ejecuta una consulta y retorna los registros resultantes
+        """
+        with self._candado:
+            filas = self._conexion.execute(sql, parametros).fetchall()
+        return [self._a_registro(fila) for fila in filas]
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def iterar(self):
+        """
+        Genera los registros en orden de inserción, leyendo por bloques
+        """
+        ultimo = 0
+        while True:
+            with self._candado:
+                filas = self._conexion.execute(
+                    f"SELECT orden, {', '.join(COLUMNAS)} FROM registros "
+                    "WHERE orden > ? ORDER BY orden LIMIT ?",
+                    (ultimo, self.tamano_lote)
+                ).fetchall()
+            if not filas:
+                return
+            for fila in filas:
+                yield self._a_registro(fila[1:])
+            ultimo = filas[-1][0]
+
+    def obtener(self, id_registro):
+        """
+        Retorna el registro con el id dado, o None
+        """
+        registros = self._consultar(SQL_POR_ID, (id_registro,))
+        return registros[0] if registros else None
+
+    def contar(self):
+        """
+        Cantidad de registros
+        """
+        with self._candado:
+            return self._conexion.execute(SQL_CONTAR).fetchone()[0]
+
+    def estadisticas(self):
+        """
+        Resumen de la tabla de conteos que se actualiza con cada escritura:
+        no recorre los registros
+        """
+        with self._candado:
+            filas = self._conexion.execute(SQL_CONTEOS).fetchall()
+            mayores = self._conexion.execute(SQL_MAYORES_PROPIETARIOS, (MAYORES_PROPIETARIOS,)).fetchall()
+        conteos = {"marca": [], "color": [], "decada": []}
+        resumen = {}
+        for tipo, clave, etiqueta, cantidad in filas:
+            if tipo == "resumen":
+                resumen[clave] = cantidad
+            else:
+                conteos[tipo].append((clave, etiqueta, cantidad))
+        return armar_resumen(resumen["registros"], conteos, resumen["propietarios"], resumen["varios"], mayores)
+
+    def version(self):
+        """
+        Combina los cambios propios con PRAGMA data_version, que aumenta
+        cuando otra conexión confirma una transacción
+        """
+        with self._candado:
+            version_externa = self._conexion.execute("PRAGMA data_version").fetchone()[0]
+            return (self._cambios, version_externa)
+
+    def obtener_rango(self, inicio, cantidad, orden=None, descendente=False):
+        """
+        Página de registros en orden de inserción o por una columna,
+        resuelta en la base de datos
+        """
+        if orden is None and not descendente:
+            return self._consultar(SQL_RANGO, (cantidad, inicio))
+        if orden is not None and orden not in EXPRESIONES_ORDEN:
+            raise ValueError(f"Campo de orden desconocido: {orden}")
+        sentido = "DESC" if descendente else "ASC"
+        expresion = f"{EXPRESIONES_ORDEN[orden]} {sentido}, " if orden is not None else ""
+        sql = f"{SQL_SELECCIONAR} ORDER BY {expresion}orden {sentido} LIMIT ? OFFSET ?"
+        return self._consultar(sql, (cantidad, inicio))
+
+    def buscar_por_placa(self, placa):
+        """
+        Busca por placa usando el índice único de la base de datos
+        """
+        registros = self._consultar(SQL_POR_PLACA, (placa,))
+        return registros[0] if registros else None
+
+    def buscar_por_chasis(self, chasis):
+        """
+        Busca por chasis usando el índice único de la base de datos
+        """
+        registros = self._consultar(SQL_POR_CHASIS, (chasis,))
+        return registros[0] if registros else None
+
+    def buscar_por_cedula(self, cedula):
+        """
+        Retorna los vehículos del propietario usando el índice de cédula
+        """
+        return self._consultar(SQL_POR_CEDULA, (cedula,))
+
+    def buscar(self, texto):
+        """
+        Búsqueda libre en la base de datos
+        """
+        consulta = plegar(texto)
+        if not consulta:
+            return []
+        desde = consulta.upper()
+        parametros = {"desde": desde, "hasta": desde + "\U0010ffff", "texto": consulta}
+        return self._consultar(SQL_BUSCAR, parametros)
+
+    def filtrar(self, modelo_desde=None, modelo_hasta=None, **campos):
+        """
+        Filtra en la base de datos por igualdad de campos y rango de modelo
+        """
+        validar_filtros(campos)
+        condiciones = []
+        parametros = []
+        for campo, valor in campos.items():
+            condiciones.append(f"{campo} = ?")
+            parametros.append(str(valor))
+        if modelo_desde is not None:
+            condiciones.append("CAST(modelo AS INTEGER) >= ?")
+            parametros.append(int(modelo_desde))
+        if modelo_hasta is not None:
+            condiciones.append("CAST(modelo AS INTEGER) <= ?")
+            parametros.append(int(modelo_hasta))
+
+        sql = SQL_SELECCIONAR
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        return self._consultar(sql + " ORDER BY orden", parametros)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def agregar(self, registro):
+        """
+        Inserta un registro y retorna su id
+        """
+        return self.agregar_lote([registro])[0]
+
+    def agregar_lote(self, registros):
+        """
+        Inserta los registros en una sola transacción con executemany
+        """
+        vehiculos = [Vehiculo.desde_dict(registro, id=uuid.uuid4().hex) for registro in registros]
+        filas = [(vehiculo.id,) + vehiculo.valores() for vehiculo in vehiculos]
+        try:
+            with self._candado, self._conexion:
+                self._conexion.executemany(SQL_INSERTAR, filas)
+                self._sumar_conteos(vehiculos, 1)
+                self._cambios += 1
+        except sqlite3.IntegrityError as e:
+            # Solo placa y chasis son duplicados del usuario; un id repetido
+            # u otra restricción se propaga como error de la base
+            if 'idx_registros_chasis' in str(e):
+                raise self._error_duplicado('chasis', "Chasis ya registrado", vehiculos) from e
+            if 'idx_registros_placa' in str(e):
+                raise self._error_duplicado('placa', "Placa ya registrada", vehiculos) from e
+            raise
+        return [fila[0] for fila in filas]
+
+    def _error_duplicado(self, campo, mensaje, registros):
+        """
+        Arma el RegistroDuplicadoError del primer registro del lote cuyo
+        campo (placa o chasis) ya está en la base o se repite dentro del lote
+        """
+        valores = [str(registro.get(campo) or '').strip().upper() for registro in registros]
+        existentes = set()
+        distintos = list(set(valores))
+        with self._candado:
+            for inicio in range(0, len(distintos), PARAMETROS_POR_CONSULTA):
+                parte = distintos[inicio:inicio + PARAMETROS_POR_CONSULTA]
+                existentes.update(valor for valor, in self._conexion.execute(
+                    f"SELECT upper(trim({campo})) FROM registros "
+                    f"WHERE upper(trim({campo})) IN ({', '.join('?' for _ in parte)})", parte
+                ))
+        vistos = set()
+        for valor in valores:
+            if valor in existentes or valor in vistos:
+                return RegistroDuplicadoError(campo, valor, mensaje)
+            vistos.add(valor)
+        return RegistroDuplicadoError(campo, '', mensaje)
+
+    def eliminar(self, id_registro):
+        """
+        Elimina un registro por id. Retorna False si no existe
+        """
+        with self._candado, self._conexion:
+            fila = self._conexion.execute(SQL_POR_ID, (id_registro,)).fetchone()
+            if fila is None:
+                return False
+            # Otra instancia pudo borrarlo entre la lectura y el DELETE:
+            # los conteos solo se restan si esta borró la fila
+            if self._conexion.execute(SQL_ELIMINAR, (id_registro,)).rowcount != 1:
+                return False
+            self._sumar_conteos([self._a_registro(fila)], -1)
+            self._cambios += 1
+        return True
+
+    def migrar_desde_json(self, archivo_json):
+        """
+        Migración única desde el arreglo JSON anterior: solo se realiza
+        cuando la base de datos se acaba de crear. El arreglo se lee en modo
+        streaming y se inserta por lotes
+        """
+        if not self._nueva or not os.path.exists(archivo_json):
+            return 0
+        registros = iterar_json_legado(archivo_json)
+        migrados = 0
+        while True:
+            lote = list(islice(registros, self.tamano_lote))
+            if not lote:
+                break
+            try:
+                migrados += len(self.agregar_lote(lote))
+            except RegistroDuplicadoError:
+                # Reintentar uno a uno para omitir solo los duplicados
+                for registro in lote:
+                    try:
+                        self.agregar(registro)
+                        migrados += 1
+                    except RegistroDuplicadoError as e:
+                        print(f"⚠️ Registro duplicado omitido en la migración: {e}")
+        self._nueva = False
+        print(f"📦 {migrados} registros migrados de {archivo_json} a {self.archivo}")
+        return migrados
+
+    def cerrar(self):
+        """
+        Cierra la conexión con la base de datos
+        """
+        with self._candado:
+            self._conexion.close()
@@ -0,0 +1,376 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    from .datos_sinteticos import APELLIDOS, GeneradorRegistros
+    from .repositorio import abrir_repositorio
+    from .validacion import CAMPOS, REGLAS, Validacion
+except ImportError:
+    from datos_sinteticos import APELLIDOS, GeneradorRegistros
+    from repositorio import abrir_repositorio
+    from validacion import CAMPOS, REGLAS, Validacion
+
+# Tamaños de almacén medidos por defecto (se pueden pedir hasta 10M)
+TAMANOS = (10_000, 100_000)
+
+ALMACENES = ("jsonl", "sqlite", "particionado")
+EXTENSIONES = {"jsonl": ".jsonl", "sqlite": ".db", "particionado": ".particiones"}
+
+# Valores por validador y registros validados en las mediciones de validación
+VALIDACIONES = 100_000
+
+# Operaciones individuales cronometradas para las latencias
+MUESTRAS = 200
+
+# Registros por lote al llenar el almacén
+TAMANO_LOTE = 10_000
+
+# Arranques en frío cronometrados por módulo
+ARRANQUES = 10
+
+# Módulos que importa un proceso que solo valida o solo usa el almacén.
+# Ninguno debe cargar tkinter
+MODULOS_SIN_INTERFAZ = (
+    "Aplicacion_regex.validacion",
+    "Aplicacion_regex.bulk",
+    "Aplicacion_regex.repositorio",
+    "Aplicacion_regex.almacen",
+)
+
+# Aumento del tiempo por operación a partir del cual hay regresión
+# (por debajo de ~20% el ruido entre ejecuciones es comparable)
+UMBRAL_REGRESION = 0.20
+
+
+def _percentil(ordenados, fraccion):
+    """
+    Percentil de una lista ya ordenada
+    """
+    return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))]
+
+
+def resultado(metrica, duraciones, operaciones=None, tamano=None, almacen=None):
+    """
+    Resume una medición. duraciones son los segundos de cada operación
+    cronometrada; si se midió un bloque de varias operaciones, se pasa su
+    duración total y la cantidad en `operaciones` (sin percentiles)
+    """
+    total = sum(duraciones)
+    operaciones = operaciones or len(duraciones)
+    datos = {
+        "metrica": metrica,
+        "almacen": almacen,
+        "tamano": tamano,
+        "operaciones": operaciones,
+        "total_s": round(total, 6),
+        "media_us": round(total / operaciones * 1e6, 3),
+        "por_segundo": round(operaciones / total, 1) if total else None,
+    }
+    if len(duraciones) > 1:
+        ordenados = sorted(duraciones)
+        for nombre, fraccion in (("p50_us", 0.50), ("p95_us", 0.95), ("p99_us", 0.99)):
+            datos[nombre] = round(_percentil(ordenados, fraccion) * 1e6, 3)
+    return datos
+
+
+def cronometrar(funcion, argumentos):
+    """
+    Llama funcion(argumento) para cada argumento y retorna la duración de cada llamada
+    """
+    duraciones = []
+    reloj = time.perf_counter
+    for argumento in argumentos:
+        inicio = reloj()
+        funcion(argumento)
+        duraciones.append(reloj() - inicio)
+    return duraciones
+
+
+def cronometrar_bloque(funcion, *args):
+    """
+    Duración en segundos de una sola llamada y su resultado
+    """
+    gc.collect()
+    inicio = time.perf_counter()
+    valor = funcion(*args)
+    return time.perf_counter() - inicio, valor
+
+
+# ----------------------------------------------------------------------
+# Validación
+# ----------------------------------------------------------------------
+def medir_validadores(generador, cantidad=VALIDACIONES):
+    """
+    Rendimiento de cada validador con mitad de valores válidos y mitad inválidos
+    """
+    resultados = []
+    for campo, (validador, _) in REGLAS.items():
+        valores = generador.valores(campo, cantidad)
+        duracion, _ = cronometrar_bloque(lambda: [validador(valor) for valor in valores])
+        resultados.append(resultado(f"validar.{campo}", [duracion], cantidad))
+    return resultados
+
+
+def medir_validacion_registros(generador, cantidad=VALIDACIONES):
+    """
+    Rendimiento de Validacion.validar_registro (diccionarios) y de
+    Validacion.validar_fila (tuplas en el orden de CAMPOS, como las filas
+    de la validación masiva) con un 10% de registros inválidos
+    """
+    registros = list(GeneradorRegistros(generador.semilla, 0.1).registros(cantidad))
+    filas = [tuple(registro[campo] for campo in CAMPOS) for registro in registros]
+    duracion, _ = cronometrar_bloque(
+        lambda: [Validacion.validar_registro(registro) for registro in registros]
+    )
+    duracion_filas, _ = cronometrar_bloque(lambda: [Validacion.validar_fila(fila) for fila in filas])
+    return [
+        resultado("validar_registro", [duracion], cantidad),
+        resultado("validar_fila", [duracion_filas], cantidad),
+    ]
+
+
+# ----------------------------------------------------------------------
+# Arranque en frío
+# ----------------------------------------------------------------------
+def medir_arranque(repeticiones=ARRANQUES):
+    """
+    Tiempo de arrancar un intérprete nuevo que importa cada módulo sin
+    interfaz gráfica (como un proceso trabajador de la validación masiva),
+    y el de un intérprete vacío como referencia. Avisa si alguno carga tkinter
+    """
+    paquete = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entorno = dict(os.environ, PYTHONPATH=paquete + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    resultados = []
+    for modulo in (None,) + MODULOS_SIN_INTERFAZ:
+        codigo = "pass" if modulo is None else f"import sys, {modulo}; sys.exit('tkinter' in sys.modules)"
+        duraciones = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            proceso = subprocess.run([sys.executable, "-c", codigo], env=entorno)
+            duraciones.append(time.perf_counter() - inicio)
+            if proceso.returncode:
+                print(f"⚠️ {modulo} cargó tkinter al importarse", file=sys.stderr)
+        resultados.append(resultado(f"arranque.{modulo or 'python'}", duraciones))
+    return resultados
+
+
+# ----------------------------------------------------------------------
+# Almacenamiento
+# ----------------------------------------------------------------------
+def llenar(repositorio, generador, tamano, tamano_lote=TAMANO_LOTE):
+    """
+    Inserta los registros [0, tamano) por lotes
+    """
+    for desde in range(0, tamano, tamano_lote):
+        repositorio.agregar_lote(list(generador.registros(min(tamano_lote, tamano - desde), desde)))
+
+
+def medir_almacen(tipo, tamano, generador, directorio, muestras=MUESTRAS):
+    """
+    Latencias de un almacén con `tamano` registros: carga masiva, alta
+    individual, carga en frío, búsquedas, páginas, orden y eliminación
+    """
+    archivo = os.path.join(directorio, f"benchmark_{tamano}{EXTENSIONES[tipo]}")
+    azar = random.Random(generador.semilla)
+    medidas = []
+
+    def anotar(metrica, duraciones, operaciones=None):
+        medidas.append(resultado(metrica, duraciones, operaciones, tamano, tipo))
+
+    repositorio = abrir_repositorio(archivo)
+    try:
+        duracion, _ = cronometrar_bloque(llenar, repositorio, generador, tamano)
+        anotar("insertar_lote", [duracion], tamano)
+        nuevos = [generador.registro(numero) for numero in range(tamano, tamano + muestras)]
+        ids = []
+        anotar("insertar", cronometrar(lambda registro: ids.append(repositorio.agregar(registro)), nuevos))
+    finally:
+        repositorio.cerrar()
+
+    # Carga en frío desde el archivo
+    repositorio = abrir_repositorio(archivo)
+    try:
+        duracion, _ = cronometrar_bloque(repositorio.precargar)
+        anotar("precargar", [duracion])
+        duracion, registros = cronometrar_bloque(repositorio.cargar)
+        anotar("cargar", [duracion])
+        del registros
+        duracion, _ = cronometrar_bloque(repositorio.revalidar)
+        anotar("revalidar", [duracion])
+
+        placas = [generador.registro(azar.randrange(tamano))["placa"] for _ in range(muestras)]
+        anotar("buscar_placa", cronometrar(repositorio.buscar_por_placa, placas))
+
+        consultas = [azar.choice(APELLIDOS)[:azar.randint(2, 6)] for _ in range(muestras)]
+        duracion, _ = cronometrar_bloque(repositorio.buscar, consultas[0])
+        anotar("primera_busqueda", [duracion])
+        anotar("buscar_texto", cronometrar(repositorio.buscar, consultas))
+
+        inicios = [azar.randrange(tamano) for _ in range(muestras)]
+        anotar("pagina", cronometrar(lambda inicio: repositorio.obtener_rango(inicio, 50), inicios))
+        duracion, _ = cronometrar_bloque(repositorio.obtener_rango, 0, 50, "nombre")
+        anotar("primer_orden", [duracion])
+        anotar("pagina_ordenada", cronometrar(
+            lambda inicio: repositorio.obtener_rango(inicio, 50, "nombre"), inicios
+        ))
+
+        anotar("eliminar", cronometrar(repositorio.eliminar, ids))
+        guardar_instantanea = getattr(repositorio, "guardar_instantanea", None)
+        if guardar_instantanea is not None:
+            guardar_instantanea()
+    finally:
+        repositorio.cerrar()
+
+    # Carga en frío desde la instantánea binaria (almacenes JSONL y particionado)
+    if guardar_instantanea is not None:
+        repositorio = abrir_repositorio(archivo)
+        try:
+            duracion, _ = cronometrar_bloque(repositorio.precargar)
+            anotar("precargar_instantanea", [duracion])
+        finally:
+            repositorio.cerrar()
+    return medidas
+
+
+def ejecutar(tamanos=TAMANOS, almacenes=ALMACENES, semilla=0, muestras=MUESTRAS,
+             validaciones=VALIDACIONES, directorio=None):
+    """
+    Ejecuta todas las mediciones y retorna los resultados con los datos
+    del entorno. Los almacenes se crean en un directorio temporal salvo
+    que se indique otro
+    """
+    generador = GeneradorRegistros(semilla)
+    resultados = []
+    print(f"⏱️ Validación ({validaciones} valores por campo)", file=sys.stderr)
+    resultados += medir_validadores(generador, validaciones)
+    resultados += medir_validacion_registros(generador, validaciones)
+    print(f"⏱️ Arranque en frío ({ARRANQUES} veces por módulo)", file=sys.stderr)
+    resultados += medir_arranque()
+
+    with tempfile.TemporaryDirectory(dir=directorio) as temporal:
+        for tamano in tamanos:
+            for tipo in almacenes:
+                print(f"⏱️ Almacén {tipo} con {tamano} registros", file=sys.stderr)
+                resultados += medir_almacen(tipo, tamano, generador, temporal, muestras)
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesadores": os.cpu_count(),
+        "semilla": semilla,
+        "muestras": muestras,
+        "resultados": resultados,
+    }
+
+
+# ----------------------------------------------------------------------
+# Comparación entre ejecuciones
+# ----------------------------------------------------------------------
+def _clave(medida):
+    """
+    Identifica una medición entre ejecuciones
+    """
+    return (medida["metrica"], medida.get("almacen"), medida.get("tamano"))
+
+
+def comparar(base, nuevo, umbral=UMBRAL_REGRESION):
+    """
+    Compara el tiempo medio por operación de dos ejecuciones.
+    Retorna una lista de (métrica, almacén, tamaño, media base, media nueva,
+    cambio relativo, es_regresion) con las métricas presentes en ambas
+    """
+    anteriores = {_clave(medida): medida for medida in base["resultados"]}
+    filas = []
+    for medida in nuevo["resultados"]:
+        anterior = anteriores.get(_clave(medida))
+        if anterior is None or not anterior["media_us"]:
+            continue
+        cambio = medida["media_us"] / anterior["media_us"] - 1
+        filas.append(_clave(medida) + (anterior["media_us"], medida["media_us"], cambio, cambio > umbral))
+    return filas
+
+
+def imprimir_comparacion(filas):
+    """
+    Muestra la comparación como tabla en la salida estándar
+    """
+    print(f"{'métrica':<22}{'almacén':<9}{'tamaño':>10}{'base µs':>14}{'nuevo µs':>14}{'cambio':>10}")
+    for metrica, almacen, tamano, anterior, actual, cambio, regresion in filas:
+        marca = "  ⚠️" if regresion else ""
+        print(f"{metrica:<22}{almacen or '-':<9}{tamano or '-':>10}"
+              f"{anterior:>14.3f}{actual:>14.3f}{cambio:>+10.1%}{marca}")
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.benchmark",
+        description="Mediciones de rendimiento de la validación y del almacenamiento"
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    correr = subparsers.add_parser("ejecutar", aliases=["run"], help="Ejecuta las mediciones")
+    correr.add_argument("-o", "--salida", help="Archivo JSON de resultados. Por defecto, salida estándar")
+    correr.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS),
+                        help="Cantidades de registros del almacén (por ejemplo 10000 1000000 10000000)")
+    correr.add_argument("--almacenes", nargs="+", choices=ALMACENES, default=list(ALMACENES),
+                        help="Almacenes a medir")
+    correr.add_argument("--semilla", type=int, default=0, help="Semilla de los datos sintéticos")
+    correr.add_argument("--muestras", type=int, default=MUESTRAS,
+                        help="Operaciones cronometradas por latencia")
+    correr.add_argument("--validaciones", type=int, default=VALIDACIONES,
+                        help="Valores por validador y registros validados")
+    correr.add_argument("--directorio", help="Dónde crear los almacenes temporales")
+
+    comparacion = subparsers.add_parser(
+        "comparar", aliases=["compare"],
+        help="Compara dos archivos de resultados y marca las regresiones"
+    )
+    comparacion.add_argument("base", help="Resultados de referencia")
+    comparacion.add_argument("nuevo", help="Resultados a comparar")
+    comparacion.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                             help="Aumento relativo del tiempo que cuenta como regresión")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    args = crear_parser().parse_args(argv)
+    if args.comando in ("comparar", "compare"):
+        with open(args.base, 'r', encoding='utf-8') as file:
+            base = json.load(file)
+        with open(args.nuevo, 'r', encoding='utf-8') as file:
+            nuevo = json.load(file)
+        filas = comparar(base, nuevo, args.umbral)
+        imprimir_comparacion(filas)
+        return 1 if any(fila[-1] for fila in filas) else 0
+
+    informe = ejecutar(
+        tamanos=args.tamanos,
+        almacenes=args.almacenes,
+        semilla=args.semilla,
+        muestras=args.muestras,
+        validaciones=args.validaciones,
+        directorio=args.directorio,
+    )
+    texto = json.dumps(informe, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as file:
+            file.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
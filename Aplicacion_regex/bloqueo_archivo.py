@@ -0,0 +1,81 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class BloqueoArchivo:
+    """
+    Bloqueo exclusivo entre procesos sobre un archivo auxiliar (flock en
+    POSIX, msvcrt.locking en Windows). Es un bloqueo consultivo: solo
+    excluye a quienes también lo usan.
+
+    Se usa un archivo propio (por ejemplo registros.jsonl.lock) y no el de
+    datos porque este se reemplaza con os.replace al compactar, y un bloqueo
+    sobre el archivo viejo no excluiría a quien abra el nuevo.
+
+    Se puede anidar dentro del mismo proceso: solo el primer `with` toma el
+    bloqueo y solo el último lo suelta
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._descriptor = None
+        self._profundidad = 0
+        self._candado = threading.RLock()
+
+    def __enter__(self):
+        self._candado.acquire()
+        try:
+            if self._profundidad == 0:
+                if self._descriptor is None:
+                    self._descriptor = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o644)
+                self._bloquear()
+            self._profundidad += 1
+        except BaseException:
+            self._candado.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._profundidad -= 1
+            if self._profundidad == 0:
+                self._desbloquear()
+        finally:
+            self._candado.release()
+        return False
+
+    def _bloquear(self):
+        if fcntl is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_EX)
+            return
+        os.lseek(self._descriptor, 0, os.SEEK_SET)
+        while True:
+            try:
+                # LK_LOCK reintenta durante unos 10 segundos antes de fallar
+                msvcrt.locking(self._descriptor, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _desbloquear(self):
+        if fcntl is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(self._descriptor, msvcrt.LK_UNLCK, 1)
+
+    def cerrar(self):
+        """
+        Cierra el archivo de bloqueo (el archivo no se borra: otro proceso
+        podría estar esperando sobre él)
+        """
+        with self._candado:
+            if self._descriptor is not None and self._profundidad == 0:
+                os.close(self._descriptor)
+                self._descriptor = None
@@ -0,0 +1,365 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+# argparse y concurrent.futures.process se importan donde se usan: los
+# procesos que solo validan lotes importan este módulo y no los necesitan
+
+try:
+    from . import metricas
+    from .lector_json import iterar_arreglo_json
+    from .validacion import CAMPOS, Validacion
+except ImportError:
+    import metricas
+    from lector_json import iterar_arreglo_json
+    from validacion import CAMPOS, Validacion
+
+# Registros por lote enviado a cada proceso
+TAMANO_LOTE = 5000
+
+MENSAJE_JSON_INVALIDO = "Registro JSON inválido"
+
+
+def detectar_formato(ruta):
+    """
+    Deduce el formato del archivo por su extensión (csv, jsonl o json)
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        return "json"
+    return "csv"
+
+
+def leer_filas_csv(ruta):
+    """
+    Genera (número de fila, valores) desde un CSV con encabezado.
+    Los valores se entregan en el orden de CAMPOS
+    """
+    with open(ruta, "r", encoding="utf-8", newline="") as archivo:
+        lector = csv.reader(archivo)
+        encabezado = next(lector, None)
+        if encabezado is None:
+            return
+        encabezado = [columna.strip().lower() for columna in encabezado]
+        posiciones = [
+            encabezado.index(campo) if campo in encabezado else None
+            for campo in CAMPOS
+        ]
+        # Columnas ya en el orden de CAMPOS: la fila se usa tal cual
+        en_orden = posiciones == list(range(len(CAMPOS)))
+        total = len(CAMPOS)
+        for numero, fila in enumerate(lector, start=1):
+            largo = len(fila)
+            if en_orden and largo == total:
+                yield numero, tuple(fila)
+                continue
+            yield numero, tuple(
+                fila[i] if i is not None and i < largo else ""
+                for i in posiciones
+            )
+
+
+def leer_filas_jsonl(ruta):
+    """
+    Genera (número de fila, valores) desde un archivo JSON por líneas.
+    Las líneas que no son un objeto JSON se entregan con valores None
+    """
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        numero = 0
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            numero += 1
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                registro = None
+            if not isinstance(registro, dict):
+                yield numero, None
+                continue
+            yield numero, tuple(registro.get(campo, "") for campo in CAMPOS)
+
+
+def leer_filas_json(ruta, usar_mmap=False):
+    """
+    Genera (número de fila, valores) desde un arreglo JSON como el de
+    registros_vehiculos.json, leyéndolo en modo streaming
+    """
+    for numero, registro in enumerate(iterar_arreglo_json(ruta, usar_mmap=usar_mmap), start=1):
+        if not isinstance(registro, dict):
+            yield numero, None
+            continue
+        yield numero, tuple(registro.get(campo, "") for campo in CAMPOS)
+
+
+def leer_filas(ruta, formato=None):
+    """
+    Lee el archivo de entrada de forma perezosa según su formato
+    """
+    formato = formato or detectar_formato(ruta)
+    if formato == "jsonl":
+        return leer_filas_jsonl(ruta)
+    if formato == "json":
+        return leer_filas_json(ruta)
+    return leer_filas_csv(ruta)
+
+
+def iterar_lotes(filas, tamano_lote=TAMANO_LOTE):
+    """
+    Agrupa un iterador de filas en listas de a lo sumo tamano_lote elementos.
+    Lanza ValueError de inmediato si tamano_lote no es positivo
+    """
+    if tamano_lote < 1:
+        raise ValueError(f"El tamaño de lote debe ser mayor que 0: {tamano_lote}")
+    return _lotes(iter(filas), tamano_lote)
+
+
+def _lotes(filas, tamano_lote):
+    """
+    Genera los lotes de iterar_lotes
+    """
+    while True:
+        lote = list(islice(filas, tamano_lote))
+        if not lote:
+            return
+        yield lote
+
+
+def validar_lote(lote):
+    """
+    Valida un lote de filas. Se ejecuta dentro de los procesos trabajadores.
+    Retorna (cantidad de filas, [(fila, {campo: error}), ...])
+    """
+    validar = Validacion.validar_fila
+    errores_lote = []
+    for numero, valores in lote:
+        if valores is None:
+            errores_lote.append((numero, {"registro": MENSAJE_JSON_INVALIDO}))
+            continue
+        errores = validar(valores)
+        if errores:
+            errores_lote.append((numero, errores))
+    return len(lote), errores_lote
+
+
+def resultados_en_orden(lotes, procesos=None):
+    """
+    Reparte los lotes en un ProcessPoolExecutor y entrega los resultados
+    en el orden de entrada. Solo se mantienen en vuelo 2 lotes por proceso,
+    por lo que la memoria no depende del tamaño del archivo
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for lote in lotes:
+            yield validar_lote(lote)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Las métricas de los procesos trabajadores se perderían: se apagan
+    # allá y se cuentan aquí a partir de los resultados
+    with ProcessPoolExecutor(max_workers=procesos, initializer=metricas.desactivar) as ejecutor:
+        pendientes = deque()
+        for lote in lotes:
+            pendientes.append(ejecutor.submit(validar_lote, lote))
+            if len(pendientes) >= procesos * 2:
+                yield contar_lote(pendientes.popleft().result())
+        while pendientes:
+            yield contar_lote(pendientes.popleft().result())
+
+
+def contar_lote(resultado):
+    """
+    Registra en las métricas las validaciones de un lote hecho en otro proceso
+    """
+    if metricas.ACTIVAS:
+        cantidad, errores_lote = resultado
+        errores = [errores for _, errores in errores_lote if "registro" not in errores]
+        validadas = cantidad - (len(errores_lote) - len(errores))
+        metricas.contar_validaciones(CAMPOS, validadas, errores)
+    return resultado
+
+
+class ReporteErrores:
+    """Escribe el reporte de errores por fila a medida que llegan los lotes"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.formato_csv = bool(ruta) and ruta.lower().endswith(".csv")
+        self.archivo = None
+        self.escritor = None
+
+    def __enter__(self):
+        if self.ruta:
+            self.archivo = open(self.ruta, "w", encoding="utf-8", newline="")
+        else:
+            self.archivo = sys.stdout
+        if self.formato_csv:
+            self.escritor = csv.writer(self.archivo)
+            self.escritor.writerow(("fila", "campo", "mensaje"))
+        return self
+
+    def escribir(self, errores_lote):
+        """
+        Escribe los errores de un lote: una línea JSON por fila,
+        o una fila CSV por campo inválido
+        """
+        if self.formato_csv:
+            for numero, errores in errores_lote:
+                for campo, mensaje in errores.items():
+                    self.escritor.writerow((numero, campo, mensaje))
+        else:
+            for numero, errores in errores_lote:
+                self.archivo.write(json.dumps(
+                    {"fila": numero, "errores": errores}, ensure_ascii=False
+                ) + "\n")
+
+    def __exit__(self, *exc):
+        if self.archivo is not sys.stdout:
+            self.archivo.close()
+        else:
+            self.archivo.flush()
+        return False
+
+
+def validar_archivo(entrada, salida=None, formato=None,
+                    tamano_lote=TAMANO_LOTE, procesos=None):
+    """
+    Valida un archivo completo en modo streaming y escribe el reporte de errores.
+    Retorna un resumen con el total de filas, las inválidas y el tiempo empleado
+    """
+    inicio = time.perf_counter()
+    total = invalidas = 0
+    lotes = iterar_lotes(leer_filas(entrada, formato), tamano_lote)
+
+    with ReporteErrores(salida) as reporte:
+        for cantidad, errores_lote in resultados_en_orden(lotes, procesos):
+            total += cantidad
+            invalidas += len(errores_lote)
+            reporte.escribir(errores_lote)
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "total": total,
+        "validas": total - invalidas,
+        "invalidas": invalidas,
+        "segundos": round(duracion, 3),
+        "filas_por_segundo": round(total / duracion) if duracion else 0,
+    }
+
+
+def revalidar_almacen(archivo, salida=None, procesos=None):
+    """
+    Vuelve a validar todos los registros de un almacén con las reglas
+    actuales (ver Repositorio.revalidar) y escribe una línea JSON con el id
+    y los errores de cada registro inválido. procesos solo se usa con el
+    almacén particionado, que revalida sus particiones en paralelo.
+    Retorna un resumen con los inválidos y el tiempo empleado
+    """
+    try:
+        from .repositorio import abrir_repositorio
+    except ImportError:
+        from repositorio import abrir_repositorio
+
+    inicio = time.perf_counter()
+    opciones = {"procesos": procesos} if procesos and os.path.isdir(archivo) else {}
+    repositorio = abrir_repositorio(archivo, **opciones)
+    try:
+        invalidos = repositorio.revalidar()
+    finally:
+        repositorio.cerrar()
+
+    destino = open(salida, "w", encoding="utf-8") if salida else sys.stdout
+    try:
+        for id_registro, errores in invalidos:
+            destino.write(json.dumps({"id": id_registro, "errores": errores}, ensure_ascii=False) + "\n")
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+    return {
+        "invalidos": len(invalidos),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+
+
+def entero_positivo(texto):
+    """Tipo de argparse para los tamaños de lote o bloque: un entero mayor que 0"""
+    import argparse
+    valor = int(texto)
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"debe ser un entero mayor que 0: {texto}")
+    return valor
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.bulk",
+        description="Validación masiva de registros de vehículos"
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    validar = subparsers.add_parser(
+        "validar", aliases=["validate"],
+        help="Valida un archivo CSV o JSONL y reporta los errores por fila"
+    )
+    validar.add_argument("entrada", help="Archivo CSV (con encabezado), JSONL o arreglo JSON")
+    validar.add_argument(
+        "-o", "--salida",
+        help="Archivo de reporte (.jsonl o .csv). Por defecto, salida estándar"
+    )
+    validar.add_argument("--formato", choices=("csv", "jsonl", "json"),
+                         help="Formato de entrada; por defecto según la extensión")
+    validar.add_argument("--tamano-lote", type=entero_positivo, default=TAMANO_LOTE,
+                         help="Filas por lote enviado a cada proceso")
+    validar.add_argument("--procesos", type=int, default=None,
+                         help="Procesos trabajadores; por defecto, uno por núcleo")
+    validar.add_argument("--metricas",
+                         help="Guarda las métricas de validación en este archivo (.json o .prom)")
+
+    revalidar = subparsers.add_parser(
+        "revalidar",
+        help="Vuelve a validar los registros guardados en un almacén"
+    )
+    revalidar.add_argument("--archivo", default=os.environ.get("REGISTROS_VEHICULOS", "registros_vehiculos.jsonl"),
+                           help="Almacén de registros (.jsonl, .db o directorio .particiones)")
+    revalidar.add_argument(
+        "-o", "--salida",
+        help="Archivo JSONL con los registros inválidos. Por defecto, salida estándar"
+    )
+    revalidar.add_argument("--procesos", type=int, default=None,
+                           help="Procesos trabajadores del almacén particionado; por defecto, uno por núcleo")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    args = crear_parser().parse_args(argv)
+    if args.comando == "revalidar":
+        resumen = revalidar_almacen(args.archivo, salida=args.salida, procesos=args.procesos)
+        print(json.dumps(resumen, ensure_ascii=False), file=sys.stderr)
+        return 1 if resumen["invalidos"] else 0
+
+    resumen = validar_archivo(
+        args.entrada,
+        salida=args.salida,
+        formato=args.formato,
+        tamano_lote=args.tamano_lote,
+        procesos=args.procesos,
+    )
+    print(json.dumps(resumen, ensure_ascii=False), file=sys.stderr)
+    if args.metricas:
+        metricas.guardar(args.metricas)
+    return 1 if resumen["invalidas"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
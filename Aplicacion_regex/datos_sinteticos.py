@@ -0,0 +1,192 @@
+import argparse
+import json
+import random
+import sys
+
+try:
+    from .validacion import CAMPOS
+except ImportError:
+    from validacion import CAMPOS
+
+NOMBRES = (
+    "José", "María", "Juan", "Luisa", "Andrés", "Valentina", "Carlos", "Sofía",
+    "Camilo", "Daniela", "Julián", "Mariana", "Sebastián", "Lucía", "Nicolás",
+    "Ángela", "Iván", "Natalia", "Óscar", "Paula", "Tomás", "Verónica"
+)
+APELLIDOS = (
+    "Rodríguez", "Gómez", "González", "Martínez", "García", "López", "Hernández",
+    "Sánchez", "Ramírez", "Pérez", "Díaz", "Muñoz", "Rojas", "Moreno", "Jiménez",
+    "Ayala", "Flórez", "Castaño", "Vargas", "Ospina", "Peña", "Quintero"
+)
+MARCAS = (
+    "Chevrolet", "Renault", "Mazda", "Kia", "Toyota", "Nissan", "Suzuki",
+    "Hyundai", "Ford", "Volkswagen", "Yamaha", "Auteco"
+)
+COLORES = ("Blanco", "Gris", "Negro", "Rojo", "Azul", "Plata", "Verde", "Amarillo")
+DOMINIOS = ("gmail.com", "hotmail.com", "outlook.com", "yahoo.es", "une.net.co")
+
+# Cantidad de placas distintas con el formato ABC123 (26³ · 10³)
+PLACAS_POSIBLES = 26 ** 3 * 1000
+
+# Multiplicador coprimo con PLACAS_POSIBLES: reparte las placas consecutivas
+_SALTO_PLACA = 7_368_787
+
+_LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Los números de chasis (VIN) no usan I, O ni Q
+_CARACTERES_VIN = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+_BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_SIN_TILDES = str.maketrans("áéíóúñÁÉÍÓÚÑ", "aeiounAEIOUN")
+
+
+def _base36(numero, largo):
+    """
+    Representa un número en base 36 con el largo dado
+    """
+    digitos = []
+    for _ in range(largo):
+        numero, resto = divmod(numero, 36)
+        digitos.append(_BASE36[resto])
+    return "".join(reversed(digitos))
+
+
+class GeneradorRegistros:
+    """
+    Genera registros de vehículos colombianos sintéticos y reproducibles:
+    la misma semilla y el mismo número de registro dan siempre el mismo
+    resultado. Placa y chasis son únicos para cada número de registro
+    (hasta PLACAS_POSIBLES registros).
+
+    proporcion_invalidos: fracción de registros con un campo inválido
+    """
+
+    def __init__(self, semilla=0, proporcion_invalidos=0.0):
+        self.semilla = semilla
+        self.proporcion_invalidos = proporcion_invalidos
+
+    def _azar(self, numero):
+        """
+        Generador aleatorio propio de cada número de registro
+        """
+        return random.Random(self.semilla * 1_000_003 + numero)
+
+    def placa(self, numero, azar=None):
+        """
+        Placa única: ABC123 para carros o ABC12D para motos
+        """
+        azar = azar or self._azar(numero)
+        codigo = (numero * _SALTO_PLACA) % PLACAS_POSIBLES
+        codigo, digitos = divmod(codigo, 1000)
+        letras = "".join(_LETRAS[(codigo // 26 ** i) % 26] for i in (2, 1, 0))
+        if azar.random() < 0.2:
+            return f"{letras}{digitos // 10:02d}{_LETRAS[digitos % 26]}"
+        return f"{letras}{digitos:03d}"
+
+    def chasis(self, numero, azar=None):
+        """
+        Número de chasis de 17 caracteres: 11 al azar y 6 que codifican
+        el número de registro, así que no se repite
+        """
+        azar = azar or self._azar(numero)
+        prefijo = "".join(azar.choice(_CARACTERES_VIN) for _ in range(11))
+        return prefijo + _base36(numero, 6)
+
+    def registro(self, numero):
+        """
+        Registro válido (o, según proporcion_invalidos, con un campo
+        inválido) para el número dado
+        """
+        azar = self._azar(numero)
+        nombre = azar.choice(NOMBRES)
+        apellido = azar.choice(APELLIDOS)
+        segundo = azar.choice(APELLIDOS)
+        usuario = f"{nombre}.{apellido}".lower().translate(_SIN_TILDES)
+        registro = {
+            "placa": self.placa(numero, azar),
+            "marca": azar.choice(MARCAS),
+            "modelo": str(azar.randint(1990, 2026)),
+            "color": azar.choice(COLORES),
+            "chasis": self.chasis(numero, azar),
+            "motor": "".join(azar.choice(_CARACTERES_VIN) for _ in range(azar.randint(8, 12))),
+            "cedula": str(azar.randint(1_000_000, 1_999_999_999)),
+            "nombre": f"{nombre} {apellido} {segundo}",
+            "correo": f"{usuario}{numero}@{azar.choice(DOMINIOS)}",
+            "telefono": f"3{azar.randint(0, 50):02d}{azar.randint(0, 9_999_999):07d}",
+        }
+        if azar.random() < self.proporcion_invalidos:
+            campo = azar.choice(CAMPOS)
+            registro[campo] = self.valor_invalido(campo, azar)
+        return registro
+
+    def registros(self, cantidad, desde=0):
+        """
+        Genera los registros [desde, desde + cantidad)
+        """
+        for numero in range(desde, desde + cantidad):
+            yield self.registro(numero)
+
+    def valor_invalido(self, campo, azar=None):
+        """
+        Valor que no cumple la regla del campo
+        """
+        azar = azar or random.Random(self.semilla)
+        return azar.choice(VALORES_INVALIDOS[campo])
+
+    def valores(self, campo, cantidad, proporcion_invalidos=0.5):
+        """
+        Lista de valores de un campo, con la proporción de inválidos dada
+        """
+        azar = random.Random(self.semilla)
+        valores = []
+        for numero in range(cantidad):
+            if azar.random() < proporcion_invalidos:
+                valores.append(self.valor_invalido(campo, azar))
+            else:
+                valores.append(self.registro(numero)[campo])
+        return valores
+
+
+# Ejemplos de valores inválidos por campo (incluye vacíos)
+VALORES_INVALIDOS = {
+    "placa": ("AB1234", "ABCD12", "123ABC", "AB-123", "ABC1234", ""),
+    "marca": ("Mazda3", "K1a", "Ford!", "", "   "),
+    "modelo": ("1899", "2027", "20a0", "95", ""),
+    "color": ("Rojo Oscuro", "Azul2", "Gris-Plata", ""),
+    "chasis": ("9BWZZZ377VT00425", "9BWZZZ377VT0042511", "9BWZZZ377VT00-425", ""),
+    "motor": ("ABC-123", "MOT 001", "X#1", ""),
+    "cedula": ("123456", "12345678901", "10A5678", ""),
+    "nombre": ("Juan2 Pérez", "Ana_María", "José@", ""),
+    "correo": ("usuario.gmail.com", "usuario@", "@dominio.co", "a b@c.co", ""),
+    "telefono": ("300123456", "30012345678", "300-1234567", ""),
+}
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.datos_sinteticos",
+        description="Genera registros de vehículos sintéticos en JSON por líneas"
+    )
+    parser.add_argument("cantidad", type=int, help="Cantidad de registros")
+    parser.add_argument("-o", "--salida", help="Archivo .jsonl. Por defecto, salida estándar")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--invalidos", type=float, default=0.0,
+                        help="Proporción de registros con un campo inválido (0 a 1)")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    args = crear_parser().parse_args(argv)
+    generador = GeneradorRegistros(args.semilla, args.invalidos)
+    salida = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    try:
+        for registro in generador.registros(args.cantidad):
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
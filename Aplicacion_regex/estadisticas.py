@@ -0,0 +1,254 @@
+from heapq import nsmallest
+
+try:
+    from .indice_busqueda import plegar
+except ImportError:
+    from indice_busqueda import plegar
+
+# Columnas que se agrupan por valor (sin distinguir mayúsculas ni tildes)
+# y la de los modelos, que se agrupa por década
+AGRUPACIONES = ("marca", "color", "decada")
+
+# Propietarios con más vehículos que se muestran en el resumen
+MAYORES_PROPIETARIOS = 10
+
+
+def decada(modelo):
+    """
+    Década de un modelo ("1990" para 1994), o "" si no es un año
+    """
+    modelo = (modelo or "").strip()
+    if len(modelo) != 4 or not modelo.isdigit():
+        return ""
+    return modelo[:3] + "0"
+
+
+def etiqueta_decada(clave):
+    """
+    Texto de una década para mostrar: "1990-1999"
+    """
+    return f"{clave}-{int(clave) + 9}" if clave else "Sin modelo"
+
+
+def clave_texto(texto):
+    """
+    Clave de agrupación de una marca o un color: plegar(), con un atajo
+    para las palabras ASCII de solo letras
+    """
+    return texto.lower() if texto.isascii() and texto.isalpha() else plegar(texto)
+
+
+def claves_conteo(registro):
+    """
+    [(agrupación, clave, etiqueta)] de los conteos a los que suma un
+    registro: marca, color, década y, si la tiene, su cédula
+    """
+    marca = (registro.marca or "").strip()
+    color = (registro.color or "").strip()
+    claves = [
+        ("marca", clave_texto(marca), marca),
+        ("color", clave_texto(color), color),
+        ("decada", decada(registro.modelo), ""),
+    ]
+    cedula = (registro.cedula or "").strip().upper()
+    if cedula:
+        claves.append(("cedula", cedula, ""))
+    return claves
+
+
+def armar_resumen(total, conteos, propietarios, propietarios_varios, mayores_propietarios):
+    """
+    Diccionario de resumen común a todos los almacenes: el total, los
+    conteos por marca y por color (de mayor a menor), por década (en orden
+    cronológico) y los propietarios: cuántos hay, cuántos tienen varios
+    vehículos y [(cédula, cantidad)] de los que tienen más (a igual
+    cantidad, por cédula).
+    conteos = {agrupación: [(clave, etiqueta, cantidad), ...]}
+    """
+    def por_cantidad(agrupacion, sin_valor):
+        return sorted(((etiqueta or sin_valor, cantidad) for _, etiqueta, cantidad in conteos[agrupacion]),
+                      key=lambda par: (-par[1], par[0]))
+
+    decadas = sorted(conteos["decada"], key=lambda conteo: conteo[0] or "9999")
+    return {
+        "total": total,
+        "por_marca": por_cantidad("marca", "Sin marca"),
+        "por_color": por_cantidad("color", "Sin color"),
+        "por_decada": [(etiqueta_decada(clave), cantidad) for clave, _, cantidad in decadas],
+        "propietarios": propietarios,
+        "propietarios_varios": propietarios_varios,
+        "mayores_propietarios": [tuple(par) for par in mayores_propietarios],
+    }
+
+
+class EstadisticasRegistros:
+    """
+    Conteos agregados de los registros: vehículos por marca, por color y
+    por década del modelo, y propietarios (cédulas) con varios vehículos.
+    agregar() y quitar() son O(1), así que el almacén los mantiene con cada
+    alta y eliminación y pedir el resumen no recorre los registros
+    """
+
+    def __init__(self):
+        self.total = 0
+        # {agrupación: {clave: [etiqueta, cantidad]}}: la etiqueta es el
+        # primer valor visto con esa clave, tal como se escribió
+        self._conteos = {agrupacion: {} for agrupacion in AGRUPACIONES}
+        self._por_cedula = {}
+        # Subconjunto de _por_cedula con las cédulas de 2 o más vehículos
+        self._varios = {}
+
+    def _sumar(self, conteos, clave, etiqueta):
+        conteo = conteos.get(clave)
+        if conteo is None:
+            conteos[clave] = [etiqueta, 1]
+        else:
+            conteo[1] += 1
+
+    def _restar(self, conteos, clave):
+        conteo = conteos.get(clave)
+        if conteo is not None:
+            conteo[1] -= 1
+            if conteo[1] <= 0:
+                del conteos[clave]
+
+    def agregar(self, registro):
+        """
+        Cuenta un registro nuevo
+        """
+        self.total += 1
+        conteos = self._conteos
+        marca = (registro.marca or "").strip()
+        color = (registro.color or "").strip()
+        self._sumar(conteos["marca"], clave_texto(marca), marca)
+        self._sumar(conteos["color"], clave_texto(color), color)
+        self._sumar(conteos["decada"], decada(registro.modelo), "")
+        cedula = (registro.cedula or "").strip().upper()
+        if cedula:
+            cantidad = self._por_cedula.get(cedula, 0) + 1
+            self._por_cedula[cedula] = cantidad
+            if cantidad > 1:
+                self._varios[cedula] = cantidad
+
+    def quitar(self, registro):
+        """
+        Descuenta un registro eliminado
+        """
+        self.total -= 1
+        conteos = self._conteos
+        self._restar(conteos["marca"], clave_texto((registro.marca or "").strip()))
+        self._restar(conteos["color"], clave_texto((registro.color or "").strip()))
+        self._restar(conteos["decada"], decada(registro.modelo))
+        cedula = (registro.cedula or "").strip().upper()
+        cantidad = self._por_cedula.get(cedula)
+        if cantidad is None:
+            return
+        if cantidad <= 1:
+            del self._por_cedula[cedula]
+        else:
+            self._por_cedula[cedula] = cantidad - 1
+        if cantidad <= 2:
+            self._varios.pop(cedula, None)
+        else:
+            self._varios[cedula] = cantidad - 1
+
+    def sumar(self, otras):
+        """
+        Suma a estas los conteos de otras estadísticas (por ejemplo, de otra
+        partición del almacén). Una cédula puede tener vehículos en varias
+        particiones, así que sus conteos se suman uno a uno
+        """
+        self.total += otras.total
+        for agrupacion, conteos in otras._conteos.items():
+            propios = self._conteos[agrupacion]
+            for clave, (etiqueta, cantidad) in conteos.items():
+                conteo = propios.get(clave)
+                if conteo is None:
+                    propios[clave] = [etiqueta, cantidad]
+                else:
+                    conteo[1] += cantidad
+        por_cedula = self._por_cedula
+        for cedula, cantidad in otras._por_cedula.items():
+            cantidad += por_cedula.get(cedula, 0)
+            por_cedula[cedula] = cantidad
+            if cantidad > 1:
+                self._varios[cedula] = cantidad
+
+    def resumen(self, mayores=MAYORES_PROPIETARIOS):
+        """
+        Resumen de los conteos (ver armar_resumen). Solo ordena los grupos,
+        no los registros
+        """
+        return armar_resumen(
+            self.total,
+            {
+                agrupacion: [(clave, etiqueta, cantidad) for clave, (etiqueta, cantidad) in conteos.items()]
+                for agrupacion, conteos in self._conteos.items()
+            },
+            len(self._por_cedula),
+            len(self._varios),
+            nsmallest(mayores, self._varios.items(), key=lambda par: (-par[1], par[0])),
+        )
+
+    def a_dict(self):
+        """
+        Conteos por agrupación para guardarlos junto al almacén. Los conteos
+        por cédula no se incluyen: se reconstruyen con desde_dict() a partir
+        de las cédulas de los registros
+        """
+        return {
+            "total": self.total,
+            "conteos": {
+                agrupacion: {clave: list(conteo) for clave, conteo in conteos.items()}
+                for agrupacion, conteos in self._conteos.items()
+            },
+        }
+
+    @classmethod
+    def desde_dict(cls, datos, cedulas):
+        """
+        Reconstruye las estadísticas guardadas con a_dict(). `cedulas` son
+        las cédulas de los registros, ya normalizadas (una por registro)
+        """
+        estadisticas = cls()
+        estadisticas.total = datos["total"]
+        for agrupacion in AGRUPACIONES:
+            estadisticas._conteos[agrupacion] = dict(datos["conteos"][agrupacion])
+        por_cedula = estadisticas._por_cedula
+        for cedula in cedulas:
+            if cedula:
+                por_cedula[cedula] = por_cedula.get(cedula, 0) + 1
+        estadisticas._varios = {cedula: cantidad for cedula, cantidad in por_cedula.items() if cantidad > 1}
+        return estadisticas
+
+    @classmethod
+    def desde_registros(cls, registros):
+        """
+        Calcula las estadísticas recorriendo los registros
+        """
+        estadisticas = cls()
+        for registro in registros:
+            estadisticas.agregar(registro)
+        return estadisticas
+
+
+def formatear_resumen(resumen):
+    """
+    Texto de un resumen de estadísticas, para la ventana y la consola
+    """
+    lineas = [f"Total de vehículos: {resumen['total']}", ""]
+    for titulo, clave in (("Por marca", "por_marca"), ("Por color", "por_color"),
+                          ("Por década del modelo", "por_decada")):
+        lineas.append(titulo.upper())
+        for etiqueta, cantidad in resumen[clave]:
+            lineas.append(f"  {etiqueta:<30} {cantidad:>8}")
+        lineas.append("")
+    lineas.append("PROPIETARIOS")
+    lineas.append(f"  {'Propietarios distintos':<30} {resumen['propietarios']:>8}")
+    lineas.append(f"  {'Con varios vehículos':<30} {resumen['propietarios_varios']:>8}")
+    if resumen["mayores_propietarios"]:
+        lineas.append("")
+        lineas.append("PROPIETARIOS CON MÁS VEHÍCULOS (cédula)")
+        for cedula, cantidad in resumen["mayores_propietarios"]:
+            lineas.append(f"  {cedula:<30} {cantidad:>8}")
+    return "\n".join(lineas)
@@ -0,0 +1,319 @@
+import csv
+import json
+import os
+import struct
+import sys
+import time
+import uuid
+from array import array
+
+# argparse se importa donde se usa: la interfaz gráfica importa este
+# módulo solo para exportar
+
+try:
+    from .bulk import entero_positivo, iterar_lotes
+    from .repositorio import abrir_repositorio, modelo_en_rango, validar_filtros
+    from .validacion import CAMPOS
+except ImportError:
+    from bulk import entero_positivo, iterar_lotes
+    from repositorio import abrir_repositorio, modelo_en_rango, validar_filtros
+    from validacion import CAMPOS
+
+# Columnas exportadas: el id estable y los campos del registro
+COLUMNAS = ("id",) + CAMPOS
+
+# Registros que se leen del almacén y se escriben de una vez
+TAMANO_BLOQUE = 10000
+
+FORMATOS = ("csv", "jsonl", "columnas")
+EXTENSION_COLUMNAS = ".vcol"
+
+# Formato columnar (little-endian), escrito y leído por bloques:
+#
+#   encabezado  ENCABEZADO_COLUMNAS: magia, versión, cantidad de columnas y
+#               bytes de los nombres; después los nombres en UTF-8
+#               separados por el carácter nulo
+#   bloques     BLOQUE con la cantidad de filas y, por cada columna,
+#               COLUMNA (ancho en bytes de los índices, cantidad de valores
+#               distintos, bytes del texto), los desplazamientos de cada
+#               valor distinto (uint32, uno más que los valores), el texto
+#               UTF-8 de los valores distintos y el índice de cada fila en
+#               ese diccionario (uint8, uint16 o uint32)
+#   fin         un BLOQUE con 0 filas
+MAGIA_COLUMNAS = b"VEHCOL\x00\x01"
+VERSION_COLUMNAS = 1
+ENCABEZADO_COLUMNAS = struct.Struct("<8sHHI")
+BLOQUE = struct.Struct("<I")
+COLUMNA = struct.Struct("<BII")
+TIPOS_INDICE = {1: 'B', 2: 'H', 4: 'I'}
+
+
+def detectar_formato(ruta):
+    """
+    Deduce el formato de exportación por la extensión (csv, jsonl o columnas)
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == EXTENSION_COLUMNAS:
+        return "columnas"
+    return "csv"
+
+
+def interpretar_filtros(textos):
+    """
+    Convierte textos "campo=valor" en {campo: valor}. Lanza ValueError si
+    alguno no tiene "=" o el campo no existe
+    """
+    filtros = {}
+    for texto in textos:
+        campo, separador, valor = texto.partition("=")
+        if not separador:
+            raise ValueError(f"Filtro inválido (se esperaba campo=valor): {texto}")
+        filtros[campo.strip().lower()] = valor.strip()
+    validar_filtros(filtros)
+    return filtros
+
+
+def _a_little_endian(indices):
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices
+
+
+class EscritorCSV:
+    """Escribe los registros como CSV con encabezado"""
+
+    binario = False
+
+    def __init__(self, archivo):
+        self.escritor = csv.writer(archivo)
+        self.escritor.writerow(COLUMNAS)
+
+    def escribir(self, registros):
+        self.escritor.writerows((registro.id,) + registro.valores() for registro in registros)
+
+    def terminar(self):
+        pass
+
+
+class EscritorJSONL:
+    """Escribe un objeto JSON por línea"""
+
+    binario = False
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def escribir(self, registros):
+        self.archivo.write("".join(
+            json.dumps(registro.a_dict(), ensure_ascii=False) + "\n" for registro in registros
+        ))
+
+    def terminar(self):
+        pass
+
+
+class EscritorColumnas:
+    """
+    Escribe el formato columnar: cada bloque guarda cada columna como un
+    diccionario de valores distintos más un índice por fila, así que las
+    columnas repetitivas (marca, color, modelo) ocupan unos pocos bytes
+    por fila
+    """
+
+    binario = True
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        nombres = "\0".join(COLUMNAS).encode("utf-8")
+        archivo.write(ENCABEZADO_COLUMNAS.pack(MAGIA_COLUMNAS, VERSION_COLUMNAS, len(COLUMNAS), len(nombres)))
+        archivo.write(nombres)
+
+    def escribir(self, registros):
+        if not registros:
+            return
+        self.archivo.write(BLOQUE.pack(len(registros)))
+        filas = [(registro.id,) + registro.valores() for registro in registros]
+        for valores in zip(*filas):
+            posiciones = {}
+            indices = [posiciones.setdefault(valor, len(posiciones)) for valor in valores]
+            textos = [valor.encode("utf-8") for valor in posiciones]
+            desplazamientos = array('I', [0])
+            for texto in textos:
+                desplazamientos.append(desplazamientos[-1] + len(texto))
+            ancho = 1 if len(textos) <= 0xFF else 2 if len(textos) <= 0xFFFF else 4
+            self.archivo.write(COLUMNA.pack(ancho, len(textos), desplazamientos[-1]))
+            self.archivo.write(_a_little_endian(desplazamientos).tobytes())
+            self.archivo.write(b"".join(textos))
+            self.archivo.write(_a_little_endian(array(TIPOS_INDICE[ancho], indices)).tobytes())
+
+    def terminar(self):
+        self.archivo.write(BLOQUE.pack(0))
+
+
+ESCRITORES = {"csv": EscritorCSV, "jsonl": EscritorJSONL, "columnas": EscritorColumnas}
+
+
+def _leer(archivo, largo):
+    datos = archivo.read(largo)
+    if len(datos) != largo:
+        raise ValueError("archivo columnar truncado")
+    return datos
+
+
+def _leer_arreglo(archivo, tipo, cantidad):
+    arreglo = array(tipo)
+    arreglo.frombytes(_leer(archivo, cantidad * arreglo.itemsize))
+    return _a_little_endian(arreglo)
+
+
+def iterar_bloques_columnas(ruta):
+    """
+    Genera cada bloque de un archivo columnar como {columna: lista de
+    valores}. Solo un bloque está en memoria a la vez
+    """
+    with open(ruta, "rb") as archivo:
+        magia, version, cantidad_columnas, largo_nombres = ENCABEZADO_COLUMNAS.unpack(
+            _leer(archivo, ENCABEZADO_COLUMNAS.size)
+        )
+        if magia != MAGIA_COLUMNAS or version != VERSION_COLUMNAS:
+            raise ValueError(f"{ruta} no es un archivo columnar de registros")
+        columnas = _leer(archivo, largo_nombres).decode("utf-8").split("\0")
+        if len(columnas) != cantidad_columnas:
+            raise ValueError("encabezado columnar inconsistente")
+        while True:
+            (filas,) = BLOQUE.unpack(_leer(archivo, BLOQUE.size))
+            if not filas:
+                return
+            bloque = {}
+            for columna in columnas:
+                ancho, cantidad, largo_texto = COLUMNA.unpack(_leer(archivo, COLUMNA.size))
+                if ancho not in TIPOS_INDICE:
+                    raise ValueError(f"ancho de índice inválido en la columna {columna}")
+                desplazamientos = _leer_arreglo(archivo, 'I', cantidad + 1)
+                texto = _leer(archivo, largo_texto)
+                diccionario = [
+                    texto[inicio:fin].decode("utf-8")
+                    for inicio, fin in zip(desplazamientos, desplazamientos[1:])
+                ]
+                bloque[columna] = list(map(diccionario.__getitem__, _leer_arreglo(archivo, TIPOS_INDICE[ancho], filas)))
+            yield bloque
+
+
+def leer_columnas(ruta):
+    """
+    Genera los registros de un archivo columnar como diccionarios
+    """
+    for bloque in iterar_bloques_columnas(ruta):
+        columnas = list(bloque)
+        for valores in zip(*bloque.values()):
+            yield dict(zip(columnas, valores))
+
+
+def exportar(repositorio, ruta, formato=None, filtros=None, modelo_desde=None,
+             modelo_hasta=None, tamano_bloque=TAMANO_BLOQUE, al_progreso=None):
+    """
+    Exporta los registros del repositorio a CSV, JSONL o al formato columnar,
+    leyéndolos y escribiéndolos por bloques de tamano_bloque. filtros es
+    {campo: valor} con igualdad exacta, como en Repositorio.filtrar, y el
+    modelo puede limitarse a un rango. al_progreso(fracción) se llama tras
+    cada bloque y puede lanzar una excepción para cancelar. Se escribe en
+    un temporal que reemplaza a `ruta` solo al terminar.
+    Retorna un resumen con los registros leídos, los exportados y el tiempo
+    """
+    formato = formato or detectar_formato(ruta)
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    if tamano_bloque < 1:
+        raise ValueError(f"El tamaño de bloque debe ser mayor que 0: {tamano_bloque}")
+    condiciones = [(campo, str(valor)) for campo, valor in (filtros or {}).items()]
+    validar_filtros(dict(condiciones))
+
+    inicio = time.perf_counter()
+    total = max(1, repositorio.contar())
+    leidos = exportados = 0
+    clase = ESCRITORES[formato]
+    temporal = f"{ruta}.{uuid.uuid4().hex[:8]}.parcial"
+    try:
+        if clase.binario:
+            archivo = open(temporal, "wb")
+        else:
+            archivo = open(temporal, "w", encoding="utf-8", newline="")
+        with archivo:
+            escritor = clase(archivo)
+            for bloque in iterar_lotes(repositorio.iterar(), tamano_bloque):
+                leidos += len(bloque)
+                if condiciones or modelo_desde is not None or modelo_hasta is not None:
+                    bloque = [
+                        registro for registro in bloque
+                        if all(getattr(registro, campo) == valor for campo, valor in condiciones)
+                        and modelo_en_rango(registro.modelo, modelo_desde, modelo_hasta)
+                    ]
+                escritor.escribir(bloque)
+                exportados += len(bloque)
+                if al_progreso is not None:
+                    al_progreso(min(1.0, leidos / total))
+            escritor.terminar()
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "leidos": leidos,
+        "exportados": exportados,
+        "segundos": round(duracion, 3),
+        "registros_por_segundo": round(leidos / duracion) if duracion else 0,
+    }
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.exportacion",
+        description="Exporta los registros de vehículos a CSV, JSONL o formato columnar"
+    )
+    parser.add_argument("salida", help=f"Archivo de salida (.csv, .jsonl o {EXTENSION_COLUMNAS})")
+    parser.add_argument("--archivo", default=os.environ.get("REGISTROS_VEHICULOS", "registros_vehiculos.jsonl"),
+                        help="Archivo de registros (.jsonl o .db)")
+    parser.add_argument("--formato", choices=FORMATOS,
+                        help="Formato de salida; por defecto según la extensión")
+    parser.add_argument("--filtro", action="append", default=[], metavar="CAMPO=VALOR",
+                        help="Exporta solo los registros con ese valor exacto (se puede repetir)")
+    parser.add_argument("--modelo-desde", type=int, help="Año de modelo mínimo")
+    parser.add_argument("--modelo-hasta", type=int, help="Año de modelo máximo")
+    parser.add_argument("--tamano-bloque", type=entero_positivo, default=TAMANO_BLOQUE,
+                        help="Registros leídos y escritos por bloque")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    try:
+        filtros = interpretar_filtros(args.filtro)
+    except ValueError as e:
+        parser.error(str(e))
+    repositorio = abrir_repositorio(args.archivo)
+    try:
+        resumen = exportar(
+            repositorio, args.salida,
+            formato=args.formato,
+            filtros=filtros,
+            modelo_desde=args.modelo_desde,
+            modelo_hasta=args.modelo_hasta,
+            tamano_bloque=args.tamano_bloque,
+        )
+    finally:
+        repositorio.cerrar()
+    print(json.dumps(resumen, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
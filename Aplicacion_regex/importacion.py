@@ -0,0 +1,220 @@
+import json
+import os
+import sys
+import time
+from functools import partial
+
+# argparse se importa donde se usa: la interfaz gráfica importa este
+# módulo solo para importar archivos
+
+try:
+    from .bulk import ReporteErrores, detectar_formato, entero_positivo, iterar_lotes, leer_filas, validar_lote
+    from .repositorio import RegistroDuplicadoError, abrir_repositorio
+    from .validacion import CAMPOS
+except ImportError:
+    from bulk import ReporteErrores, detectar_formato, entero_positivo, iterar_lotes, leer_filas, validar_lote
+    from repositorio import RegistroDuplicadoError, abrir_repositorio
+    from validacion import CAMPOS
+
+# Filas por lote: se validan juntas y las válidas se guardan en una sola
+# transacción (una escritura y un fsync en el almacén JSON por líneas)
+TAMANO_LOTE = 5000
+
+# Campos únicos, con el mensaje de rechazo y el método del repositorio
+# que busca un registro por ese campo
+UNICOS = (
+    ("placa", "Placa ya registrada", "buscar_por_placa"),
+    ("chasis", "Chasis ya registrado", "buscar_por_chasis"),
+)
+
+
+def estimar_filas(ruta, formato=None):
+    """
+    Cantidad aproximada de filas de un archivo, para informar el avance:
+    las líneas en CSV (sin el encabezado) y JSONL, o las llaves de apertura
+    en un arreglo JSON. Lee el archivo por bloques sin interpretarlo
+    """
+    formato = formato or detectar_formato(ruta)
+    marca = b"{" if formato == "json" else b"\n"
+    with open(ruta, "rb") as archivo:
+        cantidad = sum(bloque.count(marca) for bloque in iter(partial(archivo.read, 1 << 20), b""))
+    if formato == "csv":
+        cantidad -= 1
+    return max(1, cantidad)
+
+
+def _clave(valor):
+    return str(valor if valor is not None else "").strip().upper()
+
+
+def _guardar_uno_a_uno(repositorio, filas):
+    """
+    Guarda las filas de a una: último recurso si otro proceso registró la
+    misma placa o chasis mientras se importaba el lote
+    """
+    guardadas, rechazadas = 0, []
+    for numero, registro in filas:
+        try:
+            repositorio.agregar(registro)
+            guardadas += 1
+        except RegistroDuplicadoError as e:
+            rechazadas.append((numero, {e.campo: e.mensaje}))
+    return guardadas, rechazadas
+
+
+def guardar_lote(repositorio, filas):
+    """
+    Guarda [(número de fila, registro)] en una sola transacción. Si alguna
+    placa o chasis ya existe (en el almacén o repetido en el mismo lote),
+    se separan las filas duplicadas y las demás se guardan juntas.
+    Retorna (cantidad guardada, [(fila, {campo: mensaje})] rechazadas)
+    """
+    if not filas:
+        return 0, []
+    try:
+        repositorio.agregar_lote([registro for _, registro in filas])
+        return len(filas), []
+    except RegistroDuplicadoError:
+        pass
+
+    vistos = {campo: set() for campo, _, _ in UNICOS}
+    nuevas, rechazadas = [], []
+    for numero, registro in filas:
+        for campo, mensaje, buscar in UNICOS:
+            clave = _clave(registro.get(campo))
+            if clave in vistos[campo] or getattr(repositorio, buscar)(clave) is not None:
+                rechazadas.append((numero, {campo: mensaje}))
+                break
+        else:
+            for campo, _, _ in UNICOS:
+                vistos[campo].add(_clave(registro.get(campo)))
+            nuevas.append((numero, registro))
+    if not nuevas:
+        return 0, rechazadas
+    try:
+        repositorio.agregar_lote([registro for _, registro in nuevas])
+        guardadas = len(nuevas)
+    except RegistroDuplicadoError:
+        guardadas, otras = _guardar_uno_a_uno(repositorio, nuevas)
+        rechazadas += otras
+    return guardadas, rechazadas
+
+
+def importar(repositorio, ruta, formato=None, reporte=None,
+             tamano_lote=TAMANO_LOTE, al_progreso=None):
+    """
+    Importa un archivo CSV (con encabezado), JSONL o arreglo JSON al
+    repositorio por lotes: cada lote se valida con las reglas de Validacion
+    y sus filas válidas se guardan en una sola transacción. Las filas
+    rechazadas (inválidas o con placa o chasis ya registrados) se escriben
+    en `reporte` (.jsonl o .csv, como el reporte de bulk) a medida que
+    aparecen. al_progreso(fracción) se llama tras cada lote y puede lanzar
+    una excepción para cancelar; los lotes ya guardados se conservan.
+    Retorna un resumen con el total de filas, las importadas, las
+    rechazadas y el tiempo empleado
+    """
+    if tamano_lote < 1:
+        raise ValueError(f"El tamaño de lote debe ser mayor que 0: {tamano_lote}")
+    formato = formato or detectar_formato(ruta)
+    inicio = time.perf_counter()
+    estimadas = estimar_filas(ruta, formato) if al_progreso is not None else 1
+    total = importadas = invalidas = duplicadas = 0
+
+    with ReporteErrores(reporte) if reporte else _SinReporte() as salida:
+        for lote in iterar_lotes(leer_filas(ruta, formato), tamano_lote):
+            total += len(lote)
+            _, errores_lote = validar_lote(lote)
+            invalidas += len(errores_lote)
+
+            con_error = {numero for numero, _ in errores_lote}
+            filas = [
+                (numero, dict(zip(CAMPOS, valores)))
+                for numero, valores in lote if numero not in con_error
+            ]
+            guardadas, rechazadas = guardar_lote(repositorio, filas)
+            importadas += guardadas
+            duplicadas += len(rechazadas)
+            if rechazadas:
+                errores_lote = sorted(errores_lote + rechazadas, key=lambda error: error[0])
+            salida.escribir(errores_lote)
+
+            if al_progreso is not None:
+                al_progreso(min(1.0, total / estimadas))
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "total": total,
+        "importadas": importadas,
+        "invalidas": invalidas,
+        "duplicadas": duplicadas,
+        "segundos": round(duracion, 3),
+        "filas_por_segundo": round(total / duracion) if duracion else 0,
+    }
+
+
+class _SinReporte:
+    """Reporte que descarta los errores, cuando no se pidió uno"""
+
+    def __enter__(self):
+        return self
+
+    def escribir(self, errores_lote):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+def convertir_reporte(origen, destino):
+    """
+    Copia un reporte JSONL de importación a `destino`, en CSV si termina en
+    .csv o en JSONL en otro caso, sin cargarlo completo
+    """
+    with open(origen, "r", encoding="utf-8") as archivo, ReporteErrores(destino) as salida:
+        for lineas in iterar_lotes(archivo, TAMANO_LOTE):
+            errores_lote = []
+            for linea in lineas:
+                if linea.strip():
+                    objeto = json.loads(linea)
+                    errores_lote.append((objeto["fila"], objeto["errores"]))
+            salida.escribir(errores_lote)
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.importacion",
+        description="Importa registros de vehículos desde CSV, JSONL o un arreglo JSON"
+    )
+    parser.add_argument("entrada", help="Archivo CSV (con encabezado), JSONL o arreglo JSON")
+    parser.add_argument("--archivo", default=os.environ.get("REGISTROS_VEHICULOS", "registros_vehiculos.jsonl"),
+                        help="Archivo de registros (.jsonl o .db)")
+    parser.add_argument("--formato", choices=("csv", "jsonl", "json"),
+                        help="Formato de entrada; por defecto según la extensión")
+    parser.add_argument("-o", "--reporte",
+                        help="Reporte de filas rechazadas (.jsonl o .csv)")
+    parser.add_argument("--tamano-lote", type=entero_positivo, default=TAMANO_LOTE,
+                        help="Filas validadas y guardadas por transacción")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    args = crear_parser().parse_args(argv)
+    repositorio = abrir_repositorio(args.archivo)
+    try:
+        resumen = importar(
+            repositorio, args.entrada,
+            formato=args.formato,
+            reporte=args.reporte,
+            tamano_lote=args.tamano_lote,
+        )
+    finally:
+        repositorio.cerrar()
+    print(json.dumps(resumen, ensure_ascii=False), file=sys.stderr)
+    return 1 if resumen["invalidas"] or resumen["duplicadas"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
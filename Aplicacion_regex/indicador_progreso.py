@@ -0,0 +1,80 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class IndicadorProgreso:
+    """
+    Barra de progreso con botón Cancelar para una tarea en segundo plano.
+    El contenedor queda siempre ubicado; sus elementos solo se ven mientras
+    hay una tarea en curso
+    """
+
+    def __init__(self, padre):
+        self.frame = tk.Frame(padre)
+        self.etiqueta = tk.Label(self.frame, text="", font=("Arial", 9), fg="#7f8c8d")
+        self.barra = ttk.Progressbar(self.frame, length=300, mode="determinate", maximum=1.0)
+        self.btn_cancelar = tk.Button(
+            self.frame,
+            text="Cancelar",
+            command=self.cancelar,
+            bg="#95a5a6",
+            fg="white",
+            font=("Arial", 9)
+        )
+        self.tarea = None
+        self.al_cancelar = None
+
+    def pack(self, **opciones):
+        """
+        Ubica el contenedor del indicador en la ventana
+        """
+        self.frame.pack(**opciones)
+
+    def mostrar(self, tarea, texto, al_cancelar=None):
+        """
+        Muestra el indicador para la tarea dada. al_cancelar() se llama
+        si el usuario cancela
+        """
+        self.tarea = tarea
+        self.al_cancelar = al_cancelar
+        self.etiqueta.config(text=texto)
+        self.barra.config(value=0)
+        self.etiqueta.pack(side=tk.LEFT, padx=5)
+        self.barra.pack(side=tk.LEFT, padx=5)
+        self.btn_cancelar.pack(side=tk.LEFT, padx=5)
+
+    def actualizar(self, fraccion, mensaje=None):
+        """
+        Actualiza el avance (0 a 1) y, si se indica, el texto
+        """
+        if not self.frame.winfo_exists():
+            return
+        self.barra.config(value=fraccion)
+        if mensaje:
+            self.etiqueta.config(text=mensaje)
+
+    def ocultar(self, tarea):
+        """
+        Oculta el indicador al terminar la tarea. Si el indicador ya muestra
+        otra tarea, no se toca
+        """
+        if tarea is not self.tarea:
+            return
+        self.tarea = None
+        self.al_cancelar = None
+        if not self.frame.winfo_exists():
+            return
+        for widget in (self.etiqueta, self.barra, self.btn_cancelar):
+            widget.pack_forget()
+
+    def cancelar(self):
+        """
+        Cancela la tarea en curso y oculta el indicador
+        """
+        al_cancelar = self.al_cancelar
+        tarea = self.tarea
+        if tarea is not None:
+            tarea.cancelar()
+        self.ocultar(tarea)
+        if al_cancelar is not None:
+            al_cancelar()
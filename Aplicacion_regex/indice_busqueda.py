@@ -0,0 +1,240 @@
+from array import array
+from bisect import bisect_left
+
+# Equivalencias sin tilde de los caracteres que admite Validacion
+_SIN_TILDES = str.maketrans("áéíóúüñÁÉÍÓÚÜÑ", "aeiouunaeiouun")
+
+# Largo de los n-gramas del vocabulario. Las palabras de la consulta más
+# cortas se buscan como prefijo; las demás, en cualquier parte de la palabra
+LARGO_NGRAMA = 3
+
+# Altas pendientes a partir de las cuales se reordena un índice de prefijos
+# completo en lugar de insertarlas una a una
+MAXIMO_INSERCIONES = 1000
+
+# Eliminaciones a partir de las cuales el índice se reconstruye con los
+# registros vivos, si además son al menos la mitad de sus entradas
+MINIMO_RECONSTRUCCION = 1000
+
+# Carácter mayor que cualquier otro: cierra el rango de un prefijo
+_FIN = "\U0010ffff"
+
+
+def plegar(texto):
+    """
+    Normaliza un texto para buscar: minúsculas, sin tildes ni eñes y con
+    los espacios repetidos reducidos a uno
+    """
+    return " ".join(str(texto or "").translate(_SIN_TILDES).lower().split())
+
+
+def _plegar_clave(texto):
+    """
+    plegar() para placas y cédulas, con un atajo para el texto ASCII
+    """
+    return texto.lower() if texto.isascii() and " " not in texto else plegar(texto)
+
+
+def ngramas(texto):
+    """
+    Conjunto de n-gramas de un texto ya plegado
+    """
+    return {texto[i:i + LARGO_NGRAMA] for i in range(len(texto) - LARGO_NGRAMA + 1)}
+
+
+def palabra_coincide(palabra, parte):
+    """
+    Indica si una palabra del registro coincide con una palabra de la
+    consulta: como prefijo si esta es corta, o en cualquier posición
+    """
+    if len(parte) < LARGO_NGRAMA:
+        return palabra.startswith(parte)
+    return parte in palabra
+
+
+def texto_coincide(nombre, marca, consulta):
+    """
+    Indica si cada palabra de la consulta (ya plegada) coincide con alguna
+    palabra del nombre o de la marca
+    """
+    palabras = f"{plegar(nombre)} {plegar(marca)}".split()
+    return all(
+        any(palabra_coincide(palabra, parte) for palabra in palabras)
+        for parte in consulta.split()
+    )
+
+
+def coincide(registro, consulta):
+    """
+    Indica si un registro coincide con una consulta ya plegada: placa o
+    cédula que empiezan por ella, o nombre y marca que contienen sus palabras
+    """
+    return (
+        plegar(registro.placa).startswith(consulta)
+        or plegar(registro.cedula).startswith(consulta)
+        or texto_coincide(registro.nombre, registro.marca, consulta)
+    )
+
+
+class _IndicePrefijos:
+    """
+    Claves ordenadas con un valor asociado, para encontrar por búsqueda
+    binaria todas las que empiezan por un prefijo.
+    Las altas se acumulan y se ordenan en la siguiente consulta
+    """
+
+    def __init__(self):
+        self._claves = []
+        self._valores = []
+        self._nuevas = []
+
+    def agregar(self, clave, valor):
+        self._nuevas.append((clave, valor))
+
+    def _ordenar(self):
+        """
+        Incorpora las altas pendientes: de a una si son pocas, o reordenando
+        todo si son muchas (por ejemplo, al construir el índice)
+        """
+        if len(self._nuevas) <= MAXIMO_INSERCIONES:
+            for clave, valor in self._nuevas:
+                posicion = bisect_left(self._claves, clave)
+                self._claves.insert(posicion, clave)
+                self._valores.insert(posicion, valor)
+        else:
+            pares = sorted(list(zip(self._claves, self._valores)) + self._nuevas)
+            self._claves = [clave for clave, _ in pares]
+            self._valores = [valor for _, valor in pares]
+        self._nuevas = []
+
+    def buscar(self, prefijo):
+        """
+        Valores de las claves que empiezan por el prefijo
+        """
+        if self._nuevas:
+            self._ordenar()
+        desde = bisect_left(self._claves, prefijo)
+        hasta = bisect_left(self._claves, prefijo + _FIN, desde)
+        return self._valores[desde:hasta]
+
+
+class IndiceBusqueda:
+    """
+    Índice en memoria para la búsqueda mientras se escribe:
+
+    - prefijos de placa y cédula en arreglos ordenados;
+    - palabras de nombre y marca sin tildes ni mayúsculas, cada una con la
+      lista de registros que la usan. Las palabras distintas (el
+      vocabulario, mucho menor que la cantidad de registros) se indexan
+      por prefijo y por n-gramas para encontrar las que contienen un texto.
+
+    Cada registro recibe un número interno creciente, así que los resultados
+    salen en orden de inserción. Las eliminaciones solo liberan el número y
+    las entradas muertas se descartan al consultar; cuando llegan a la mitad
+    del índice, este se reconstruye con los registros vivos
+    """
+
+    def __init__(self):
+        self._vaciar()
+
+    def _vaciar(self):
+        self._registros = []
+        self._eliminados = 0
+        self._numeros = {}
+        self._placas = _IndicePrefijos()
+        self._cedulas = _IndicePrefijos()
+        self._palabras = {}
+        self._vocabulario = _IndicePrefijos()
+        self._ngramas = {}
+        self._plegadas = {}
+
+    def agregar(self, registro):
+        """
+        Indexa un registro (un Vehiculo)
+        """
+        numero = len(self._registros)
+        self._registros.append(registro)
+        self._numeros[registro.id] = numero
+        self._placas.agregar(_plegar_clave(registro.placa), numero)
+        self._cedulas.agregar(_plegar_clave(registro.cedula), numero)
+
+        # Nombres y marcas repiten pocas palabras: cada una se pliega una vez
+        palabras = set()
+        for original in f"{registro.nombre} {registro.marca}".split():
+            palabra = self._plegadas.get(original)
+            if palabra is None:
+                palabra = self._plegadas[original] = plegar(original)
+            palabras.add(palabra)
+        for palabra in palabras:
+            numeros = self._palabras.get(palabra)
+            if numeros is None:
+                numeros = self._palabras[palabra] = array('I')
+                self._vocabulario.agregar(palabra, palabra)
+                for ngrama in ngramas(palabra):
+                    self._ngramas.setdefault(ngrama, set()).add(palabra)
+            numeros.append(numero)
+
+    def quitar(self, registro):
+        """
+        Marca un registro como eliminado
+        """
+        numero = self._numeros.pop(registro.id, None)
+        if numero is None:
+            return
+        self._registros[numero] = None
+        self._eliminados += 1
+        if self._eliminados >= MINIMO_RECONSTRUCCION and 2 * self._eliminados >= len(self._registros):
+            self._reconstruir()
+
+    def _reconstruir(self):
+        """
+        Vuelve a indexar solo los registros vivos, en el mismo orden: libera
+        los prefijos, palabras y n-gramas que solo usaban los eliminados
+        """
+        vivos = [registro for registro in self._registros if registro is not None]
+        self._vaciar()
+        for registro in vivos:
+            self.agregar(registro)
+
+    def _palabras_de(self, parte):
+        """
+        Palabras del vocabulario que coinciden con una palabra de la consulta
+        """
+        if len(parte) < LARGO_NGRAMA:
+            return self._vocabulario.buscar(parte)
+        candidatas = None
+        for ngrama in ngramas(parte):
+            palabras = self._ngramas.get(ngrama)
+            if not palabras:
+                return []
+            candidatas = set(palabras) if candidatas is None else candidatas & palabras
+        return [palabra for palabra in candidatas if parte in palabra]
+
+    def _por_texto(self, consulta):
+        """
+        Números de los registros en los que cada palabra de la consulta
+        coincide con alguna palabra del nombre o de la marca
+        """
+        resultado = None
+        for parte in consulta.split():
+            numeros = set()
+            for palabra in self._palabras_de(parte):
+                numeros.update(self._palabras[palabra])
+            resultado = numeros if resultado is None else resultado & numeros
+            if not resultado:
+                return set()
+        return resultado
+
+    def buscar(self, texto):
+        """
+        Retorna en orden de inserción los registros cuya placa o cédula
+        empiezan por el texto, o cuyo nombre y marca contienen sus palabras
+        """
+        consulta = plegar(texto)
+        if not consulta:
+            return []
+        numeros = self._por_texto(consulta)
+        numeros.update(self._placas.buscar(consulta))
+        numeros.update(self._cedulas.buscar(consulta))
+        registros = (self._registros[numero] for numero in sorted(numeros))
+        return [registro for registro in registros if registro is not None]
@@ -0,0 +1,221 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from itertools import chain
+
+try:
+    from .validacion import CAMPOS
+    from .vehiculo import Vehiculo
+except ImportError:
+    from validacion import CAMPOS
+    from vehiculo import Vehiculo
+
+# Formato de la instantánea (little-endian):
+#
+#   encabezado   ENCABEZADO: magia, versión, cantidad de registros, cantidad
+#                de secciones y el estado del archivo de origen que refleja
+#                (dispositivo, inodo, bytes y líneas aplicados, CRC32 de los
+#                últimos VENTANA_CRC bytes aplicados)
+#   secciones    SECCION (nombre, largo en bytes) seguido de los datos,
+#                alineados a 8 bytes:
+#                  "texto"          id y campos de cada registro en UTF-8,
+#                                   separados por el carácter nulo
+#                  "indice:<campo>" clave de índice de cada registro
+#                                   (placa, chasis, cédula), con el mismo
+#                                   separador
+#                  "orden:<campo>"  posiciones (uint32) de los registros
+#                                   ordenados por esa columna
+#                  "estadisticas"   conteos agregados (EstadisticasRegistros
+#                                   .a_dict) en JSON
+MAGIA = b"VEHINST\x01"
+# 2: los órdenes por columna desempatan por id (ver clave_orden)
+VERSION = 2
+ENCABEZADO = struct.Struct("<8sIIIQQQQI")
+SECCION = struct.Struct("<24sQ")
+VENTANA_CRC = 1 << 16
+SEPARADOR = "\0"
+VALORES_POR_REGISTRO = 1 + len(CAMPOS)
+
+
+def ruta_instantanea(archivo):
+    """
+    Ruta de la instantánea de un archivo de registros (junto a él)
+    """
+    return archivo + ".instantanea"
+
+
+def _crc_origen(archivo, desplazamiento):
+    """
+    CRC32 de los últimos VENTANA_CRC bytes antes de `desplazamiento`:
+    detecta si esa parte del archivo de origen cambió sin cambiar de inodo
+    """
+    inicio = max(0, desplazamiento - VENTANA_CRC)
+    with open(archivo, 'rb') as file:
+        file.seek(inicio)
+        return zlib.crc32(file.read(desplazamiento - inicio))
+
+
+def _relleno(largo):
+    return b"\0" * (-largo % 8)
+
+
+def _unir(valores):
+    """
+    Une textos con SEPARADOR, o retorna None si alguno ya lo contiene
+    """
+    texto = SEPARADOR.join(valores)
+    if texto.count(SEPARADOR) != max(0, len(valores) - 1):
+        return None
+    return texto
+
+
+def guardar_instantanea(archivo, registros, indices, ordenes, estadisticas, lineas, desplazamiento, firma):
+    """
+    Escribe la instantánea de los registros vivos (en orden de inserción),
+    de sus claves de índice ({campo: lista de claves alineada con los
+    registros}), de los órdenes por columna ya calculados ({campo: lista
+    ordenada de los mismos registros}) y de los conteos agregados
+    (diccionario serializable en JSON, o None). lineas, desplazamiento y firma
+    describen hasta dónde se aplicó el archivo de origen. Se escribe en un
+    temporal y se reemplaza de forma atómica. Retorna False, sin escribir,
+    si algún valor contiene el separador
+    """
+    textos = [_unir(list(chain.from_iterable((registro.id,) + registro.valores() for registro in registros)))]
+    textos += [_unir(claves) for claves in indices.values()]
+    if None in textos:
+        print(f"⚠️ Hay valores con caracteres nulos: no se guarda la instantánea de {archivo}")
+        return False
+
+    secciones = [("texto", textos[0].encode('utf-8'))]
+    for campo, texto in zip(indices, textos[1:]):
+        secciones.append((f"indice:{campo}", texto.encode('utf-8')))
+    posiciones = {id(registro): numero for numero, registro in enumerate(registros)}
+    for campo, lista in ordenes.items():
+        orden = array('I', [posiciones[id(registro)] for registro in lista])
+        if sys.byteorder == "big":
+            orden.byteswap()
+        secciones.append((f"orden:{campo}", orden.tobytes()))
+    if estadisticas is not None:
+        secciones.append(("estadisticas", json.dumps(estadisticas, ensure_ascii=False).encode('utf-8')))
+
+    destino = ruta_instantanea(archivo)
+    temporal = f"{destino}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(temporal, 'wb') as file:
+            file.write(ENCABEZADO.pack(
+                MAGIA, VERSION, len(registros), len(secciones), firma[0], firma[1],
+                desplazamiento, lineas, _crc_origen(archivo, desplazamiento)
+            ))
+            for nombre, datos in secciones:
+                file.write(SECCION.pack(nombre.encode('ascii'), len(datos)))
+                file.write(datos)
+                file.write(_relleno(len(datos)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return True
+
+
+def _vigente(encabezado, archivo, firma):
+    """
+    Indica si un encabezado ya leído corresponde al estado actual del
+    archivo de origen: mismo inodo, al menos los bytes que refleja y el
+    mismo CRC en su ventana final
+    """
+    magia, version, _, _, dispositivo, inodo, desplazamiento, _, crc = encabezado
+    if magia != MAGIA or version != VERSION:
+        return False
+    if (dispositivo, inodo) != firma or os.path.getsize(archivo) < desplazamiento:
+        return False
+    return _crc_origen(archivo, desplazamiento) == crc
+
+
+def instantanea_vigente(archivo, firma):
+    """
+    Lee solo el encabezado de la instantánea de `archivo` y, si sigue
+    vigente, retorna (lineas, desplazamiento) aplicados; si no, None
+    """
+    ruta = ruta_instantanea(archivo)
+    if firma is None or not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, 'rb') as file:
+            encabezado = ENCABEZADO.unpack(file.read(ENCABEZADO.size))
+        if not _vigente(encabezado, archivo, firma):
+            return None
+    except (OSError, struct.error):
+        return None
+    return encabezado[7], encabezado[6]
+
+
+def cargar_instantanea(archivo, firma):
+    """
+    Lee la instantánea de `archivo` si sigue siendo válida para su estado
+    actual (mismo inodo, al menos los bytes que refleja y el mismo CRC en
+    su ventana final). Retorna (registros, indices, ordenes, estadisticas,
+    lineas, desplazamiento), con indices = {campo: lista de claves},
+    ordenes = {campo: array de posiciones} y estadisticas el diccionario
+    guardado (None si la instantánea no las tiene), o None si no existe, está
+    vencida o dañada: en ese caso se carga desde el archivo de origen
+    """
+    ruta = ruta_instantanea(archivo)
+    if firma is None or not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            encabezado = ENCABEZADO.unpack_from(datos, 0)
+            if not _vigente(encabezado, archivo, firma):
+                return None
+            _, _, cantidad, total_secciones, _, _, desplazamiento, lineas, _ = encabezado
+
+            secciones = {}
+            posicion = ENCABEZADO.size
+            for _ in range(total_secciones):
+                nombre, largo = SECCION.unpack_from(datos, posicion)
+                posicion += SECCION.size
+                if posicion + largo > len(datos):
+                    raise ValueError("sección truncada")
+                secciones[nombre.rstrip(b"\0").decode('ascii')] = (posicion, largo)
+                posicion += largo + (-largo % 8)
+
+            inicio, largo = secciones["texto"]
+            valores = str(datos[inicio:inicio + largo], 'utf-8').split(SEPARADOR) if cantidad else []
+            if len(valores) != cantidad * VALORES_POR_REGISTRO:
+                raise ValueError("cantidad de valores inesperada")
+            campos = [iter(valores)] * VALORES_POR_REGISTRO
+            registros = list(map(Vehiculo.restaurar, *campos))
+
+            indices = {}
+            ordenes = {}
+            estadisticas = None
+            for nombre, (inicio, largo) in secciones.items():
+                if nombre.startswith("indice:"):
+                    claves = str(datos[inicio:inicio + largo], 'utf-8').split(SEPARADOR) if cantidad else []
+                    if len(claves) != cantidad:
+                        raise ValueError(f"índice {nombre} incompleto")
+                    indices[nombre[len("indice:"):]] = claves
+                elif nombre.startswith("orden:"):
+                    orden = array('I')
+                    orden.frombytes(datos[inicio:inicio + largo])
+                    if sys.byteorder == "big":
+                        orden.byteswap()
+                    if len(orden) != cantidad or (cantidad and max(orden) >= cantidad):
+                        raise ValueError(f"orden {nombre} incompleto")
+                    ordenes[nombre[len("orden:"):]] = orden
+                elif nombre == "estadisticas":
+                    estadisticas = json.loads(str(datos[inicio:inicio + largo], 'utf-8'))
+                    if not isinstance(estadisticas, dict) or estadisticas.get("total") != cantidad:
+                        raise ValueError("estadísticas inconsistentes")
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        print(f"⚠️ Instantánea {ruta} dañada, se ignora: {e}")
+        return None
+    return registros, indices, ordenes, estadisticas, lineas, desplazamiento
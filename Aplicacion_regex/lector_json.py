@@ -0,0 +1,124 @@
+import codecs
+import json
+import mmap
+import os
+
+# Tamaño de cada bloque de texto leído del archivo
+TAMANO_BLOQUE = 1 << 16
+
+_ESPACIOS = " \t\n\r"
+
+# Caracteres con los que puede seguir un número JSON
+_CARACTERES_NUMERO = frozenset("0123456789+-.eE")
+
+
+def _numero_incompleto(elemento, buffer, fin):
+    """
+    Indica si un número decodificado podría continuar en el siguiente
+    bloque: raw_decode acepta "-1" de "-1." o "-1.5" de "-1.5e", así que
+    se desconfía de todo número seguido solo de caracteres de número hasta
+    el final del buffer
+    """
+    if isinstance(elemento, bool) or not isinstance(elemento, (int, float)):
+        return False
+    for posicion in range(fin, len(buffer)):
+        if buffer[posicion] not in _CARACTERES_NUMERO:
+            return False
+    return True
+
+
+def _bloques_archivo(ruta, tamano_bloque):
+    """
+    Genera bloques de texto leyendo el archivo de forma secuencial
+    """
+    with open(ruta, 'r', encoding='utf-8') as file:
+        while True:
+            bloque = file.read(tamano_bloque)
+            if not bloque:
+                return
+            yield bloque
+
+
+def _bloques_mmap(ruta, tamano_bloque):
+    """
+    Genera bloques de texto desde un mapa en memoria del archivo. El
+    decodificador incremental une los caracteres UTF-8 partidos entre bloques
+    """
+    if os.path.getsize(ruta) == 0:
+        return
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    with open(ruta, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        for inicio in range(0, len(mapa), tamano_bloque):
+            bloque = decodificador.decode(mapa[inicio:inicio + tamano_bloque])
+            if bloque:
+                yield bloque
+        resto = decodificador.decode(b'', final=True)
+        if resto:
+            yield resto
+
+
+def iterar_arreglo_json(ruta, usar_mmap=False, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera uno a uno los elementos de un archivo cuyo contenido es un arreglo
+    JSON (el formato anterior de registros_vehiculos.json), sin cargar el
+    archivo completo: la memoria usada depende del tamaño de un elemento,
+    no del archivo. Un archivo vacío no genera elementos
+    """
+    bloques = (_bloques_mmap if usar_mmap else _bloques_archivo)(ruta, tamano_bloque)
+    decodificador = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+
+    def leer_mas():
+        nonlocal buffer, pos
+        bloque = next(bloques, None)
+        if bloque is None:
+            return False
+        buffer = buffer[pos:] + bloque
+        pos = 0
+        return True
+
+    def saltar_espacios():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _ESPACIOS:
+                pos += 1
+            if pos < len(buffer) or not leer_mas():
+                return
+
+    # Apertura del arreglo
+    saltar_espacios()
+    if pos >= len(buffer):
+        return
+    if buffer[pos] != '[':
+        raise ValueError(f"{ruta} no contiene un arreglo JSON")
+    pos += 1
+
+    primero = True
+    while True:
+        saltar_espacios()
+        if pos >= len(buffer):
+            raise ValueError(f"{ruta}: arreglo JSON sin cerrar")
+        if buffer[pos] == ']':
+            return
+        if not primero:
+            if buffer[pos] != ',':
+                raise ValueError(f"{ruta}: se esperaba ',' entre los elementos del arreglo")
+            pos += 1
+            saltar_espacios()
+
+        # Decodificar el siguiente elemento, leyendo más bloques si está incompleto
+        while True:
+            try:
+                elemento, fin = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not leer_mas():
+                    raise
+                continue
+            # Un número al final del bloque podría continuar en el siguiente
+            if _numero_incompleto(elemento, buffer, fin) and leer_mas():
+                continue
+            pos = fin
+            break
+        primero = False
+        yield elemento
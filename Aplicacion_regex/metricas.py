@@ -0,0 +1,324 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# json y argparse se importan dentro de las funciones que los usan:
+# validacion importa este módulo y los procesos que solo validan no
+# deberían pagar su carga al arrancar
+
+# Interruptor global. Con las métricas apagadas cada punto de medición
+# cuesta solo la lectura de esta variable
+ACTIVAS = os.environ.get("METRICAS_VEHICULOS", "1") != "0"
+
+# Límites superiores (en segundos) de los intervalos de los histogramas
+LIMITES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Descripción de cada métrica para la exportación a Prometheus
+DESCRIPCIONES = {
+    "validacion_total": "Validaciones ejecutadas por campo",
+    "validacion_fallos_total": "Validaciones rechazadas por campo",
+    "almacen_cargar_segundos": "Carga o sincronización de los registros desde el archivo",
+    "almacen_guardar_segundos": "Guardado de un registro",
+    "almacen_eliminar_segundos": "Eliminación de un registro",
+    "tabla_refrescar_segundos": "Redibujo de la tabla de registros",
+    "busqueda_segundos": "Búsqueda libre en los registros",
+    "servidor_solicitud_segundos": "Atención de una solicitud HTTP por ruta",
+}
+
+_candado = threading.Lock()
+_contadores = {}
+_histogramas = {}
+
+# Validaciones por tupla de campos validados juntos y rechazos por campo.
+# Se guardan aparte para que contar una validación sea una sola suma;
+# instantanea() los reparte en contadores por campo
+_validaciones = {}
+_rechazos = {}
+
+
+def activar(activas=True):
+    """
+    Enciende (o apaga) la recolección de métricas
+    """
+    global ACTIVAS
+    ACTIVAS = activas
+
+
+def desactivar():
+    """
+    Apaga la recolección de métricas
+    """
+    activar(False)
+
+
+def reiniciar():
+    """
+    Descarta todas las métricas recolectadas
+    """
+    with _candado:
+        _contadores.clear()
+        _histogramas.clear()
+        _validaciones.clear()
+        _rechazos.clear()
+
+
+def _clave(nombre, etiquetas):
+    """
+    Identifica una serie por su nombre y sus etiquetas
+    """
+    return (nombre, tuple(sorted(etiquetas.items())))
+
+
+def incrementar(nombre, cantidad=1, **etiquetas):
+    """
+    Suma `cantidad` al contador con ese nombre y etiquetas
+    """
+    if not ACTIVAS:
+        return
+    clave = _clave(nombre, etiquetas)
+    with _candado:
+        _contadores[clave] = _contadores.get(clave, 0) + cantidad
+
+
+def observar(nombre, segundos, **etiquetas):
+    """
+    Registra una duración en el histograma con ese nombre y etiquetas
+    """
+    if not ACTIVAS:
+        return
+    clave = _clave(nombre, etiquetas)
+    with _candado:
+        histograma = _histogramas.get(clave)
+        if histograma is None:
+            histograma = _histogramas[clave] = {"cubetas": [0] * (len(LIMITES) + 1), "suma": 0.0, "cantidad": 0}
+        histograma["cubetas"][bisect_left(LIMITES, segundos)] += 1
+        histograma["suma"] += segundos
+        histograma["cantidad"] += 1
+
+
+def contar_validaciones(campos, registros, errores_por_registro=()):
+    """
+    Cuenta `registros` validaciones de cada uno de los campos y un fallo
+    por cada campo presente en los diccionarios de errores
+    """
+    if not ACTIVAS:
+        return
+    with _candado:
+        _validaciones[campos] = _validaciones.get(campos, 0) + registros
+        for errores in errores_por_registro:
+            for campo in errores:
+                _rechazos[campo] = _rechazos.get(campo, 0) + 1
+
+
+class _Cronometro:
+    """Mide la duración de un bloque with y la registra en un histograma"""
+
+    __slots__ = ("nombre", "etiquetas", "inicio")
+
+    def __init__(self, nombre, etiquetas):
+        self.nombre = nombre
+        self.etiquetas = etiquetas
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observar(self.nombre, time.perf_counter() - self.inicio, **self.etiquetas)
+        return False
+
+
+class _SinMedicion:
+    """Bloque with que no hace nada (métricas apagadas)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SIN_MEDICION = _SinMedicion()
+
+
+def medir(nombre, **etiquetas):
+    """
+    Bloque with que registra su duración en un histograma:
+
+        with metricas.medir("almacen_guardar_segundos"):
+            ...
+    """
+    if not ACTIVAS:
+        return _SIN_MEDICION
+    return _Cronometro(nombre, etiquetas)
+
+
+# ----------------------------------------------------------------------
+# Exportación
+# ----------------------------------------------------------------------
+def instantanea():
+    """
+    Copia de las métricas como diccionario serializable a JSON
+    """
+    with _candado:
+        series = dict(_contadores)
+        for campos, cantidad in _validaciones.items():
+            for campo in campos:
+                clave = ("validacion_total", (("campo", campo),))
+                series[clave] = series.get(clave, 0) + cantidad
+        for campo, cantidad in _rechazos.items():
+            series[("validacion_fallos_total", (("campo", campo),))] = cantidad
+        contadores = [
+            {"nombre": nombre, "etiquetas": dict(etiquetas), "valor": valor}
+            for (nombre, etiquetas), valor in sorted(series.items())
+        ]
+        histogramas = [
+            {
+                "nombre": nombre,
+                "etiquetas": dict(etiquetas),
+                "limites": list(LIMITES),
+                "cubetas": list(datos["cubetas"]),
+                "suma": datos["suma"],
+                "cantidad": datos["cantidad"],
+            }
+            for (nombre, etiquetas), datos in sorted(_histogramas.items())
+        ]
+    return {"activas": ACTIVAS, "contadores": contadores, "histogramas": histogramas}
+
+
+def a_json(datos=None):
+    """
+    Métricas en JSON (de la instantánea dada o de las actuales)
+    """
+    import json
+    return json.dumps(datos or instantanea(), ensure_ascii=False, indent=2)
+
+
+def _etiquetas_prometheus(etiquetas, extra=None):
+    """
+    Etiquetas en la sintaxis de Prometheus: {nombre="valor",...}
+    """
+    pares = list(etiquetas.items()) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nombre}="{valor}"' for nombre, valor in pares) + "}"
+
+
+def a_prometheus(datos=None):
+    """
+    Métricas en el formato de texto de Prometheus
+    """
+    datos = datos or instantanea()
+    lineas = []
+    declaradas = set()
+
+    def declarar(nombre, tipo):
+        if nombre not in declaradas:
+            declaradas.add(nombre)
+            lineas.append(f"# HELP {nombre} {DESCRIPCIONES.get(nombre, nombre)}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+
+    for contador in datos["contadores"]:
+        declarar(contador["nombre"], "counter")
+        lineas.append(f"{contador['nombre']}{_etiquetas_prometheus(contador['etiquetas'])} {contador['valor']}")
+
+    for histograma in datos["histogramas"]:
+        nombre = histograma["nombre"]
+        etiquetas = histograma["etiquetas"]
+        declarar(nombre, "histogram")
+        acumulado = 0
+        for limite, cantidad in zip(histograma["limites"] + ["+Inf"], histograma["cubetas"]):
+            acumulado += cantidad
+            lineas.append(f"{nombre}_bucket{_etiquetas_prometheus(etiquetas, ('le', limite))} {acumulado}")
+        lineas.append(f"{nombre}_sum{_etiquetas_prometheus(etiquetas)} {histograma['suma']}")
+        lineas.append(f"{nombre}_count{_etiquetas_prometheus(etiquetas)} {histograma['cantidad']}")
+    return "\n".join(lineas) + "\n"
+
+
+def percentil(histograma, fraccion):
+    """
+    Límite superior del intervalo donde cae el percentil pedido
+    (None si no hay observaciones o cae en el último intervalo)
+    """
+    objetivo = fraccion * histograma["cantidad"]
+    acumulado = 0
+    for limite, cantidad in zip(histograma["limites"], histograma["cubetas"]):
+        acumulado += cantidad
+        if cantidad and acumulado >= objetivo:
+            return limite
+    return None
+
+
+def resumen(datos=None):
+    """
+    Texto legible con los contadores de validación por campo y las
+    latencias de cada histograma, para mostrar en la interfaz
+    """
+    datos = datos or instantanea()
+    lineas = []
+    if not datos["activas"]:
+        lineas.append("⚠️ Las métricas están desactivadas (METRICAS_VEHICULOS=0)\n")
+
+    totales = {c["etiquetas"].get("campo"): c["valor"] for c in datos["contadores"] if c["nombre"] == "validacion_total"}
+    fallos = {c["etiquetas"].get("campo"): c["valor"] for c in datos["contadores"] if c["nombre"] == "validacion_fallos_total"}
+    lineas.append(f"{'Campo':<12}{'Validaciones':>14}{'Rechazos':>10}{'%':>8}")
+    for campo in totales:
+        total = totales.get(campo, 0)
+        rechazos = fallos.get(campo, 0)
+        porcentaje = f"{rechazos / total:.1%}" if total else "-"
+        lineas.append(f"{campo:<12}{total:>14}{rechazos:>10}{porcentaje:>8}")
+
+    lineas.append("")
+    lineas.append(f"{'Operación':<28}{'Veces':>7}{'Media ms':>10}{'p50 ≤ ms':>10}{'p95 ≤ ms':>10}")
+    for histograma in datos["histogramas"]:
+        cantidad = histograma["cantidad"]
+        media = histograma["suma"] / cantidad * 1000 if cantidad else 0
+        p50, p95 = (percentil(histograma, f) for f in (0.5, 0.95))
+        lineas.append(
+            f"{histograma['nombre']:<28}{cantidad:>7}{media:>10.2f}"
+            f"{p50 * 1000 if p50 else float('inf'):>10.1f}{p95 * 1000 if p95 else float('inf'):>10.1f}"
+        )
+    return "\n".join(lineas)
+
+
+def guardar(ruta, datos=None):
+    """
+    Escribe las métricas en un archivo: Prometheus si termina en .prom,
+    JSON en otro caso
+    """
+    texto = a_prometheus(datos) if ruta.lower().endswith(".prom") else a_json(datos)
+    with open(ruta, 'w', encoding='utf-8') as file:
+        file.write(texto)
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.metricas",
+        description="Muestra un volcado de métricas (JSON) como texto, JSON o Prometheus"
+    )
+    parser.add_argument("volcado", help="Archivo JSON escrito por la aplicación o por bulk --metricas")
+    parser.add_argument("--formato", choices=("texto", "json", "prometheus"), default="texto")
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    import json
+    args = crear_parser().parse_args(argv)
+    with open(args.volcado, 'r', encoding='utf-8') as file:
+        datos = json.load(file)
+    if args.formato == "json":
+        print(a_json(datos))
+    elif args.formato == "prometheus":
+        print(a_prometheus(datos), end="")
+    else:
+        print(resumen(datos))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
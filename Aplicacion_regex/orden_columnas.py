@@ -0,0 +1,155 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+try:
+    from .indice_busqueda import plegar
+    from .validacion import CAMPOS
+except ImportError:
+    from indice_busqueda import plegar
+    from validacion import CAMPOS
+
+
+def _clave_modelo(registro):
+    """
+    Los modelos numéricos se ordenan por año y los demás después, por texto
+    """
+    try:
+        return (0, int(registro.modelo), "")
+    except ValueError:
+        return (1, 0, plegar(registro.modelo))
+
+
+def clave_orden(campo):
+    """
+    Función de clave para ordenar registros por un campo: el modelo como
+    número y los demás como texto sin mayúsculas ni tildes. Los empates se
+    resuelven por id, así cada registro tiene una clave única y una
+    búsqueda binaria llega a su posición exacta
+    """
+    if campo not in CAMPOS:
+        raise ValueError(f"Campo de orden desconocido: {campo}")
+    if campo == "modelo":
+        return lambda registro: (_clave_modelo(registro), registro.id)
+    return lambda registro: (plegar(getattr(registro, campo)), registro.id)
+
+
+def ordenar_registros(registros, campo=None, descendente=False):
+    """
+    Retorna una lista de registros ordenada por el campo dado
+    (o en el orden recibido si no se indica campo)
+    """
+    if campo is None:
+        return list(registros)
+    return sorted(registros, key=clave_orden(campo), reverse=descendente)
+
+
+def pagina(lista, inicio, cantidad, descendente=False):
+    """
+    Posiciones [inicio, inicio + cantidad) de una lista ordenada,
+    leída desde el final si el orden es descendente
+    """
+    if not descendente:
+        return lista[inicio:inicio + cantidad]
+    fin = max(0, len(lista) - inicio)
+    return lista[max(0, fin - cantidad):fin][::-1]
+
+
+def _posiciones(listas, clave, rango):
+    """
+    Cuántos elementos de cada lista ordenada quedan antes de la posición
+    `rango` del intercalado de todas. Busca, lista por lista, el elemento
+    cuya cantidad de anteriores en todas las listas es exactamente `rango`
+    """
+    if rango <= 0:
+        return [0] * len(listas)
+    for numero, lista in enumerate(listas):
+        desde, hasta = 0, len(lista)
+        while desde < hasta:
+            medio = (desde + hasta) // 2
+            valor = clave(lista[medio])
+            anteriores = [
+                medio if otra is lista else bisect_left(otra, valor, key=clave)
+                for otra in listas
+            ]
+            total = sum(anteriores)
+            if total == rango:
+                return anteriores
+            if total < rango:
+                desde = medio + 1
+            else:
+                hasta = medio
+    return [len(lista) for lista in listas]
+
+
+def pagina_intercalada(listas, clave, inicio, cantidad, descendente=False):
+    """
+    Como pagina(), pero sobre el intercalado de varias listas ordenadas por
+    la misma clave (única) sin construirlo: se ubica el comienzo de la
+    página en cada lista con búsqueda binaria y solo se intercalan, con
+    heapq.merge, los `cantidad` elementos siguientes de cada una
+    """
+    if descendente:
+        fin = max(0, sum(map(len, listas)) - inicio)
+        inicio, cantidad = max(0, fin - cantidad), min(cantidad, fin)
+    posiciones = _posiciones(listas, clave, inicio)
+    tramos = [lista[posicion:posicion + cantidad] for lista, posicion in zip(listas, posiciones)]
+    filas = list(islice(heapq.merge(*tramos, key=clave), max(0, cantidad)))
+    return filas[::-1] if descendente else filas
+
+
+class OrdenColumnas:
+    """
+    Órdenes de los registros por columna. La primera vez que se pide una
+    columna se ordena la lista completa una sola vez; desde entonces las
+    altas y eliminaciones se aplican con búsqueda binaria sobre cada orden
+    ya calculado, sin volver a ordenar. Las columnas nunca pedidas no
+    cuestan nada.
+
+    Los empates se ordenan por id (ver clave_orden)
+    """
+
+    def __init__(self):
+        self._ordenes = {}
+
+    def ordenado(self, campo, registros):
+        """
+        Lista de registros ordenada por el campo. registros() entrega los
+        registros vivos en orden de inserción y solo se usa si la columna
+        aún no está calculada
+        """
+        lista = self._ordenes.get(campo)
+        if lista is None:
+            lista = self._ordenes[campo] = sorted(registros(), key=clave_orden(campo))
+        return lista
+
+    def calculados(self):
+        """
+        Copia de los órdenes ya calculados: {campo: lista ordenada}
+        """
+        return {campo: list(lista) for campo, lista in self._ordenes.items()}
+
+    def restaurar(self, campo, lista):
+        """
+        Usa una lista ya ordenada (por ejemplo, leída de una instantánea)
+        como el orden de la columna
+        """
+        self._ordenes[campo] = lista
+
+    def agregar(self, registro):
+        """
+        Inserta un registro nuevo en cada orden calculado
+        """
+        for campo, lista in self._ordenes.items():
+            clave = clave_orden(campo)
+            lista.insert(bisect_right(lista, clave(registro), key=clave), registro)
+
+    def quitar(self, registro):
+        """
+        Quita un registro de cada orden calculado
+        """
+        for campo, lista in self._ordenes.items():
+            clave = clave_orden(campo)
+            posicion = bisect_left(lista, clave(registro), key=clave)
+            if posicion < len(lista) and lista[posicion] is registro:
+                del lista[posicion]
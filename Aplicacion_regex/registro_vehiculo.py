@@ -1,20 +1,47 @@
+import os
+import tempfile
+from contextlib import suppress
 import tkinter as tk
-from tkinter import messagebox
-from validacion import Validacion
-from visualizador_registros import VisualizadorRegistros  
+from tkinter import filedialog, messagebox
+
+try:
+    from .validacion import Validacion
+    from .importacion import convertir_reporte, importar
+    from .indicador_progreso import IndicadorProgreso
+    from .repositorio import RegistroDuplicadoError
+    from .tareas import EjecutorTareas
+    from .visualizador_registros import VisualizadorRegistros
+except ImportError:
+    from validacion import Validacion
+    from importacion import convertir_reporte, importar
+    from indicador_progreso import IndicadorProgreso
+    from repositorio import RegistroDuplicadoError
+    from tareas import EjecutorTareas
+    from visualizador_registros import VisualizadorRegistros
+
+# Espera tras la última tecla antes de validar el campo editado
+RETARDO_VALIDACION_MS = 300
+
+def descartar_reporte(reporte):
+    """Borra el reporte temporal de una importación, si todavía existe"""
+    with suppress(FileNotFoundError):
+        os.remove(reporte)
 
 class RegistroVehiculoApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Registro de Vehículo")
-        self.root.geometry("500x750")  
+        self.root.geometry("500x820")  
         self.root.resizable(False, False)
         
         # Diccionario para almacenar los campos de entrada
         self.entries = {}
         
+        # Hilo trabajador para leer y guardar sin congelar la ventana
+        self.tareas = EjecutorTareas(root)
+        
         # Inicializar visualizador de registros
-        self.visualizador = VisualizadorRegistros(root)  # NUEVA LÍNEA
+        self.visualizador = VisualizadorRegistros(root, self.tareas)
         
         # Crear los campos del formulario
         self.crear_formulario()
@@ -22,6 +49,9 @@ class RegistroVehiculoApp:
         # Botones
         self.crear_botones()
         
+        # Migrar y cargar los registros existentes en segundo plano
+        self.visualizador.cargar(self.progreso)
+        
     def crear_formulario(self):
         """Crea todos los campos del formulario"""
         campos = [
@@ -50,16 +80,25 @@ class RegistroVehiculoApp:
             error_label = tk.Label(self.root, text="", fg="red", font=("Arial", 8))
             error_label.place(x=250, y=55 + i*60)
             
-            # Guardar referencia
+            # Guardar referencia junto con el último valor validado, su
+            # resultado y el mensaje dibujado (None = nunca validado / sin error)
             self.entries[campo] = {
                 'entry': entry,
-                'error_label': error_label
+                'error_label': error_label,
+                'valor': None,
+                'error': None,
+                'mostrado': None,
+                'pendiente': None
             }
+            
+            # Validar mientras se escribe y al salir del campo
+            entry.bind("<KeyRelease>", lambda e, c=campo: self.programar_validacion(c))
+            entry.bind("<FocusOut>", lambda e, c=campo: self.validar_campo(c))
     
     def crear_botones(self):
         """Crea los botones del formulario"""
         # Botón Guardar
-        btn_guardar = tk.Button(
+        self.btn_guardar = tk.Button(
             self.root, 
             text="Guardar Registro", 
             command=self.validar_registro,
@@ -68,7 +107,7 @@ class RegistroVehiculoApp:
             font=("Arial", 11),
             width=15
         )
-        btn_guardar.place(x=120, y=660)  
+        self.btn_guardar.place(x=120, y=660)  
         
         # Botón Limpiar
         btn_limpiar = tk.Button(
@@ -93,107 +132,224 @@ class RegistroVehiculoApp:
             width=32
         )
         btn_ver_registros.place(x=120, y=700)  
+        
+        # Botón Importar (CSV, JSONL o JSON, validado y guardado por lotes)
+        self.btn_importar = tk.Button(
+            self.root,
+            text="Importar Registros...",
+            command=self.importar_archivo,
+            bg="#16a085",
+            fg="white",
+            font=("Arial", 11),
+            width=32
+        )
+        self.btn_importar.place(x=120, y=740)
+        
+        # Avance de la importación
+        self.progreso = IndicadorProgreso(self.root)
+        self.progreso.frame.place(x=10, y=780)
     
     def limpiar_campos(self):
         """Limpia todos los campos del formulario y mensajes de error"""
-        for campo in self.entries.values():
-            campo['entry'].delete(0, tk.END)
-            campo['entry'].config(bg="white")
-            campo['error_label'].config(text="")
+        for campo, datos in self.entries.items():
+            self.cancelar_validacion(campo)
+            datos['entry'].delete(0, tk.END)
+            datos['valor'] = None
+            datos['error'] = None
+            self.mostrar_error(campo, None)
+    
+    def programar_validacion(self, campo):
+        """Agenda la validación del campo para cuando se deje de escribir"""
+        self.cancelar_validacion(campo)
+        self.entries[campo]['pendiente'] = self.root.after(
+            RETARDO_VALIDACION_MS, lambda: self.validar_campo(campo)
+        )
+    
+    def cancelar_validacion(self, campo):
+        """Descarta la validación agendada del campo, si hay una"""
+        datos = self.entries[campo]
+        if datos['pendiente'] is not None:
+            self.root.after_cancel(datos['pendiente'])
+            datos['pendiente'] = None
+    
+    def validar_campo(self, campo):
+        """
+        Valida un campo y retorna su mensaje de error (None si es válido).
+        Si el valor no cambió desde la última validación se reutiliza el
+        resultado sin volver a validar ni a dibujar
+        """
+        self.cancelar_validacion(campo)
+        datos = self.entries[campo]
+        valor = datos['entry'].get().strip()
+        if valor != datos['valor']:
+            datos['valor'] = valor
+            datos['error'] = Validacion.validar_campo(campo, valor)
+            self.mostrar_error(campo, datos['error'])
+        return datos['error']
     
     def validar_registro(self):
         """Valida todos los campos del formulario"""
-        resultados_validacion = {}
-        campos_validos = True
-        datos_vehiculo = {}  # diccionario para guardar datos
-
-
-        # Validar cada campo
-        for campo, datos in self.entries.items():
-            valor = datos['entry'].get().strip()
-            
-            # Limpiar mensajes de error anteriores
-            datos['error_label'].config(text="")
-            datos['entry'].config(bg="white")
-            
-            # Verificar campos vacíos
-            if not valor:
-                self.mostrar_error(campo, "Campo obligatorio")
-                valido = False
-            else:
-                # Validar según el campo
-                if campo == 'placa':
-                    valido = Validacion.validar_placa(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Formato inválido. Ej: ABC123 o ABC12D")
-                
-                elif campo == 'marca':
-                    valido = Validacion.validar_marca(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Solo letras y espacios")
-                
-                elif campo == 'modelo':
-                    valido = Validacion.validar_modelo(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Año entre 1900 y 2026")
-                
-                elif campo == 'color':
-                    valido = Validacion.validar_color(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Solo letras")
-                
-                elif campo == 'chasis':
-                    valido = Validacion.validar_chasis(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "17 caracteres alfanuméricos")
-                
-                elif campo == 'motor':
-                    valido = Validacion.validar_motor(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Solo caracteres alfanuméricos")
-                
-                elif campo == 'cedula':
-                    valido = Validacion.validar_cedula(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "7-10 dígitos numéricos")
-                
-                elif campo == 'nombre':
-                    valido = Validacion.validar_nombre(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Solo letras y espacios")
-                
-                elif campo == 'correo':
-                    valido = Validacion.validar_correo(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "Formato: usuario@dominio.com")
-                
-                elif campo == 'telefono':
-                    valido = Validacion.validar_telefono(valor)
-                    if not valido:
-                        self.mostrar_error(campo, "10 dígitos numéricos")
-            
-            # Guardar datos del vehículo (solo si el campo tiene valor)
-            if valor:
-                datos_vehiculo[campo] = valor
-            
-            resultados_validacion[campo] = valido
-            
-            if not valido:
-                campos_validos = False
+        # Solo se vuelven a validar los campos modificados o nunca validados
+        errores = {}
+        for campo in self.entries:
+            mensaje = self.validar_campo(campo)
+            if mensaje:
+                errores[campo] = mensaje
         
+        # Los valores ya leídos y validados de cada campo
+        datos_vehiculo = {
+            campo: datos['valor']
+            for campo, datos in self.entries.items()
+        }
+
         # Mostrar resultado final y guardar si es válido
-        if campos_validos:
-            # Guardar el registro antes de mostrar éxito
-            if self.visualizador.guardar_registro(datos_vehiculo):
-                self.mostrar_exito()
+        if not errores:
+            # Guardar el registro en segundo plano antes de mostrar éxito
+            self.btn_guardar.config(state=tk.DISABLED, text="Guardando...")
+            self.tareas.ejecutar(
+                lambda tarea: self.visualizador.guardar_registro(datos_vehiculo),
+                descripcion="Guardar registro",
+                al_terminar=self.al_guardar,
+                al_fallar=self.al_fallar_guardado
+            )
+    
+    def al_guardar(self, guardado):
+        """Resultado del guardado (en el hilo de Tk)"""
+        self.btn_guardar.config(state=tk.NORMAL, text="Guardar Registro")
+        if guardado:
+            self.mostrar_exito()
+        else:
+            messagebox.showerror("Error", "No se pudo guardar el registro")
+    
+    def al_fallar_guardado(self, error):
+        """Error durante el guardado (en el hilo de Tk)"""
+        self.btn_guardar.config(state=tk.NORMAL, text="Guardar Registro")
+        if isinstance(error, RegistroDuplicadoError):
+            # La placa o el chasis ya están registrados
+            self.mostrar_error(error.campo, error.mensaje)
+        else:
+            messagebox.showerror("Error", f"No se pudo guardar el registro: {error}")
+    
+    def importar_archivo(self):
+        """
+        Importa un archivo de registros en segundo plano: las filas se
+        validan por lotes y las válidas se guardan en una transacción por
+        lote. Al terminar se ofrece guardar el reporte de filas rechazadas
+        """
+        ruta = filedialog.askopenfilename(
+            parent=self.root,
+            title="Importar registros",
+            filetypes=[
+                ("CSV, JSONL o JSON", "*.csv *.jsonl *.ndjson *.json"),
+                ("Todos los archivos", "*.*"),
+            ]
+        )
+        if not ruta:
+            return
+        descriptor, reporte = tempfile.mkstemp(prefix="importacion_", suffix=".jsonl")
+        os.close(descriptor)
+        
+        def terminar():
+            self.progreso.ocultar(tarea)
+            self.btn_importar.config(state=tk.NORMAL, text="Importar Registros...")
+        
+        def al_terminar(resumen):
+            terminar()
+            rechazadas = resumen["invalidas"] + resumen["duplicadas"]
+            print(f"📥 {resumen['importadas']} de {resumen['total']} registro(s) importados "
+                  f"de {ruta} en {resumen['segundos']} s")
+            mensaje = (
+                f"Filas leídas: {resumen['total']}\n"
+                f"Importadas: {resumen['importadas']}\n"
+                f"Inválidas: {resumen['invalidas']}\n"
+                f"Placa o chasis ya registrados: {resumen['duplicadas']}"
+            )
+            if not rechazadas:
+                os.remove(reporte)
+                messagebox.showinfo("Importación terminada", mensaje)
+            elif messagebox.askyesno(
+                "Importación terminada",
+                mensaje + "\n\n¿Desea guardar el reporte de filas rechazadas?"
+            ):
+                self.guardar_reporte_importacion(reporte)
             else:
-                messagebox.showerror("Error", "No se pudo guardar el registro")
+                os.remove(reporte)
+        
+        def al_fallar(e):
+            terminar()
+            messagebox.showerror("Error", f"No se pudo importar el archivo: {e}")
+        
+        def al_cancelar():
+            # Si el trabajador ya terminó, su resultado no se entrega
+            terminar()
+            descartar_reporte(reporte)
+        
+        self.btn_importar.config(state=tk.DISABLED, text="Importando...")
+        tarea = self.tareas.ejecutar(
+            self._importar, ruta, reporte,
+            descripcion="Importar registros",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar,
+            al_progreso=self.progreso.actualizar
+        )
+        self.progreso.mostrar(tarea, "Importando...", al_cancelar=al_cancelar)
+    
+    def _importar(self, tarea, ruta, reporte):
+        """
+        Importa el archivo en el hilo trabajador. Si falla o se cancela se
+        borra el reporte temporal; los lotes ya guardados se conservan
+        """
+        terminada = False
+        try:
+            resumen = importar(
+                self.visualizador.repositorio, ruta,
+                reporte=reporte,
+                al_progreso=tarea.reportar_progreso
+            )
+            terminada = True
+            return resumen
+        finally:
+            # Cancelada tras el último avance: nadie recibirá el resumen
+            if not terminada or tarea.cancelada:
+                descartar_reporte(reporte)
+    
+    def guardar_reporte_importacion(self, reporte):
+        """
+        Pide dónde guardar el reporte de filas rechazadas (CSV o JSONL) y lo
+        copia en segundo plano. El reporte temporal se borra al terminar
+        """
+        destino = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Guardar reporte de filas rechazadas",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON por líneas", "*.jsonl")]
+        )
+        if not destino:
+            os.remove(reporte)
+            return
+        
+        def copiar(tarea):
+            try:
+                convertir_reporte(reporte, destino)
+            finally:
+                os.remove(reporte)
+            return destino
+        
+        self.tareas.ejecutar(
+            copiar,
+            descripcion="Guardar reporte de importación",
+            al_terminar=lambda ruta: print(f"📄 Reporte de filas rechazadas guardado en {ruta}"),
+            al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo guardar el reporte: {e}")
+        )
     
     def mostrar_error(self, campo, mensaje):
-        """Muestra error en el campo específico"""
-        if campo in self.entries:
-            self.entries[campo]['error_label'].config(text=mensaje)
-            self.entries[campo]['entry'].config(bg="#FFE4E1")
+        """Muestra error en el campo específico (o lo borra si mensaje es None)"""
+        datos = self.entries.get(campo)
+        if datos is None or datos['mostrado'] == mensaje:
+            return
+        datos['mostrado'] = mensaje
+        datos['error_label'].config(text=mensaje or "")
+        datos['entry'].config(bg="#FFE4E1" if mensaje else "white")
     
     def mostrar_exito(self):
         """Muestra mensaje de registro exitoso"""
@@ -0,0 +1,251 @@
+import os
+from abc import ABC, abstractmethod
+from itertools import islice
+
+try:
+    from .estadisticas import EstadisticasRegistros
+    from .indice_busqueda import coincide, plegar
+    from .lector_json import iterar_arreglo_json
+    from .orden_columnas import ordenar_registros, pagina
+    from .validacion import CAMPOS, Validacion
+except ImportError:
+    from estadisticas import EstadisticasRegistros
+    from indice_busqueda import coincide, plegar
+    from lector_json import iterar_arreglo_json
+    from orden_columnas import ordenar_registros, pagina
+    from validacion import CAMPOS, Validacion
+
+# Extensiones de archivo que se abren con el almacén SQLite
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")
+
+# Extensión de los directorios que se abren con el almacén particionado
+EXTENSION_PARTICIONES = ".particiones"
+
+
+class RegistroDuplicadoError(ValueError):
+    """La placa o el chasis ya pertenecen a otro registro"""
+
+    def __init__(self, campo, valor, mensaje):
+        super().__init__(f"{campo} {valor}: {mensaje}")
+        self.campo = campo
+        self.valor = valor
+        self.mensaje = mensaje
+
+
+class Repositorio(ABC):
+    """
+    Interfaz común de los almacenes de registros de vehículos.
+    Se guardan diccionarios (o Vehiculo) con los campos de CAMPOS y se
+    obtienen objetos Vehiculo con un "id" estable. Los almacenes deben
+    implementar los métodos abstractos; los demás tienen una versión que
+    recorre iterar() y pueden reemplazarla por una más rápida
+    """
+
+    @abstractmethod
+    def agregar(self, registro):
+        """
+        Guarda un registro y retorna su id.
+        Lanza RegistroDuplicadoError si la placa o el chasis ya existen
+        """
+
+    @abstractmethod
+    def agregar_lote(self, registros):
+        """
+        Guarda varios registros en una sola transacción y retorna sus ids.
+        Si alguno está duplicado no se guarda ninguno
+        """
+
+    @abstractmethod
+    def eliminar(self, id_registro):
+        """
+        Elimina un registro. Retorna False si no existe
+        """
+
+    @abstractmethod
+    def obtener(self, id_registro):
+        """
+        Retorna el registro con el id dado, o None
+        """
+
+    @abstractmethod
+    def iterar(self):
+        """
+        Genera los registros en orden de inserción
+        """
+
+    def cargar(self):
+        """
+        Carga todos los registros en una lista
+        """
+        return list(self.iterar())
+
+    @abstractmethod
+    def contar(self):
+        """
+        Cantidad de registros
+        """
+
+    def precargar(self, al_progreso=None):
+        """
+        Deja el almacén listo para consultas rápidas. al_progreso(fracción)
+        se llama periódicamente y puede lanzar una excepción para cancelar.
+        Los almacenes que no cargan datos en memoria no hacen nada
+        """
+
+    def sincronizar(self, al_progreso=None):
+        """
+        Incorpora los cambios hechos por otros procesos y retorna la versión
+        """
+        self.precargar(al_progreso)
+        return self.version()
+
+    @abstractmethod
+    def version(self):
+        """
+        Marca de cambios del almacén: si no cambió, los datos tampoco
+        """
+
+    def obtener_rango(self, inicio, cantidad, orden=None, descendente=False):
+        """
+        Retorna los registros en las posiciones [inicio, inicio + cantidad)
+        según el orden de inserción o, si se indica, ordenados por el campo
+        `orden` (el modelo como número)
+        """
+        if orden is None and not descendente:
+            return list(islice(self.iterar(), inicio, inicio + cantidad))
+        return pagina(ordenar_registros(self.iterar(), orden), inicio, cantidad, descendente)
+
+    @abstractmethod
+    def buscar_por_placa(self, placa):
+        """
+        Retorna el registro con la placa dada, o None
+        """
+
+    @abstractmethod
+    def buscar_por_chasis(self, chasis):
+        """
+        Retorna el registro con el número de chasis dado, o None
+        """
+
+    @abstractmethod
+    def buscar_por_cedula(self, cedula):
+        """
+        Retorna la lista de registros del propietario con la cédula dada
+        """
+
+    def buscar(self, texto):
+        """
+        Búsqueda libre: retorna en orden de inserción los registros cuya placa
+        o cédula empiezan por el texto, o cuyo nombre o marca lo contienen,
+        sin distinguir mayúsculas ni tildes. Esta versión recorre todos los
+        registros; los almacenes la reemplazan por una consulta indexada
+        """
+        consulta = plegar(texto)
+        if not consulta:
+            return []
+        return [registro for registro in self.iterar() if coincide(registro, consulta)]
+
+    @abstractmethod
+    def filtrar(self, modelo_desde=None, modelo_hasta=None, **campos):
+        """
+        Retorna los registros cuyos campos coinciden exactamente con los dados
+        (por ejemplo marca="Mazda") y cuyo modelo está en el rango indicado
+        """
+
+    def estadisticas(self):
+        """
+        Resumen de conteos agregados (ver EstadisticasRegistros.resumen).
+        Esta versión recorre todos los registros; los almacenes mantienen
+        los conteos con cada alta y eliminación
+        """
+        return EstadisticasRegistros.desde_registros(self.iterar()).resumen()
+
+    def revalidar(self):
+        """
+        Vuelve a validar todos los registros guardados con las reglas
+        actuales de Validacion. Retorna [(id, {campo: error})] de los que
+        ya no las cumplen, en orden de inserción
+        """
+        validar = Validacion.validar_fila
+        invalidos = []
+        for registro in self.iterar():
+            errores = validar(registro.valores())
+            if errores:
+                invalidos.append((registro.id, errores))
+        return invalidos
+
+    @abstractmethod
+    def migrar_desde_json(self, archivo_json):
+        """
+        Migración única desde el arreglo JSON del formato anterior
+        """
+
+    def cerrar(self):
+        """
+        Libera los recursos del almacén
+        """
+
+
+def validar_filtros(campos):
+    """
+    Verifica que los filtros correspondan a campos conocidos
+    """
+    desconocidos = set(campos) - set(CAMPOS)
+    if desconocidos:
+        raise ValueError(f"Campos de filtro desconocidos: {', '.join(sorted(desconocidos))}")
+
+
+def modelo_en_rango(modelo, desde, hasta):
+    """
+    Indica si el año de un modelo está dentro del rango [desde, hasta]
+    """
+    if desde is None and hasta is None:
+        return True
+    try:
+        año = int(modelo)
+    except (TypeError, ValueError):
+        return False
+    return (desde is None or año >= desde) and (hasta is None or año <= hasta)
+
+
+def iterar_json_legado(archivo_json):
+    """
+    Genera uno a uno los registros del arreglo JSON del formato anterior,
+    sin cargar el archivo completo. No genera nada si no existe o está vacío.
+    Los elementos que no son objetos se omiten
+    """
+    if not os.path.exists(archivo_json):
+        return
+    for numero, registro in enumerate(iterar_arreglo_json(archivo_json), start=1):
+        if isinstance(registro, dict):
+            yield registro
+        else:
+            print(f"⚠️ Elemento {numero} de {archivo_json} no es un registro, se omite")
+
+
+def abrir_repositorio(archivo, **opciones):
+    """
+    Abre el almacén adecuado según la extensión del archivo:
+    SQLite para .db/.sqlite/.sqlite3, particionado para un directorio
+    .particiones (o cualquier directorio existente) y JSON por líneas para
+    el resto
+    """
+    if os.path.isdir(archivo) or os.path.splitext(archivo.rstrip("/\\"))[1].lower() == EXTENSION_PARTICIONES:
+        try:
+            from .almacen_particionado import AlmacenParticionado
+        except ImportError:
+            from almacen_particionado import AlmacenParticionado
+        return AlmacenParticionado(archivo, **opciones)
+
+    if os.path.splitext(archivo)[1].lower() in EXTENSIONES_SQLITE:
+        try:
+            from .almacen_sqlite import AlmacenSQLite
+        except ImportError:
+            from almacen_sqlite import AlmacenSQLite
+        return AlmacenSQLite(archivo, **opciones)
+
+    try:
+        from .almacen import AlmacenRegistros
+    except ImportError:
+        from almacen import AlmacenRegistros
+    return AlmacenRegistros(archivo, **opciones)
@@ -0,0 +1,574 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    from . import metricas
+    from .bulk import contar_lote, entero_positivo, validar_lote
+    from .repositorio import RegistroDuplicadoError, abrir_repositorio
+    from .validacion import CAMPOS, Validacion
+except ImportError:
+    import metricas
+    from bulk import contar_lote, entero_positivo, validar_lote
+    from repositorio import RegistroDuplicadoError, abrir_repositorio
+    from validacion import CAMPOS, Validacion
+
+# Registros por lote enviado a un proceso trabajador
+TAMANO_LOTE = 1000
+
+# Lotes en vuelo por proceso: limita la memoria de una solicitud grande
+LOTES_POR_PROCESO = 2
+
+# Tamaño máximo del cuerpo de las solicitudes que no se leen por partes
+MAXIMO_CUERPO = 1 << 20
+
+# Tamaño de cada lectura del cuerpo
+TAMANO_BLOQUE = 1 << 16
+
+# Tamaño máximo de un registro en /validar/lote
+MAXIMO_LINEA = 1 << 20
+
+# Resultados de búsqueda por defecto
+LIMITE_BUSQUEDA = 100
+
+ESTADOS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+TIPO_JSON = "application/json; charset=utf-8"
+TIPO_JSONL = "application/x-ndjson; charset=utf-8"
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con un estado HTTP y un mensaje"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def _a_json(objeto):
+    """
+    Serializa una respuesta JSON en UTF-8
+    """
+    return json.dumps(objeto, ensure_ascii=False).encode("utf-8")
+
+
+def _valores(linea):
+    """
+    Convierte una línea JSON en los valores de CAMPOS (None si no es un objeto)
+    """
+    try:
+        registro = json.loads(linea)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(registro, dict):
+        return None
+    return tuple(registro.get(campo, "") for campo in CAMPOS)
+
+
+async def _leer_linea(lector):
+    """
+    Lee una línea de la solicitud; las que superan el límite del lector
+    se responden con 413
+    """
+    try:
+        return await lector.readline()
+    except (asyncio.LimitOverrunError, ValueError):
+        raise ErrorHTTP(413, "Línea demasiado larga") from None
+
+
+class Solicitud:
+    """Solicitud HTTP/1.1 con el cuerpo pendiente de leer"""
+
+    def __init__(self, lector, metodo, destino, version, encabezados):
+        self.lector = lector
+        self.metodo = metodo
+        self.version = version
+        self.encabezados = encabezados
+        partes = urlsplit(destino)
+        self.ruta = unquote(partes.path)
+        self.consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+        self.cuerpo_leido = False
+        # Pasa a True cuando ya se enviaron los encabezados de la respuesta
+        self.respuesta_iniciada = False
+        # La respuesta termina al cerrar la conexión (sin Content-Length ni chunked)
+        self.cerrar_al_responder = False
+
+    @property
+    def mantener_conexion(self):
+        if self.cerrar_al_responder:
+            return False
+        conexion = self.encabezados.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return conexion == "keep-alive"
+        return conexion != "close"
+
+    async def bloques(self):
+        """
+        Genera el cuerpo por partes, con Content-Length o
+        Transfer-Encoding: chunked
+        """
+        if "chunked" in self.encabezados.get("transfer-encoding", "").lower():
+            while True:
+                linea = await _leer_linea(self.lector)
+                try:
+                    tamaño = int(linea.split(b";")[0].strip() or b"0", 16)
+                except ValueError:
+                    raise ErrorHTTP(400, "Tamaño de bloque inválido") from None
+                if tamaño == 0:
+                    # Encabezados finales opcionales hasta la línea vacía
+                    while (await _leer_linea(self.lector)).strip():
+                        pass
+                    break
+                while tamaño > 0:
+                    bloque = await self.lector.readexactly(min(TAMANO_BLOQUE, tamaño))
+                    tamaño -= len(bloque)
+                    yield bloque
+                await self.lector.readexactly(2)
+        else:
+            pendiente = int(self.encabezados.get("content-length", "0"))
+            while pendiente > 0:
+                bloque = await self.lector.read(min(TAMANO_BLOQUE, pendiente))
+                if not bloque:
+                    raise ErrorHTTP(400, "Cuerpo incompleto")
+                pendiente -= len(bloque)
+                yield bloque
+        self.cuerpo_leido = True
+
+    async def lineas(self):
+        """
+        Genera las líneas del cuerpo a medida que llegan. Una línea que
+        ocupa varios bloques se junta una sola vez, hasta MAXIMO_LINEA
+        """
+        partes = []
+        largo = 0
+        async for bloque in self.bloques():
+            lineas = bloque.split(b"\n")
+            largo += len(lineas[0])
+            if largo > MAXIMO_LINEA:
+                raise ErrorHTTP(413, f"Una línea supera {MAXIMO_LINEA} bytes")
+            if len(lineas) == 1:
+                partes.append(bloque)
+                continue
+            partes.append(lineas[0])
+            yield b"".join(partes)
+            for linea in lineas[1:-1]:
+                yield linea
+            partes = [lineas[-1]]
+            largo = len(lineas[-1])
+        if largo:
+            yield b"".join(partes)
+
+    async def leer_json(self):
+        """
+        Lee el cuerpo completo (hasta MAXIMO_CUERPO) como JSON
+        """
+        if "content-length" not in self.encabezados and "transfer-encoding" not in self.encabezados:
+            raise ErrorHTTP(411, "Falta Content-Length")
+        partes = []
+        tamaño = 0
+        async for bloque in self.bloques():
+            tamaño += len(bloque)
+            if tamaño > MAXIMO_CUERPO:
+                raise ErrorHTTP(413, f"El cuerpo supera {MAXIMO_CUERPO} bytes; use /validar/lote")
+            partes.append(bloque)
+        try:
+            return json.loads(b"".join(partes))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ErrorHTTP(400, "JSON inválido") from None
+
+
+async def leer_solicitud(lector):
+    """
+    Lee la línea de solicitud y los encabezados. Retorna None si el
+    cliente cerró la conexión
+    """
+    linea = await _leer_linea(lector)
+    if not linea.strip():
+        return None
+    try:
+        metodo, destino, version = linea.decode("latin-1").split()
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de solicitud inválida") from None
+    encabezados = {}
+    while True:
+        linea = await _leer_linea(lector)
+        if not linea.strip():
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        encabezados[nombre.strip().lower()] = valor.strip()
+    largo = encabezados.get("content-length")
+    if largo is not None and not (largo.isascii() and largo.isdigit()):
+        raise ErrorHTTP(400, "Content-Length inválido")
+    return Solicitud(lector, metodo.upper(), destino, version, encabezados)
+
+
+class ServidorValidacion:
+    """
+    Servicio HTTP local (asyncio, solo biblioteca estándar) con las reglas
+    de Validacion y el almacén de registros:
+
+        GET    /salud                 estado del servicio
+        GET    /metricas              métricas en formato Prometheus
+        GET    /estadisticas          conteos por marca, color, década y propietario
+        POST   /validar               valida un registro JSON
+        POST   /validar/lote          valida registros JSON por líneas y
+                                      responde una línea por registro, por partes
+        POST   /registros             valida y guarda un registro
+        GET    /registros?placa=...   busca por placa, chasis, cedula o q (texto)
+        GET    /registros/{id}        obtiene un registro
+        DELETE /registros/{id}        elimina un registro
+
+    La validación por lotes se reparte en un ProcessPoolExecutor y las
+    operaciones del almacén se ejecutan en hilos, así el bucle de eventos
+    sigue atendiendo otras conexiones
+    """
+
+    def __init__(self, repositorio, procesos=None, tamano_lote=TAMANO_LOTE):
+        self.repositorio = repositorio
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_lote = tamano_lote
+        self.ejecutor = None
+        if self.procesos > 1:
+            self.ejecutor = ProcessPoolExecutor(max_workers=self.procesos, initializer=metricas.desactivar)
+
+    async def iniciar(self, host="127.0.0.1", puerto=8080):
+        """
+        Empieza a escuchar y retorna el asyncio.Server
+        """
+        return await asyncio.start_server(self.atender_conexion, host, puerto)
+
+    def cerrar(self):
+        """
+        Libera los procesos trabajadores y el almacén
+        """
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True)
+        self.repositorio.cerrar()
+
+    # ------------------------------------------------------------------
+    # Conexiones y respuestas
+    # ------------------------------------------------------------------
+    async def atender_conexion(self, lector, escritor):
+        """
+        Atiende las solicitudes de una conexión (con keep-alive)
+        """
+        try:
+            while True:
+                try:
+                    solicitud = await leer_solicitud(lector)
+                except ErrorHTTP as e:
+                    await self.responder(escritor, e.estado, {"error": e.mensaje}, cerrar=True)
+                    break
+                if solicitud is None:
+                    break
+                inicio = time.perf_counter()
+                ruta = await self.despachar(solicitud, escritor)
+                metricas.observar("servidor_solicitud_segundos", time.perf_counter() - inicio, ruta=ruta)
+                if not (solicitud.mantener_conexion and solicitud.cuerpo_leido):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def responder(self, escritor, estado, cuerpo=None, tipo=TIPO_JSON, cerrar=False):
+        """
+        Envía una respuesta completa
+        """
+        datos = b"" if cuerpo is None else (cuerpo if isinstance(cuerpo, bytes) else _a_json(cuerpo))
+        encabezados = [f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}"]
+        if estado != 204:
+            encabezados += [f"Content-Type: {tipo}", f"Content-Length: {len(datos)}"]
+        if cerrar:
+            encabezados.append("Connection: close")
+        escritor.write(("\r\n".join(encabezados) + "\r\n\r\n").encode("latin-1") + datos)
+        await escritor.drain()
+
+    async def despachar(self, solicitud, escritor):
+        """
+        Ejecuta la operación de la ruta pedida y responde; los errores se
+        convierten en respuestas JSON. Retorna el nombre de la ruta
+        """
+        metodo, ruta = solicitud.metodo, solicitud.ruta.rstrip("/") or "/"
+        try:
+            if ruta == "/validar/lote":
+                self._exigir(metodo, "POST")
+                await self.validar_lote(solicitud, escritor)
+                return "validar_lote"
+            if ruta == "/salud":
+                self._exigir(metodo, "GET")
+                estado, cuerpo = 200, {"estado": "ok", "registros": await asyncio.to_thread(self.repositorio.contar)}
+                nombre = "salud"
+            elif ruta == "/metricas":
+                self._exigir(metodo, "GET")
+                await self.responder(escritor, 200, metricas.a_prometheus().encode("utf-8"),
+                                     tipo="text/plain; version=0.0.4; charset=utf-8")
+                return "metricas"
+            elif ruta == "/estadisticas":
+                self._exigir(metodo, "GET")
+                estado, cuerpo = 200, await asyncio.to_thread(self.repositorio.estadisticas)
+                nombre = "estadisticas"
+            elif ruta == "/validar":
+                self._exigir(metodo, "POST")
+                estado, cuerpo = self.validar(await solicitud.leer_json())
+                nombre = "validar"
+            elif ruta == "/registros":
+                if metodo == "POST":
+                    estado, cuerpo = await self.registrar(await solicitud.leer_json())
+                else:
+                    self._exigir(metodo, "GET")
+                    estado, cuerpo = await self.consultar(solicitud.consulta)
+                nombre = "registros"
+            elif ruta.startswith("/registros/"):
+                id_registro = ruta[len("/registros/"):]
+                if metodo == "DELETE":
+                    estado, cuerpo = await self.eliminar(id_registro)
+                else:
+                    self._exigir(metodo, "GET")
+                    estado, cuerpo = await self.obtener(id_registro)
+                nombre = "registro"
+            else:
+                raise ErrorHTTP(404, f"Ruta desconocida: {ruta}")
+            if not solicitud.cuerpo_leido:
+                async for _ in solicitud.bloques():
+                    pass
+        except Exception as e:
+            if solicitud.respuesta_iniciada:
+                # Los encabezados ya se enviaron: no cabe otra respuesta
+                raise
+            if isinstance(e, ErrorHTTP):
+                estado, cuerpo, nombre = e.estado, {"error": e.mensaje}, "error"
+            else:
+                print(f"❌ Error en {metodo} {ruta}: {e}")
+                estado, cuerpo, nombre = 500, {"error": str(e)}, "error"
+        await self.responder(escritor, estado, cuerpo, cerrar=not solicitud.cuerpo_leido)
+        return nombre
+
+    @staticmethod
+    def _exigir(metodo, permitido):
+        if metodo != permitido:
+            raise ErrorHTTP(405, f"Método no permitido: {metodo}")
+
+    # ------------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------------
+    @staticmethod
+    def validar(registro):
+        """
+        Valida un registro: {"valido": bool, "errores": {campo: mensaje}}
+        """
+        if not isinstance(registro, dict):
+            raise ErrorHTTP(400, "Se esperaba un objeto JSON")
+        errores = Validacion.validar_registro(registro)
+        return 200, {"valido": not errores, "errores": errores}
+
+    async def validar_lote(self, solicitud, escritor):
+        """
+        Valida un cuerpo JSON por líneas de cualquier tamaño. Los lotes se
+        validan en los procesos trabajadores y la respuesta se envía por
+        partes (chunked), una línea por registro y en el orden recibido,
+        a medida que cada lote termina. Un error a mitad de camino se envía
+        como última línea y cierra la conexión. Los clientes HTTP/1.0 no
+        entienden chunked: a ellos el cuerpo se les termina cerrando la conexión
+        """
+        por_partes = solicitud.version != "HTTP/1.0"
+        if por_partes:
+            escritor.write(
+                f"HTTP/1.1 200 OK\r\nContent-Type: {TIPO_JSONL}\r\n"
+                "Transfer-Encoding: chunked\r\n\r\n".encode("latin-1")
+            )
+        else:
+            escritor.write(
+                f"HTTP/1.1 200 OK\r\nContent-Type: {TIPO_JSONL}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+            )
+            solicitud.cerrar_al_responder = True
+        solicitud.respuesta_iniciada = True
+
+        def escribir(datos):
+            if por_partes:
+                escritor.write(f"{len(datos):x}\r\n".encode("latin-1") + datos + b"\r\n")
+            else:
+                escritor.write(datos)
+        bucle = asyncio.get_running_loop()
+        pendientes = deque()
+        lote = []
+        numero = 0
+
+        async def escribir_siguiente():
+            primero, cantidad, futuro = pendientes.popleft()
+            _, errores_lote = await futuro
+            errores = dict(errores_lote)
+            lineas = []
+            for fila in range(primero, primero + cantidad):
+                errores_fila = errores.get(fila, {})
+                lineas.append(_a_json({"fila": fila, "valido": not errores_fila, "errores": errores_fila}))
+            escribir(b"\n".join(lineas) + b"\n")
+            await escritor.drain()
+
+        def enviar(lote):
+            if self.ejecutor is not None:
+                futuro = bucle.run_in_executor(self.ejecutor, validar_lote, lote)
+                futuro.add_done_callback(lambda f: f.exception() or contar_lote(f.result()))
+            else:
+                futuro = bucle.run_in_executor(None, validar_lote, lote)
+            pendientes.append((lote[0][0], len(lote), futuro))
+
+        try:
+            async for linea in solicitud.lineas():
+                if not linea.strip():
+                    continue
+                numero += 1
+                lote.append((numero, _valores(linea)))
+                if len(lote) >= self.tamano_lote:
+                    enviar(lote)
+                    lote = []
+                    if len(pendientes) >= self.procesos * LOTES_POR_PROCESO:
+                        await escribir_siguiente()
+            if lote:
+                enviar(lote)
+            while pendientes:
+                await escribir_siguiente()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            # Los encabezados ya se enviaron: el error va como última línea
+            if not isinstance(e, ErrorHTTP):
+                print(f"❌ Error en la validación por lotes: {e}")
+            for _, _, futuro in pendientes:
+                futuro.cancel()
+            escribir(_a_json({"error": getattr(e, "mensaje", str(e))}) + b"\n")
+            solicitud.cuerpo_leido = False
+        if por_partes:
+            escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+
+    async def registrar(self, registro):
+        """
+        Valida y guarda un registro: 201 con su id, 422 si es inválido
+        o 409 si la placa o el chasis ya existen
+        """
+        estado, resultado = self.validar(registro)
+        if not resultado["valido"]:
+            return 422, resultado
+        datos = {campo: str(registro[campo]).strip() for campo in CAMPOS}
+        try:
+            with metricas.medir("almacen_guardar_segundos"):
+                id_registro = await asyncio.to_thread(self.repositorio.agregar, datos)
+        except RegistroDuplicadoError as e:
+            return 409, {"valido": False, "errores": {e.campo: e.mensaje}}
+        return 201, {"id": id_registro}
+
+    async def consultar(self, consulta):
+        """
+        Busca por placa o chasis (un registro), por cédula (lista) o
+        por texto libre en q (lista, hasta `limite` resultados)
+        """
+        if "placa" in consulta or "chasis" in consulta:
+            campo = "placa" if "placa" in consulta else "chasis"
+            buscar = self.repositorio.buscar_por_placa if campo == "placa" else self.repositorio.buscar_por_chasis
+            registro = await asyncio.to_thread(buscar, consulta[campo])
+            if registro is None:
+                raise ErrorHTTP(404, f"No existe un registro con {campo} {consulta[campo]}")
+            return 200, registro.a_dict()
+        if "cedula" in consulta:
+            registros = await asyncio.to_thread(self.repositorio.buscar_por_cedula, consulta["cedula"])
+        elif "q" in consulta:
+            with metricas.medir("busqueda_segundos"):
+                registros = await asyncio.to_thread(self.repositorio.buscar, consulta["q"])
+        else:
+            raise ErrorHTTP(400, "Indique placa, chasis, cedula o q")
+        try:
+            limite = int(consulta.get("limite", LIMITE_BUSQUEDA))
+        except ValueError:
+            limite = -1
+        if limite < 0:
+            raise ErrorHTTP(400, "limite debe ser un número mayor o igual a 0")
+        return 200, {
+            "total": len(registros),
+            "registros": [registro.a_dict() for registro in registros[:limite]],
+        }
+
+    async def obtener(self, id_registro):
+        """
+        Retorna un registro por su id
+        """
+        registro = await asyncio.to_thread(self.repositorio.obtener, id_registro)
+        if registro is None:
+            raise ErrorHTTP(404, f"No existe el registro {id_registro}")
+        return 200, registro.a_dict()
+
+    async def eliminar(self, id_registro):
+        """
+        Elimina un registro por su id: 204, o 404 si no existe
+        """
+        with metricas.medir("almacen_eliminar_segundos"):
+            eliminado = await asyncio.to_thread(self.repositorio.eliminar, id_registro)
+        if not eliminado:
+            raise ErrorHTTP(404, f"No existe el registro {id_registro}")
+        return 204, None
+
+
+def crear_parser():
+    """Construye el parser de argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m Aplicacion_regex.servidor",
+        description="Servicio HTTP local de validación y registro de vehículos"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha")
+    parser.add_argument("--puerto", type=int, default=8080, help="Puerto de escucha")
+    parser.add_argument("--archivo", default=os.environ.get("REGISTROS_VEHICULOS", "registros_vehiculos.jsonl"),
+                        help="Archivo de registros (.jsonl o .db)")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos para la validación por lotes; por defecto, uno por núcleo")
+    parser.add_argument("--tamano-lote", type=entero_positivo, default=TAMANO_LOTE,
+                        help="Registros por lote enviado a cada proceso")
+    return parser
+
+
+async def servir(args):
+    """
+    Abre el almacén y atiende solicitudes hasta que se interrumpa
+    """
+    servicio = ServidorValidacion(abrir_repositorio(args.archivo), args.procesos, args.tamano_lote)
+    try:
+        await asyncio.to_thread(servicio.repositorio.precargar)
+        servidor = await servicio.iniciar(args.host, args.puerto)
+        print(f"🌐 Servidor escuchando en http://{args.host}:{args.puerto} ({args.archivo})")
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    args = crear_parser().parse_args(argv)
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        print("👋 Servidor detenido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Alturas aproximadas en píxeles del encabezado y de cada fila del Treeview
+ALTO_ENCABEZADO = 25
+ALTO_FILA = 20
+
+MENSAJE_VACIO = "No hay registros"
+
+# iid de la fila que muestra un mensaje en lugar de un registro
+IID_MENSAJE = "__mensaje__"
+
+# Prefijo del iid de las filas que esperan su página del hilo trabajador
+PREFIJO_PENDIENTE = "__pendiente__"
+MENSAJE_PENDIENTE = "Cargando..."
+
+
+class TablaVirtual:
+    """
+    Treeview virtualizado: solo existen como ítems las filas visibles.
+    Las filas se piden al origen de datos a medida que se desplaza la tabla,
+    con un pequeño margen en caché, así que el tiempo de apertura y la
+    memoria no dependen de la cantidad de registros.
+
+    Con un EjecutorTareas, el conteo y las páginas se piden en el hilo
+    trabajador y, mientras llegan, la tabla muestra filas "Cargando...":
+    el hilo de Tk nunca espera al origen de datos
+    """
+
+    def __init__(self, padre, columnas, anchos, contar, obtener_filas, margen=50,
+                 al_ordenar=None, tareas=None):
+        """
+        contar(): cantidad total de filas
+        obtener_filas(inicio, cantidad): lista de (id, valores) de esa página
+        margen: filas adicionales que se piden antes y después de las visibles
+        al_ordenar(indice): se llama al hacer clic en el encabezado de una columna
+        tareas: EjecutorTareas en el que se llaman contar y obtener_filas
+        (sin él, se llaman en el hilo de Tk)
+        """
+        self.columnas = columnas
+        self.contar = contar
+        self.obtener_filas = obtener_filas
+        self.margen = margen
+        self.tareas = tareas
+
+        self.total = 0
+        self.version = None
+        self.inicio = 0
+        self.filas_visibles = 15
+        self._cache_inicio = 0
+        self._cache = []
+        # Cada refresco invalida las páginas pedidas antes
+        self._generacion = 0
+        self._pedido = None
+        self._rango_pedido = None
+        self._fila_pendiente = (MENSAJE_PENDIENTE,) + ("",) * (len(columnas) - 1)
+
+        self.tabla = ttk.Treeview(padre, columns=columnas, show="headings", height=self.filas_visibles)
+        for indice, (col, ancho) in enumerate(zip(columnas, anchos)):
+            if al_ordenar is not None:
+                self.tabla.heading(col, text=col, command=lambda i=indice: al_ordenar(i))
+            else:
+                self.tabla.heading(col, text=col)
+            self.tabla.column(col, width=ancho, minwidth=ancho)
+
+        # La barra vertical controla el desplazamiento virtual, no el del Treeview
+        self.scroll_y = ttk.Scrollbar(padre, orient=tk.VERTICAL, command=self._desplazar)
+        self.scroll_x = ttk.Scrollbar(padre, orient=tk.HORIZONTAL, command=self.tabla.xview)
+        self.tabla.configure(xscrollcommand=self.scroll_x.set)
+
+        self.tabla.bind("<Configure>", self._al_redimensionar)
+        self.tabla.bind("<MouseWheel>", self._al_rueda)
+        self.tabla.bind("<Button-4>", lambda e: self.desplazar_a(self.inicio - 3))
+        self.tabla.bind("<Button-5>", lambda e: self.desplazar_a(self.inicio + 3))
+        self.tabla.bind("<Prior>", lambda e: self.desplazar_a(self.inicio - self.filas_visibles))
+        self.tabla.bind("<Next>", lambda e: self.desplazar_a(self.inicio + self.filas_visibles))
+        self.tabla.bind("<Home>", lambda e: self.desplazar_a(0))
+        self.tabla.bind("<End>", lambda e: self.desplazar_a(self.total))
+        self.tabla.bind("<Up>", self._al_flecha_arriba)
+        self.tabla.bind("<Down>", self._al_flecha_abajo)
+
+    def grid(self, row=0, column=0):
+        """
+        Ubica la tabla y sus barras de desplazamiento en el contenedor
+        """
+        self.tabla.grid(row=row, column=column, sticky="nsew")
+        self.scroll_y.grid(row=row, column=column + 1, sticky="ns")
+        self.scroll_x.grid(row=row + 1, column=column, sticky="ew")
+
+    # ------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------
+    def refrescar(self, version=None, inicio=None, al_terminar=None, al_fallar=None):
+        """
+        Vuelve a contar las filas, descarta la caché y redibuja la ventana visible.
+        version es la marca de cambios del origen con la que quedan los datos;
+        inicio, la posición desde la que se muestra (por defecto, la actual).
+        El conteo y la primera página se piden juntos en segundo plano; hasta
+        que llegan se sigue mostrando el contenido anterior. al_terminar() se
+        llama cuando la tabla ya tiene el total nuevo y al_fallar(error) si
+        el origen falla
+        """
+        self.version = version
+        self._generacion += 1
+        self._cancelar_pedido()
+        inicio = self.inicio if inicio is None else int(inicio)
+        filas_visibles = self.filas_visibles
+
+        def contar_y_pedir(tarea):
+            total = self.contar()
+            desde = max(0, min(inicio, total - filas_visibles) - self.margen)
+            return total, desde, self.obtener_filas(desde, filas_visibles + 2 * self.margen)
+
+        def al_contar(resultado, generacion=self._generacion):
+            if generacion != self._generacion:
+                return
+            self.total, self._cache_inicio, self._cache = resultado
+            self.desplazar_a(inicio)
+            if al_terminar is not None:
+                al_terminar()
+
+        self._en_segundo_plano(contar_y_pedir, "Contar filas", al_contar, al_fallar)
+
+    def _pagina(self, inicio, cantidad):
+        """
+        Retorna las filas [inicio, inicio + cantidad) usando la caché.
+        Si la ventana se sale de ella, pide la página al origen y, mientras
+        no llegue, completa con filas pendientes
+        """
+        fin = min(inicio + cantidad, self.total)
+        cache_fin = self._cache_inicio + len(self._cache)
+        if inicio < self._cache_inicio or fin > cache_fin:
+            desde = max(0, inicio - self.margen)
+            self._pedir(desde, fin - desde + self.margen)
+        filas = []
+        for posicion in range(inicio, fin):
+            indice = posicion - self._cache_inicio
+            if 0 <= indice < len(self._cache):
+                filas.append(self._cache[indice])
+            else:
+                filas.append((f"{PREFIJO_PENDIENTE}{posicion}", self._fila_pendiente))
+        return filas
+
+    def _pedir(self, inicio, cantidad):
+        """
+        Pide una página al origen; un pedido nuevo reemplaza al que
+        todavía no llegó. Al llegar, la página pasa a ser la caché y se
+        redibuja la tabla
+        """
+        if self._rango_pedido == (inicio, cantidad):
+            return
+        self._cancelar_pedido()
+        self._rango_pedido = (inicio, cantidad)
+
+        def al_llegar(filas, generacion=self._generacion):
+            if generacion != self._generacion:
+                return
+            self._pedido = self._rango_pedido = None
+            self._cache_inicio, self._cache = inicio, filas
+            self._dibujar()
+
+        def al_fallar(e):
+            self._pedido = self._rango_pedido = None
+            print(f"❌ Error al obtener filas: {e}")
+
+        self._pedido = self._en_segundo_plano(
+            lambda tarea: self.obtener_filas(inicio, cantidad), "Obtener filas",
+            al_llegar, al_fallar
+        )
+
+    def _cancelar_pedido(self):
+        """
+        Descarta la página pedida que todavía no llegó
+        """
+        if self._pedido is not None:
+            self._pedido.cancelar()
+        self._pedido = self._rango_pedido = None
+
+    def _en_segundo_plano(self, funcion, descripcion, al_terminar, al_fallar=None):
+        """
+        Ejecuta funcion(tarea) en el hilo trabajador y entrega el resultado
+        en el hilo de Tk. Sin ejecutor, la ejecuta en el momento
+        """
+        if self.tareas is not None:
+            return self.tareas.ejecutar(
+                funcion, descripcion=descripcion,
+                al_terminar=al_terminar, al_fallar=al_fallar
+            )
+        try:
+            resultado = funcion(None)
+        except Exception as e:
+            if al_fallar is None:
+                raise
+            al_fallar(e)
+        else:
+            al_terminar(resultado)
+        return None
+
+    # ------------------------------------------------------------------
+    # Dibujo y desplazamiento
+    # ------------------------------------------------------------------
+    def desplazar_a(self, inicio):
+        """
+        Muestra las filas a partir de la posición dada
+        """
+        maximo = max(0, self.total - self.filas_visibles)
+        self.inicio = max(0, min(int(inicio), maximo))
+        self._dibujar()
+
+    def _dibujar(self):
+        """
+        Lleva los ítems del Treeview a las filas visibles aplicando solo las
+        diferencias por id: se borran las filas que salieron, se insertan las
+        que entraron y las demás se reubican sin volver a crearse
+        """
+        if not self.total:
+            self.mostrar_mensaje(MENSAJE_VACIO)
+            return
+
+        filas = self._pagina(self.inicio, self.filas_visibles)
+        nuevas = {id_fila for id_fila, _ in filas}
+        salientes = [iid for iid in self.tabla.get_children() if iid not in nuevas]
+        if salientes:
+            self.tabla.delete(*salientes)
+
+        for posicion, (id_fila, valores) in enumerate(filas):
+            if self.tabla.exists(id_fila):
+                self.tabla.move(id_fila, "", posicion)
+            else:
+                self.tabla.insert("", posicion, iid=id_fila, values=valores)
+
+        fin = min(self.inicio + self.filas_visibles, self.total)
+        self.scroll_y.set(self.inicio / self.total, fin / self.total)
+
+    def marcar_orden(self, indice=None, descendente=False):
+        """
+        Muestra una flecha en el encabezado de la columna ordenada
+        (ninguna si indice es None)
+        """
+        flecha = " ▼" if descendente else " ▲"
+        for posicion, col in enumerate(self.columnas):
+            self.tabla.heading(col, text=col + (flecha if posicion == indice else ""))
+
+    def mostrar_mensaje(self, texto):
+        """
+        Reemplaza el contenido de la tabla por una sola fila con un mensaje
+        """
+        self.tabla.delete(*self.tabla.get_children())
+        self.tabla.insert("", tk.END, iid=IID_MENSAJE, values=(texto,) + ("",) * (len(self.columnas) - 1))
+        self.scroll_y.set(0, 1)
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """
+        Comando de la barra vertical: 'moveto fracción' o 'scroll n units|pages'
+        """
+        if accion == "moveto":
+            self.desplazar_a(float(cantidad) * self.total)
+        elif accion == "scroll":
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self.desplazar_a(self.inicio + int(cantidad) * paso)
+
+    def _al_rueda(self, event):
+        """
+        Desplaza con la rueda del ratón (Windows y macOS)
+        """
+        self.desplazar_a(self.inicio - (3 if event.delta > 0 else -3))
+        return "break"
+
+    def _al_flecha_arriba(self, event):
+        """
+        En la primera fila visible, la flecha hacia arriba desplaza la ventana
+        """
+        hijos = self.tabla.get_children()
+        if hijos and self.tabla.focus() == hijos[0] and self.inicio > 0:
+            self.desplazar_a(self.inicio - 1)
+            self._enfocar(self.tabla.get_children()[0])
+            return "break"
+
+    def _al_flecha_abajo(self, event):
+        """
+        En la última fila visible, la flecha hacia abajo desplaza la ventana
+        """
+        hijos = self.tabla.get_children()
+        if hijos and self.tabla.focus() == hijos[-1] and self.inicio + self.filas_visibles < self.total:
+            self.desplazar_a(self.inicio + 1)
+            self._enfocar(self.tabla.get_children()[-1])
+            return "break"
+
+    def _enfocar(self, iid):
+        """
+        Selecciona y enfoca un ítem
+        """
+        self.tabla.selection_set(iid)
+        self.tabla.focus(iid)
+
+    def _al_redimensionar(self, event):
+        """
+        Ajusta la cantidad de filas visibles al alto disponible
+        """
+        filas = max(1, (event.height - ALTO_ENCABEZADO) // ALTO_FILA)
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self.desplazar_a(self.inicio)
+
+    # ------------------------------------------------------------------
+    # Selección
+    # ------------------------------------------------------------------
+    def seleccion(self):
+        """
+        Ids de los registros seleccionados (sin la fila de mensaje ni las pendientes)
+        """
+        return tuple(
+            iid for iid in self.tabla.selection()
+            if iid != IID_MENSAJE and not iid.startswith(PREFIJO_PENDIENTE)
+        )
+
+    def valores(self, iid):
+        """
+        Valores mostrados en una fila
+        """
+        return self.tabla.item(iid)['values']
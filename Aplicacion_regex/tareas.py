@@ -0,0 +1,150 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Cada cuánto revisa el hilo de Tk los mensajes de los trabajadores
+INTERVALO_MS = 50
+
+
+class TareaCancelada(Exception):
+    """La tarea fue cancelada por el usuario"""
+
+
+class Tarea:
+    """
+    Operación en segundo plano. La función que se ejecuta recibe la tarea
+    para informar su avance y saber si fue cancelada
+    """
+
+    def __init__(self, ejecutor, descripcion, al_progreso=None):
+        self.descripcion = descripcion
+        self._ejecutor = ejecutor
+        self._al_progreso = al_progreso
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self):
+        """
+        Indica si se pidió cancelar la tarea
+        """
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        """
+        Solicita la cancelación; la tarea se detiene en su próximo reporte de avance
+        """
+        self._cancelada.set()
+
+    def reportar_progreso(self, fraccion, mensaje=None):
+        """
+        Envía el avance (0 a 1) al hilo de Tk. Lanza TareaCancelada si
+        se pidió cancelar la tarea
+        """
+        if self.cancelada:
+            raise TareaCancelada(self.descripcion)
+        if self._al_progreso is not None:
+            self._ejecutor._publicar(self._al_progreso, fraccion, mensaje)
+
+
+class EjecutorTareas:
+    """
+    Ejecuta operaciones de archivo en un hilo trabajador y entrega sus
+    resultados al hilo de Tk mediante una cola revisada con root.after,
+    para que la interfaz nunca se congele.
+
+    Las tareas se ejecutan de a una y en el orden en que se enviaron
+    """
+
+    def __init__(self, root, intervalo_ms=INTERVALO_MS):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tareas")
+        self._mensajes = queue.Queue()
+        self._pendientes = 0
+        self._revisando = False
+
+    def ejecutar(self, funcion, *args, descripcion="", al_terminar=None,
+                 al_fallar=None, al_progreso=None):
+        """
+        Ejecuta funcion(tarea, *args) en segundo plano.
+        al_terminar(resultado), al_fallar(error) y al_progreso(fracción, mensaje)
+        se llaman en el hilo de Tk. Una tarea cancelada no llama a ninguno
+        """
+        tarea = Tarea(self, descripcion, al_progreso)
+        self._pendientes += 1
+        self._hilo.submit(self._correr, tarea, funcion, args, al_terminar, al_fallar)
+        self._programar_revision()
+        return tarea
+
+    def _correr(self, tarea, funcion, args, al_terminar, al_fallar):
+        """
+        Cuerpo de la tarea en el hilo trabajador
+        """
+        try:
+            if tarea.cancelada:
+                raise TareaCancelada(tarea.descripcion)
+            resultado = funcion(tarea, *args)
+        except TareaCancelada:
+            self._publicar(None)
+        except Exception as e:
+            print(f"❌ Error en tarea '{tarea.descripcion}': {e}")
+            self._publicar(self._entregar, tarea, al_fallar, e)
+        else:
+            self._publicar(self._entregar, tarea, al_terminar, resultado)
+        finally:
+            self._publicar(self._tarea_terminada)
+
+    def _publicar(self, funcion, *args):
+        """
+        Encola una llamada para el hilo de Tk
+        """
+        self._mensajes.put((funcion, args))
+
+    def _entregar(self, tarea, funcion, *args):
+        """
+        Llama a al_terminar o al_fallar en el hilo de Tk, salvo que la tarea
+        se haya cancelado: la cancelación también ocurre en el hilo de Tk,
+        así que se respeta aunque llegue después de que la función terminó
+        o aunque la función nunca haya vuelto a reportar su avance
+        """
+        if funcion is not None and not tarea.cancelada:
+            funcion(*args)
+
+    def _tarea_terminada(self):
+        """
+        Descuenta una tarea pendiente (en el hilo de Tk)
+        """
+        self._pendientes -= 1
+
+    def _programar_revision(self):
+        """
+        Agenda la próxima revisión de la cola si no hay una agendada
+        """
+        if not self._revisando:
+            self._revisando = True
+            self.root.after(self.intervalo_ms, self._revisar)
+
+    def _revisar(self):
+        """
+        Atiende en el hilo de Tk los mensajes encolados por el trabajador
+        """
+        while True:
+            try:
+                funcion, args = self._mensajes.get_nowait()
+            except queue.Empty:
+                break
+            if funcion is not None:
+                try:
+                    funcion(*args)
+                except Exception as e:
+                    print(f"❌ Error al procesar resultado de tarea: {e}")
+
+        self._revisando = False
+        if self._pendientes:
+            self._programar_revision()
+
+    def cerrar(self):
+        """
+        Espera a que terminen las tareas en curso y libera el hilo trabajador
+        """
+        self._hilo.shutdown(wait=True)
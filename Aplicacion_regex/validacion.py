@@ -1,24 +1,76 @@
 import re
 
+try:
+    from . import metricas
+except ImportError:
+    import metricas
+
+# Orden de los campos de un registro de vehículo
+CAMPOS = (
+    "placa", "marca", "modelo", "color", "chasis",
+    "motor", "cedula", "nombre", "correo", "telefono"
+)
+
+# Expresiones de cada campo, sin anclas. Se compilan una sola vez al
+# importar el módulo, por separado (PATRON_*) y fusionadas en PATRON_FILA
+EXPRESIONES = {
+    "placa": r'[A-Z]{3}\d{3}|[A-Z]{3}\d{2}[A-Z]',
+    "marca": r'[A-Za-záéíóúÁÉÍÓÚñÑ\s]+',
+    # Solo para PATRON_FILA: validar_modelo compara el año como número
+    "modelo": r'19[0-9]{2}|20[01][0-9]|202[0-6]',
+    "color": r'[A-Za-záéíóúÁÉÍÓÚñÑ]+',
+    "chasis": r'[A-Za-z0-9]{17}',
+    "motor": r'[A-Za-z0-9]+',
+    "cedula": r'\d{7,10}',
+    "nombre": r'[A-Za-záéíóúÁÉÍÓÚñÑ\s]+',
+    "correo": r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+    "telefono": r'\d{10}',
+}
+
+PATRON_PLACA = re.compile(rf'^(?:{EXPRESIONES["placa"]})$')
+PATRON_MARCA = re.compile(rf'^(?:{EXPRESIONES["marca"]})$')
+PATRON_COLOR = re.compile(rf'^(?:{EXPRESIONES["color"]})$')
+PATRON_CHASIS = re.compile(rf'^(?:{EXPRESIONES["chasis"]})$')
+PATRON_MOTOR = re.compile(rf'^(?:{EXPRESIONES["motor"]})$')
+PATRON_CEDULA = re.compile(rf'^(?:{EXPRESIONES["cedula"]})$')
+PATRON_NOMBRE = re.compile(rf'^(?:{EXPRESIONES["nombre"]})$')
+PATRON_CORREO = re.compile(rf'^(?:{EXPRESIONES["correo"]})$')
+PATRON_TELEFONO = re.compile(rf'^(?:{EXPRESIONES["telefono"]})$')
+
+# Separador de los valores de una fila para PATRON_FILA. Ninguna
+# expresión acepta el carácter nulo, así que cada grupo abarca
+# exactamente un valor
+SEPARADOR_FILA = "\0"
+
+# Una fila completa (valores en el orden de CAMPOS) en un solo match, con un
+# grupo con nombre por campo. Cada valor debe empezar y terminar sin
+# espacios: así no está vacío y coincide con su versión recortada, que es
+# la que validan los validadores por campo. Solo acepta filas que
+# validar_registro también acepta; las demás se revisan campo por campo
+PATRON_FILA = re.compile(SEPARADOR_FILA.join(
+    rf'(?=\S)(?P<{campo}>{EXPRESIONES[campo]})(?<=\S)' for campo in CAMPOS
+))
+
+MENSAJE_OBLIGATORIO = "Campo obligatorio"
+
+
 class Validacion:
     """Clase independiente para validaciones mediante expresiones regulares"""
-    
+
     @staticmethod
     def validar_placa(placa):
         """
         Valida placa colombiana (formato: ABC123 o ABC12D)
         """
-        patron = r'^[A-Z]{3}\d{3}$|^[A-Z]{3}\d{2}[A-Z]$'
-        return bool(re.match(patron, placa.upper()))
-    
+        return bool(PATRON_PLACA.match(placa.upper()))
+
     @staticmethod
     def validar_marca(marca):
         """
         Valida marca: solo letras y espacios
         """
-        patron = r'^[A-Za-záéíóúÁÉÍÓÚñÑ\s]+$'
-        return bool(re.match(patron, marca))
-    
+        return bool(PATRON_MARCA.match(marca))
+
     @staticmethod
     def validar_modelo(modelo):
         """
@@ -29,59 +81,121 @@ class Validacion:
             return 1900 <= año <= 2026
         except ValueError:
             return False
-    
+
     @staticmethod
     def validar_color(color):
         """
         Valida color: solo letras
         """
-        patron = r'^[A-Za-záéíóúÁÉÍÓÚñÑ]+$'
-        return bool(re.match(patron, color))
-    
+        return bool(PATRON_COLOR.match(color))
+
     @staticmethod
     def validar_chasis(chasis):
         """
         Valida número de chasis: alfanumérico de 17 caracteres
         """
-        patron = r'^[A-Za-z0-9]{17}$'
-        return bool(re.match(patron, chasis))
-    
+        return bool(PATRON_CHASIS.match(chasis))
+
     @staticmethod
     def validar_motor(motor):
         """
         Valida número de motor: alfanumérico
         """
-        patron = r'^[A-Za-z0-9]+$'
-        return bool(re.match(patron, motor))
-    
+        return bool(PATRON_MOTOR.match(motor))
+
     @staticmethod
     def validar_cedula(cedula):
         """
         Valida cédula: solo números de 7-10 dígitos
         """
-        patron = r'^\d{7,10}$'
-        return bool(re.match(patron, cedula))
-    
+        return bool(PATRON_CEDULA.match(cedula))
+
     @staticmethod
     def validar_nombre(nombre):
         """
         Valida nombre: solo letras y espacios
         """
-        patron = r'^[A-Za-záéíóúÁÉÍÓÚñÑ\s]+$'
-        return bool(re.match(patron, nombre))
-    
+        return bool(PATRON_NOMBRE.match(nombre))
+
     @staticmethod
     def validar_correo(correo):
         """
         Valida correo electrónico: formato usuario@dominio.com
         """
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(patron, correo))
-    
+        return bool(PATRON_CORREO.match(correo))
+
     @staticmethod
     def validar_telefono(telefono):
         """
         Valida teléfono: 10 dígitos
         """
-        patron = r'^\d{10}$'
-        return bool(re.match(patron, telefono))
\ No newline at end of file
+        return bool(PATRON_TELEFONO.match(telefono))
+
+    @staticmethod
+    def validar_campo(campo, valor):
+        """
+        Valida un solo campo según la tabla de reglas.
+        Retorna el mensaje de error o None si el valor es válido
+        """
+        valor = str(valor).strip() if valor is not None else ""
+        if not valor:
+            error = MENSAJE_OBLIGATORIO
+        else:
+            validador, mensaje = REGLAS[campo]
+            error = None if validador(valor) else mensaje
+        if metricas.ACTIVAS:
+            metricas.contar_validaciones((campo,), 1, ({campo: error},) if error else ())
+        return error
+
+    @staticmethod
+    def validar_registro(datos):
+        """
+        Valida los diez campos de un registro en una sola pasada.
+        Retorna un diccionario {campo: mensaje de error}; vacío si todo es válido
+        """
+        errores = {}
+        for campo, (validador, mensaje) in REGLAS.items():
+            valor = datos.get(campo)
+            valor = str(valor).strip() if valor is not None else ""
+            if not valor:
+                errores[campo] = MENSAJE_OBLIGATORIO
+            elif not validador(valor):
+                errores[campo] = mensaje
+        if metricas.ACTIVAS:
+            metricas.contar_validaciones(CAMPOS, 1, (errores,))
+        return errores
+
+    @staticmethod
+    def validar_fila(valores):
+        """
+        Valida una fila con los valores en el orden de CAMPOS (por ejemplo,
+        una fila de un CSV). Primero prueba la fila entera contra
+        PATRON_FILA, en un solo match; solo si no coincide se valida campo
+        por campo con validar_registro, para dar los mensajes exactos.
+        Retorna un diccionario {campo: mensaje de error}; vacío si todo es válido
+        """
+        try:
+            coincide = PATRON_FILA.fullmatch(SEPARADOR_FILA.join(valores)) is not None
+        except TypeError:
+            # Algún valor no es texto (por ejemplo, un año numérico en JSON)
+            coincide = False
+        if coincide:
+            if metricas.ACTIVAS:
+                metricas.contar_validaciones(CAMPOS, 1)
+            return {}
+        return Validacion.validar_registro(dict(zip(CAMPOS, valores)))
+
+
+# Tabla de reglas: campo -> (función validadora, mensaje de error)
+REGLAS = {
+    "placa": (Validacion.validar_placa, "Formato inválido. Ej: ABC123 o ABC12D"),
+    "marca": (Validacion.validar_marca, "Solo letras y espacios"),
+    "modelo": (Validacion.validar_modelo, "Año entre 1900 y 2026"),
+    "color": (Validacion.validar_color, "Solo letras"),
+    "chasis": (Validacion.validar_chasis, "17 caracteres alfanuméricos"),
+    "motor": (Validacion.validar_motor, "Solo caracteres alfanuméricos"),
+    "cedula": (Validacion.validar_cedula, "7-10 dígitos numéricos"),
+    "nombre": (Validacion.validar_nombre, "Solo letras y espacios"),
+    "correo": (Validacion.validar_correo, "Formato: usuario@dominio.com"),
+    "telefono": (Validacion.validar_telefono, "10 dígitos numéricos"),
+}
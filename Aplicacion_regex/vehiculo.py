@@ -0,0 +1,98 @@
+import sys
+
+try:
+    from .validacion import CAMPOS
+except ImportError:
+    from validacion import CAMPOS
+
+# Campos con pocos valores distintos (muchas filas repiten la misma marca,
+# color o año): se internan para que todas compartan una sola cadena
+CAMPOS_REPETIDOS = ("marca", "modelo", "color")
+
+
+def _texto(valor):
+    """
+    Convierte un valor a texto sin espacios sobrantes ('' si es None)
+    """
+    return str(valor).strip() if valor is not None else ""
+
+
+class Vehiculo:
+    """
+    Registro de vehículo compacto: usa __slots__ en lugar de un diccionario
+    por instancia y comparte las cadenas de los campos repetidos
+    """
+
+    __slots__ = ("id",) + CAMPOS
+
+    def __init__(self, id, placa="", marca="", modelo="", color="", chasis="",
+                 motor="", cedula="", nombre="", correo="", telefono=""):
+        self.id = id
+        self.placa = _texto(placa)
+        self.marca = sys.intern(_texto(marca))
+        self.modelo = sys.intern(_texto(modelo))
+        self.color = sys.intern(_texto(color))
+        self.chasis = _texto(chasis)
+        self.motor = _texto(motor)
+        self.cedula = _texto(cedula)
+        self.nombre = _texto(nombre)
+        self.correo = _texto(correo)
+        self.telefono = _texto(telefono)
+
+    @classmethod
+    def restaurar(cls, id, placa, marca, modelo, color, chasis, motor, cedula, nombre, correo, telefono):
+        """
+        Crea un vehículo con valores que ya son texto recortado (por ejemplo,
+        leídos de una instantánea), sin volver a normalizarlos
+        """
+        vehiculo = cls.__new__(cls)
+        vehiculo.id = id
+        vehiculo.placa = placa
+        vehiculo.marca = sys.intern(marca)
+        vehiculo.modelo = sys.intern(modelo)
+        vehiculo.color = sys.intern(color)
+        vehiculo.chasis = chasis
+        vehiculo.motor = motor
+        vehiculo.cedula = cedula
+        vehiculo.nombre = nombre
+        vehiculo.correo = correo
+        vehiculo.telefono = telefono
+        return vehiculo
+
+    @classmethod
+    def desde_dict(cls, datos, id=None):
+        """
+        Crea un vehículo desde un diccionario de registro. Si no se indica id
+        se usa el del diccionario
+        """
+        return cls(
+            id if id is not None else datos.get("id"),
+            *(datos.get(campo) for campo in CAMPOS)
+        )
+
+    def a_dict(self):
+        """
+        Diccionario con el id y los campos, tal como se guarda en JSON
+        """
+        return {"id": self.id, **{campo: getattr(self, campo) for campo in CAMPOS}}
+
+    def valores(self):
+        """
+        Tupla con los campos en el orden de CAMPOS
+        """
+        return tuple(getattr(self, campo) for campo in CAMPOS)
+
+    def get(self, campo, defecto=None):
+        """
+        Acceso por nombre de campo, como en un diccionario
+        """
+        return getattr(self, campo, defecto)
+
+    def __getitem__(self, campo):
+        try:
+            return getattr(self, campo)
+        except AttributeError:
+            raise KeyError(campo) from None
+
+    def __repr__(self):
+        return f"Vehiculo({self.id!r}, placa={self.placa!r})"
@@ -0,0 +1,78 @@
+import tkinter as tk
+from tkinter import messagebox
+
+try:
+    from .estadisticas import formatear_resumen
+except ImportError:
+    from estadisticas import formatear_resumen
+
+
+class VentanaEstadisticas:
+    """
+    Ventana con el resumen de la flota registrada: vehículos por marca, por
+    color y por década del modelo, y propietarios con varios vehículos.
+    Los conteos los mantiene el almacén con cada alta y eliminación, así
+    que abrir o actualizar la ventana no recorre los registros
+    """
+
+    def __init__(self, parent, repositorio, tareas):
+        self.parent = parent
+        self.repositorio = repositorio
+        self.tareas = tareas
+
+    def mostrar(self):
+        """Crea y muestra la ventana de estadísticas"""
+        ventana = tk.Toplevel(self.parent)
+        ventana.title("Estadísticas de la flota")
+        ventana.geometry("560x560")
+
+        titulo = tk.Label(
+            ventana,
+            text="RESUMEN DE VEHÍCULOS REGISTRADOS",
+            font=("Arial", 12, "bold"),
+            fg="#2c3e50"
+        )
+        titulo.pack(pady=10)
+
+        texto = tk.Text(ventana, font=("Courier", 9), width=70, height=26, wrap=tk.NONE)
+        texto.pack(fill=tk.BOTH, expand=True, padx=15)
+
+        frame_botones = tk.Frame(ventana)
+        frame_botones.pack(pady=10)
+
+        for etiqueta, comando, color in (
+            ("Actualizar", lambda: self.actualizar(ventana, texto), "#3498db"),
+            ("Cerrar", ventana.destroy, "#95a5a6"),
+        ):
+            tk.Button(
+                frame_botones,
+                text=etiqueta,
+                command=comando,
+                bg=color,
+                fg="white",
+                font=("Arial", 10),
+                width=12
+            ).pack(side=tk.LEFT, padx=5)
+
+        self.actualizar(ventana, texto)
+
+    def actualizar(self, ventana, texto):
+        """Pide el resumen al almacén en segundo plano y lo muestra"""
+        def al_terminar(resumen):
+            if not ventana.winfo_exists():
+                return
+            texto.config(state=tk.NORMAL)
+            texto.delete("1.0", tk.END)
+            texto.insert(tk.END, formatear_resumen(resumen))
+            texto.config(state=tk.DISABLED)
+
+        def al_fallar(e):
+            if ventana.winfo_exists():
+                messagebox.showerror("Error", f"No se pudieron calcular las estadísticas: {e}", parent=ventana)
+
+        self.tareas.ejecutar(
+            lambda tarea: self.repositorio.estadisticas(),
+            descripcion="Estadísticas de la flota",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar
+        )
@@ -0,0 +1,92 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox
+
+try:
+    from . import metricas
+except ImportError:
+    import metricas
+
+
+class VentanaMetricas:
+    """
+    Ventana con los contadores de validación por campo y las latencias de
+    las operaciones de almacenamiento, con opción de exportarlas
+    """
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def mostrar(self):
+        """Crea y muestra la ventana de métricas"""
+        ventana = tk.Toplevel(self.parent)
+        ventana.title("Estadísticas de uso")
+        ventana.geometry("620x520")
+
+        titulo = tk.Label(
+            ventana,
+            text="MÉTRICAS DE VALIDACIÓN Y ALMACENAMIENTO",
+            font=("Arial", 12, "bold"),
+            fg="#2c3e50"
+        )
+        titulo.pack(pady=10)
+
+        texto = tk.Text(ventana, font=("Courier", 9), width=80, height=24, wrap=tk.NONE)
+        texto.pack(fill=tk.BOTH, expand=True, padx=15)
+
+        activas = tk.BooleanVar(value=metricas.ACTIVAS)
+        check_activas = tk.Checkbutton(
+            ventana,
+            text="Recolectar métricas",
+            variable=activas,
+            command=lambda: self.cambiar_estado(activas.get(), texto)
+        )
+        check_activas.pack(pady=2)
+
+        frame_botones = tk.Frame(ventana)
+        frame_botones.pack(pady=10)
+
+        for etiqueta, comando, color in (
+            ("Actualizar", lambda: self.actualizar(texto), "#3498db"),
+            ("Exportar...", lambda: self.exportar(ventana), "#27ae60"),
+            ("Cerrar", ventana.destroy, "#95a5a6"),
+        ):
+            tk.Button(
+                frame_botones,
+                text=etiqueta,
+                command=comando,
+                bg=color,
+                fg="white",
+                font=("Arial", 10),
+                width=12
+            ).pack(side=tk.LEFT, padx=5)
+
+        self.actualizar(texto)
+
+    def actualizar(self, texto):
+        """Vuelve a escribir el resumen de métricas"""
+        texto.config(state=tk.NORMAL)
+        texto.delete("1.0", tk.END)
+        texto.insert(tk.END, metricas.resumen())
+        texto.config(state=tk.DISABLED)
+
+    def cambiar_estado(self, activas, texto):
+        """Enciende o apaga la recolección de métricas"""
+        metricas.activar(activas)
+        print(f"📊 Métricas {'activadas' if activas else 'desactivadas'}")
+        self.actualizar(texto)
+
+    def exportar(self, ventana):
+        """Guarda las métricas en JSON o en formato Prometheus"""
+        ruta = filedialog.asksaveasfilename(
+            parent=ventana,
+            title="Exportar métricas",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Prometheus", "*.prom")]
+        )
+        if not ruta:
+            return
+        try:
+            metricas.guardar(ruta)
+            print(f"📊 Métricas exportadas a {ruta}")
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudieron exportar las métricas: {e}", parent=ventana)
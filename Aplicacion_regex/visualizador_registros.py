@@ -1,14 +1,57 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import json
+from tkinter import filedialog, messagebox, simpledialog
 import os
 
+try:
+    from . import metricas
+    from .exportacion import EXTENSION_COLUMNAS, exportar, interpretar_filtros
+    from .indicador_progreso import IndicadorProgreso
+    from .orden_columnas import ordenar_registros
+    from .repositorio import abrir_repositorio, RegistroDuplicadoError
+    from .tabla_virtual import TablaVirtual
+    from .tareas import EjecutorTareas
+    from .validacion import CAMPOS
+    from .ventana_estadisticas import VentanaEstadisticas
+    from .ventana_metricas import VentanaMetricas
+except ImportError:
+    import metricas
+    from exportacion import EXTENSION_COLUMNAS, exportar, interpretar_filtros
+    from indicador_progreso import IndicadorProgreso
+    from orden_columnas import ordenar_registros
+    from repositorio import abrir_repositorio, RegistroDuplicadoError
+    from tabla_virtual import TablaVirtual
+    from tareas import EjecutorTareas
+    from validacion import CAMPOS
+    from ventana_estadisticas import VentanaEstadisticas
+    from ventana_metricas import VentanaMetricas
+
+# Archivo de registros: .jsonl (JSON por líneas) o .db (SQLite)
+ARCHIVO_REGISTROS = os.environ.get("REGISTROS_VEHICULOS", "registros_vehiculos.jsonl")
+
+# Espera tras la última tecla antes de lanzar la búsqueda
+RETARDO_BUSQUEDA_MS = 250
+
 class VisualizadorRegistros:
     """Clase independiente para visualizar los registros guardados"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, tareas=None):
         self.parent = parent
-        self.archivo_registros = "registros_vehiculos.json"
+        
+        # Hilo trabajador para las operaciones de archivo
+        self.tareas = tareas or EjecutorTareas(parent)
+        
+        # Etiqueta de conteo, búsqueda en curso y orden (campo, descendente)
+        # de cada ventana abierta
+        self.etiquetas_conteo = {}
+        self.busquedas = {}
+        self.ordenes = {}
+        self.archivo_registros = ARCHIVO_REGISTROS
+        self.archivo_legado = "registros_vehiculos.json"
+        self.repositorio = abrir_repositorio(self.archivo_registros)
+        
+        # La migración desde el arreglo JSON anterior se hace en el hilo
+        # trabajador, antes de la primera carga
+        self.migrado = False
         
     def mostrar_ventana(self):
         """Crea y muestra una ventana con todos los registros"""
@@ -27,6 +70,24 @@ class VisualizadorRegistros:
         )
         titulo.pack(pady=10)
         
+        # Campo de búsqueda: filtra la tabla mientras se escribe
+        frame_busqueda = tk.Frame(ventana)
+        frame_busqueda.pack(fill=tk.X, padx=20)
+        
+        tk.Label(frame_busqueda, text="🔍 Buscar:", font=("Arial", 10)).pack(side=tk.LEFT)
+        texto_busqueda = tk.StringVar()
+        entry_busqueda = tk.Entry(frame_busqueda, textvariable=texto_busqueda, font=("Arial", 10), width=40)
+        entry_busqueda.pack(side=tk.LEFT, padx=5)
+        entry_busqueda.bind("<Escape>", lambda e: texto_busqueda.set(""))
+        tk.Label(
+            frame_busqueda,
+            text="Placa, cédula, propietario o marca",
+            font=("Arial", 9, "italic"),
+            fg="#7f8c8d"
+        ).pack(side=tk.LEFT)
+        
+        self.busquedas[ventana] = {"texto": "", "resultados": None, "pendiente": None, "tarea": None}
+        
         # Frame para la tabla y scrollbar
         frame_tabla = tk.Frame(ventana)
         frame_tabla.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -37,29 +98,35 @@ class VisualizadorRegistros:
             "Motor", "Cédula", "Propietario", "Correo", "Teléfono"
         )
         
-        tabla = ttk.Treeview(frame_tabla, columns=columnas, show="headings", height=15)
-        
         # Configurar columnas
         anchos = [80, 100, 60, 70, 120, 100, 90, 120, 150, 90]
-        for col, ancho in zip(columnas, anchos):
-            tabla.heading(col, text=col)
-            tabla.column(col, width=ancho, minwidth=ancho)
         
-        # Scrollbars
-        scroll_y = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=tabla.yview)
-        scroll_x = ttk.Scrollbar(frame_tabla, orient=tk.HORIZONTAL, command=tabla.xview)
-        tabla.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        # Tabla virtualizada: solo se dibujan las filas visibles y las demás
+        # se piden al repositorio en el hilo trabajador al desplazarse.
+        # Un clic en un encabezado ordena por esa columna
+        tabla = TablaVirtual(
+            frame_tabla, columnas, anchos,
+            contar=lambda: self.contar_filas(ventana),
+            obtener_filas=lambda inicio, cantidad: self.obtener_filas(inicio, cantidad, ventana),
+            al_ordenar=lambda indice: self.ordenar(ventana, tabla, indice, progreso),
+            tareas=self.tareas
+        )
+        tabla.grid(row=0, column=0)
         
-        # Posicionar tabla y scrollbars
-        tabla.grid(row=0, column=0, sticky="nsew")
-        scroll_y.grid(row=0, column=1, sticky="ns")
-        scroll_x.grid(row=1, column=0, sticky="ew")
+        texto_busqueda.trace_add(
+            "write",
+            lambda *args: self.programar_busqueda(ventana, tabla, texto_busqueda.get())
+        )
         
         frame_tabla.grid_rowconfigure(0, weight=1)
         frame_tabla.grid_columnconfigure(0, weight=1)
         
-        # Cargar y mostrar registros
-        self.cargar_registros_en_tabla(tabla)
+        # Los registros se cargan en segundo plano
+        tabla.mostrar_mensaje("Cargando registros...")
+        
+        # Indicador de progreso de las tareas en segundo plano
+        progreso = IndicadorProgreso(ventana)
+        progreso.pack(pady=2)
         
         # Frame para botones
         frame_botones = tk.Frame(ventana)
@@ -69,7 +136,7 @@ class VisualizadorRegistros:
         btn_actualizar = tk.Button(
             frame_botones,
             text="Actualizar Lista",
-            command=lambda: self.actualizar_tabla(tabla, ventana),
+            command=lambda: self.actualizar_tabla(tabla, ventana, progreso),
             bg="#3498db",
             fg="white",
             font=("Arial", 10),
@@ -81,7 +148,7 @@ class VisualizadorRegistros:
         btn_eliminar = tk.Button(
             frame_botones,
             text="Eliminar Registro",
-            command=lambda: self.eliminar_registro_seleccionado(tabla, ventana),
+            command=lambda: self.eliminar_registro_seleccionado(tabla, ventana, progreso),
             bg="#e74c3c",
             fg="white",
             font=("Arial", 10),
@@ -89,6 +156,42 @@ class VisualizadorRegistros:
         )
         btn_eliminar.pack(side=tk.LEFT, padx=5)
         
+        # Botón Exportar (CSV, JSONL o columnar, en segundo plano)
+        btn_exportar = tk.Button(
+            frame_botones,
+            text="Exportar...",
+            command=lambda: self.exportar_registros(ventana, progreso),
+            bg="#27ae60",
+            fg="white",
+            font=("Arial", 10),
+            width=15
+        )
+        btn_exportar.pack(side=tk.LEFT, padx=5)
+        
+        # Botón Estadísticas (conteos por marca, color, década y propietario)
+        btn_estadisticas = tk.Button(
+            frame_botones,
+            text="Estadísticas",
+            command=VentanaEstadisticas(ventana, self.repositorio, self.tareas).mostrar,
+            bg="#16a085",
+            fg="white",
+            font=("Arial", 10),
+            width=15
+        )
+        btn_estadisticas.pack(side=tk.LEFT, padx=5)
+        
+        # Botón Métricas (métricas de validación y almacenamiento)
+        btn_metricas = tk.Button(
+            frame_botones,
+            text="Métricas",
+            command=VentanaMetricas(ventana).mostrar,
+            bg="#8e44ad",
+            fg="white",
+            font=("Arial", 10),
+            width=15
+        )
+        btn_metricas.pack(side=tk.LEFT, padx=5)
+        
         # Botón Cerrar
         btn_cerrar = tk.Button(
             frame_botones,
@@ -112,93 +215,207 @@ class VisualizadorRegistros:
             fg="#7f8c8d"
         )
         label_instruccion.pack(pady=2)
+        
+        # Cargar y mostrar registros
+        self.actualizar_tabla(tabla, ventana, progreso)
     
-    def cargar_registros_en_tabla(self, tabla):
+    def cargar_registros_en_tabla(self, tabla, ventana, version=None):
         """
-        Carga los registros desde el archivo JSON a la tabla
+        Muestra en la tabla la página visible de registros del repositorio.
+        El conteo y la página se piden en segundo plano; al llegar se
+        actualiza el contador de la ventana
         """
-        try:
-            # Limpiar tabla
-            for item in tabla.get_children():
-                tabla.delete(item)
-            
-            # Cargar registros
-            registros = self.cargar_registros()
-            
-            if not registros:
-                # Mostrar mensaje si no hay registros
-                tabla.insert("", tk.END, values=("No hay registros", "", "", "", "", "", "", "", "", ""))
-                return
-            
-            # Insertar registros en la tabla
-            for registro in registros:
-                # Asegurar que todos los campos existen y convertir a string
-                valores = (
-                    str(registro.get('placa', '')).strip(),
-                    str(registro.get('marca', '')).strip(),
-                    str(registro.get('modelo', '')).strip(),
-                    str(registro.get('color', '')).strip(),
-                    str(registro.get('chasis', '')).strip(),
-                    str(registro.get('motor', '')).strip(),
-                    str(registro.get('cedula', '')).strip(),
-                    str(registro.get('nombre', '')).strip(),
-                    str(registro.get('correo', '')).strip(),
-                    str(registro.get('telefono', '')).strip()
-                )
-                tabla.insert("", tk.END, values=valores)
-            
-            print(f"✅ {len(registros)} registros cargados correctamente")
-            
-        except Exception as e:
+        def al_terminar():
+            print(f"✅ {tabla.total} registros disponibles")
+            if ventana.winfo_exists():
+                self.actualizar_conteo(ventana, tabla)
+        
+        def al_fallar(e):
             print(f"❌ Error al cargar registros: {e}")
             messagebox.showerror("Error", f"Error al cargar registros: {str(e)}")
+        
+        with metricas.medir("tabla_refrescar_segundos"):
+            tabla.refrescar(version, al_terminar=al_terminar, al_fallar=al_fallar)
     
-    def cargar_registros(self):
+    def contar_filas(self, ventana=None):
+        """
+        Cantidad de filas de la tabla: los resultados de la búsqueda
+        de la ventana, o todos los registros si no hay búsqueda.
+        La tabla lo llama en el hilo trabajador
+        """
+        resultados = self.busquedas.get(ventana, {}).get("resultados")
+        if resultados is not None:
+            return len(resultados)
+        return self.repositorio.contar()
+    
+    def obtener_filas(self, inicio, cantidad, ventana=None):
+        """
+        Retorna (id, valores) de una página de registros para la tabla.
+        La tabla lo llama en el hilo trabajador
         """
-        Carga los registros desde el archivo JSON
-        """
-        if os.path.exists(self.archivo_registros):
-            try:
-                with open(self.archivo_registros, 'r', encoding='utf-8') as file:
-                    contenido = file.read().strip()
-                    if contenido:
-                        return json.loads(contenido)
-                    else:
-                        return []
-            except json.JSONDecodeError as e:
-                print(f"❌ Error al decodificar JSON: {e}")
-                return []
-            except Exception as e:
-                print(f"❌ Error al leer archivo: {e}")
-                return []
+        resultados = self.busquedas.get(ventana, {}).get("resultados")
+        if resultados is not None:
+            # Los resultados de la búsqueda ya están en el orden de la ventana
+            registros = resultados[inicio:inicio + cantidad]
         else:
-            print(f"📁 Archivo {self.archivo_registros} no existe. Creando nuevo...")
+            campo, descendente = self.ordenes.get(ventana, (None, False))
+            registros = self.repositorio.obtener_rango(inicio, cantidad, campo, descendente)
+        return [(registro.id, registro.valores()) for registro in registros]
+    
+    def ordenar(self, ventana, tabla, indice, progreso=None):
+        """
+        Ordena la tabla por la columna dada; un segundo clic en la misma
+        columna invierte el sentido. El primer orden de cada columna se
+        calcula en segundo plano y queda en caché en el repositorio
+        """
+        campo = CAMPOS[indice]
+        anterior, descendente = self.ordenes.get(ventana, (None, False))
+        descendente = not descendente if anterior == campo else False
+        busqueda = self.busquedas.get(ventana, {})
+        
+        def preparar(tarea):
+            # Calcula (o toma de la caché) el orden de la columna
+            self.repositorio.obtener_rango(0, 1, campo, descendente)
+            resultados = busqueda.get("resultados")
+            if resultados is not None:
+                return ordenar_registros(resultados, campo, descendente)
+            return None
+        
+        def al_terminar(resultados):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            if not ventana.winfo_exists():
+                return
+            self.ordenes[ventana] = (campo, descendente)
+            if resultados is not None and busqueda.get("tarea") is None:
+                busqueda["resultados"] = resultados
+            tabla.marcar_orden(indice, descendente)
+            self.mostrar_resultados(ventana, tabla)
+            print(f"↕️ Registros ordenados por {campo}{' (descendente)' if descendente else ''}")
+        
+        def al_fallar(e):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            messagebox.showerror("Error", f"No se pudo ordenar: {str(e)}")
+        
+        tarea = self.tareas.ejecutar(
+            preparar,
+            descripcion="Ordenar registros",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar
+        )
+        if progreso is not None:
+            progreso.mostrar(tarea, f"Ordenando por {tabla.columnas[indice]}...")
+    
+    def programar_busqueda(self, ventana, tabla, texto):
+        """
+        Agenda la búsqueda para cuando se deje de escribir, descartando
+        la que estaba agendada
+        """
+        busqueda = self.busquedas.get(ventana)
+        if busqueda is None:
+            return
+        if busqueda["pendiente"] is not None:
+            ventana.after_cancel(busqueda["pendiente"])
+        busqueda["pendiente"] = ventana.after(
+            RETARDO_BUSQUEDA_MS, lambda: self.buscar(ventana, tabla, texto)
+        )
+    
+    def buscar(self, ventana, tabla, texto):
+        """
+        Busca en segundo plano y muestra los resultados en la tabla.
+        Si llega otra búsqueda antes de terminar, esta se descarta.
+        Un texto vacío vuelve a mostrar todos los registros
+        """
+        busqueda = self.busquedas.get(ventana)
+        if busqueda is None:
+            return
+        busqueda["pendiente"] = None
+        busqueda["texto"] = texto
+        if busqueda["tarea"] is not None:
+            busqueda["tarea"].cancelar()
+            busqueda["tarea"] = None
+        
+        if not texto.strip():
+            busqueda["resultados"] = None
+            self.mostrar_resultados(ventana, tabla)
+            return
+        
+        campo, descendente = self.ordenes.get(ventana, (None, False))
+        
+        def al_terminar(resultados):
+            if busqueda["tarea"] is not tarea or not ventana.winfo_exists():
+                return
+            busqueda["tarea"] = None
+            # Si el orden cambió mientras se buscaba, se reordenan aquí
+            orden_actual = self.ordenes.get(ventana, (None, False))
+            if orden_actual != (campo, descendente):
+                resultados = ordenar_registros(resultados, *orden_actual)
+            busqueda["resultados"] = resultados
+            print(f"🔍 '{texto}': {len(resultados)} registro(s)")
+            self.mostrar_resultados(ventana, tabla)
+        
+        tarea = self.tareas.ejecutar(
+            lambda tarea: ordenar_registros(self._buscar(texto), campo, descendente),
+            descripcion="Buscar registros",
+            al_terminar=al_terminar
+        )
+        busqueda["tarea"] = tarea
+    
+    def mostrar_resultados(self, ventana, tabla):
+        """
+        Redibuja la tabla desde la primera fila con el filtro actual
+        y actualiza el contador cuando llega el nuevo total
+        """
+        def al_terminar():
+            if ventana.winfo_exists():
+                self.actualizar_conteo(ventana, tabla)
+        
+        with metricas.medir("tabla_refrescar_segundos"):
+            tabla.refrescar(
+                tabla.version, inicio=0, al_terminar=al_terminar,
+                al_fallar=lambda e: print(f"❌ Error al mostrar resultados: {e}")
+            )
+    
+    def cargar_registros(self):
+        """
+        Carga los registros desde el repositorio
+        """
+        try:
+            return self.repositorio.cargar()
+        except Exception as e:
+            print(f"❌ Error al leer archivo: {e}")
             return []
     
     def guardar_registro(self, datos_vehiculo):
         """
-        Guarda un nuevo registro en el archivo JSON
+        Guarda un nuevo registro en el repositorio.
+        Si la placa o el chasis ya existen, se propaga RegistroDuplicadoError
         """
         try:
-            registros = self.cargar_registros()
-            registros.append(datos_vehiculo)
-            
-            with open(self.archivo_registros, 'w', encoding='utf-8') as file:
-                json.dump(registros, file, ensure_ascii=False, indent=4)
+            with metricas.medir("almacen_guardar_segundos"):
+                self.repositorio.agregar(datos_vehiculo)
             
             print(f"✅ Registro guardado: {datos_vehiculo.get('placa', '')}")
             return True
             
+        except RegistroDuplicadoError as e:
+            print(f"⚠️ Registro duplicado: {e}")
+            raise
         except Exception as e:
             print(f"❌ Error al guardar registro: {e}")
             return False
     
-    def eliminar_registro_seleccionado(self, tabla, ventana):
+    def eliminar_registro_seleccionado(self, tabla, ventana, progreso=None):
         """
         Elimina el registro seleccionado de la tabla y del archivo
         """
+        if not tabla.total:
+            messagebox.showinfo("Información", "No hay registros para eliminar.")
+            return
+        
         # Obtener el elemento seleccionado
-        seleccion = tabla.selection()
+        seleccion = tabla.seleccion()
         
         if not seleccion:
             messagebox.showwarning(
@@ -208,27 +425,10 @@ class VisualizadorRegistros:
             return
         
         # Obtener valores del registro seleccionado
-        item = tabla.item(seleccion[0])
-        valores = item['values']
-        
-        # Verificar si es el mensaje de "No hay registros"
-        if valores[0] == "No hay registros":
-            messagebox.showinfo("Información", "No hay registros para eliminar.")
-            return
+        valores = tabla.valores(seleccion[0])
         
-        # Crear un diccionario con los datos del registro seleccionado
-        registro_seleccionado = {
-            'placa': str(valores[0]).strip(),
-            'marca': str(valores[1]).strip(),
-            'modelo': str(valores[2]).strip(),
-            'color': str(valores[3]).strip(),
-            'chasis': str(valores[4]).strip(),
-            'motor': str(valores[5]).strip(),
-            'cedula': str(valores[6]).strip(),
-            'nombre': str(valores[7]).strip(),
-            'correo': str(valores[8]).strip(),
-            'telefono': str(valores[9]).strip()
-        }
+        # El iid de la fila es el id estable del registro
+        id_registro = seleccion[0]
         
         # Mostrar información del registro a eliminar
         mensaje_confirmacion = f"¿Estás seguro de eliminar el siguiente registro?\n\n"
@@ -244,94 +444,232 @@ class VisualizadorRegistros:
             icon='warning'
         )
         
-        if respuesta:
-            # Cargar todos los registros
-            registros = self.cargar_registros()
-            
-            if not registros:
-                messagebox.showerror("Error", "No hay registros para eliminar.")
+        if not respuesta:
+            return
+        
+        def al_terminar(eliminado):
+            if not ventana.winfo_exists():
                 return
-            
-            # Buscar y eliminar el registro correspondiente
-            registros_actualizados = []
-            eliminado = False
-            registro_encontrado = None
-            
-            for registro in registros:
-                # Comparar todos los campos importantes
-                placa_coincide = str(registro.get('placa', '')).strip() == registro_seleccionado['placa']
-                cedula_coincide = str(registro.get('cedula', '')).strip() == registro_seleccionado['cedula']
-                chasis_coincide = str(registro.get('chasis', '')).strip() == registro_seleccionado['chasis']
+            if eliminado:
+                print(f"🗑️ Registro eliminado: {id_registro}")
                 
-                # Si coinciden placa Y (cédula O chasis), consideramos que es el mismo registro
-                if placa_coincide and (cedula_coincide or chasis_coincide):
-                    eliminado = True
-                    registro_encontrado = registro
-                    print(f"🗑️ Registro eliminado: {registro}")
-                    continue
+                # Actualizar tabla
+                self.actualizar_tabla(tabla, ventana, progreso)
                 
-                registros_actualizados.append(registro)
-            
-            if eliminado:
-                # Guardar registros actualizados
-                try:
-                    with open(self.archivo_registros, 'w', encoding='utf-8') as file:
-                        json.dump(registros_actualizados, file, ensure_ascii=False, indent=4)
-                    
-                    # Actualizar tabla
-                    self.actualizar_tabla(tabla, ventana)
-                    
-                    messagebox.showinfo(
-                        "✅ Registro eliminado",
-                        "El registro ha sido eliminado correctamente."
-                    )
-                    
-                except Exception as e:
-                    messagebox.showerror(
-                        "❌ Error",
-                        f"No se pudo eliminar el registro: {str(e)}"
-                    )
+                messagebox.showinfo(
+                    "✅ Registro eliminado",
+                    "El registro ha sido eliminado correctamente."
+                )
             else:
-                # Mostrar información de depuración
-                print("🔍 Registro buscado:", registro_seleccionado)
-                print("📋 Registros en archivo:", registros)
-                
                 messagebox.showerror(
                     "❌ Error",
                     "No se pudo encontrar el registro para eliminar.\n"
                     "Por favor, actualiza la lista e intenta nuevamente."
                 )
+        
+        def al_fallar(e):
+            messagebox.showerror(
+                "❌ Error",
+                f"No se pudo eliminar el registro: {str(e)}"
+            )
+        
+        # La escritura en el archivo se hace en segundo plano
+        self.tareas.ejecutar(
+            lambda tarea: self._eliminar(id_registro),
+            descripcion="Eliminar registro",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar
+        )
     
-    def actualizar_tabla(self, tabla, ventana):
+    def actualizar_tabla(self, tabla, ventana, progreso=None):
         """
-        Actualiza la tabla con los registros más recientes
+        Actualiza la tabla con los registros más recientes.
+        La lectura del archivo se hace en segundo plano; mientras tanto la
+        ventana sigue respondiendo y la carga se puede cancelar.
+        Si la versión del repositorio no cambió, la tabla no se toca
         """
-        self.cargar_registros_en_tabla(tabla)
-        self.actualizar_conteo(ventana, tabla)
+        def al_terminar(version):
+            if not ventana.winfo_exists():
+                return
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            if version == tabla.version:
+                print("🔄 Sin cambios en los registros")
+                return
+            self.cargar_registros_en_tabla(tabla, ventana, version)
+            
+            # Repetir la búsqueda activa sobre los datos nuevos
+            busqueda = self.busquedas.get(ventana)
+            if busqueda is not None and busqueda["texto"].strip():
+                self.buscar(ventana, tabla, busqueda["texto"])
+        
+        def al_fallar(e):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            messagebox.showerror("Error", f"Error al cargar registros: {str(e)}")
+        
+        tarea = self.tareas.ejecutar(
+            self._sincronizar,
+            descripcion="Cargar registros",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar,
+            al_progreso=progreso.actualizar if progreso is not None else None
+        )
+        if progreso is not None:
+            progreso.mostrar(
+                tarea, "Cargando registros...",
+                al_cancelar=lambda: tabla.mostrar_mensaje("Carga cancelada")
+            )
     
-    def actualizar_conteo(self, ventana, tabla):
+    def exportar_registros(self, ventana, progreso=None):
+        """
+        Pide el archivo de destino y filtros opcionales "campo=valor" y
+        exporta los registros en segundo plano, por bloques, mostrando el
+        avance. El formato se elige por la extensión del archivo
         """
-        Actualiza el contador de registros
+        ruta = filedialog.asksaveasfilename(
+            parent=ventana,
+            title="Exportar registros",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("JSON por líneas", "*.jsonl"),
+                ("Columnar", f"*{EXTENSION_COLUMNAS}"),
+            ]
+        )
+        if not ruta:
+            return
+        texto = simpledialog.askstring(
+            "Filtros",
+            "Filtros opcionales campo=valor separados por comas\n"
+            "(por ejemplo: marca=Mazda, color=Rojo). Vacío exporta todo",
+            parent=ventana
+        )
+        if texto is None:
+            return
+        try:
+            filtros = interpretar_filtros(parte for parte in texto.split(",") if parte.strip())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=ventana)
+            return
+        
+        def al_terminar(resumen):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            print(f"📤 {resumen['exportados']} registro(s) exportados a {ruta}")
+            if ventana.winfo_exists():
+                messagebox.showinfo(
+                    "Exportación terminada",
+                    f"Se exportaron {resumen['exportados']} registro(s) a:\n{ruta}",
+                    parent=ventana
+                )
+        
+        def al_fallar(e):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+            messagebox.showerror("Error", f"No se pudo exportar: {str(e)}")
+        
+        tarea = self.tareas.ejecutar(
+            lambda tarea: exportar(self.repositorio, ruta, filtros=filtros, al_progreso=tarea.reportar_progreso),
+            descripcion="Exportar registros",
+            al_terminar=al_terminar,
+            al_fallar=al_fallar,
+            al_progreso=progreso.actualizar if progreso is not None else None
+        )
+        if progreso is not None:
+            progreso.mostrar(tarea, "Exportando registros...")
+    
+    def cargar(self, progreso=None):
+        """
+        Migra los registros anteriores si hace falta y carga el repositorio
+        en segundo plano, mostrando el avance en el indicador dado
         """
-        total_registros = len(tabla.get_children())
+        def terminar(resultado):
+            if progreso is not None:
+                progreso.ocultar(tarea)
+        
+        def al_fallar(e):
+            terminar(None)
+            print(f"❌ Error al cargar registros: {e}")
         
-        # Verificar si hay registros reales (no el mensaje de "No hay registros")
-        if total_registros == 1:
-            item = tabla.get_children()[0]
-            valores = tabla.item(item)['values']
-            if valores[0] == "No hay registros":
-                total_registros = 0
+        tarea = self.tareas.ejecutar(
+            self._sincronizar,
+            descripcion="Cargar registros",
+            al_terminar=terminar,
+            al_fallar=al_fallar,
+            al_progreso=progreso.actualizar if progreso is not None else None
+        )
+        if progreso is not None:
+            progreso.mostrar(tarea, "Cargando registros...")
+        return tarea
+    
+    def _migrar(self, tarea):
+        """
+        Migración única desde el arreglo JSON anterior, en el hilo trabajador
+        """
+        if self.migrado:
+            return
+        self.migrado = True
+        if not os.path.exists(self.archivo_legado):
+            return
+        tarea.reportar_progreso(0, f"Migrando {self.archivo_legado}...")
+        try:
+            self.repositorio.migrar_desde_json(self.archivo_legado)
+        except Exception as e:
+            print(f"❌ Error al migrar {self.archivo_legado}: {e}")
+    
+    def _sincronizar(self, tarea):
+        """
+        Carga el repositorio o incorpora sus cambios en el hilo trabajador,
+        informando el avance. Retorna la versión de los datos
+        """
+        self._migrar(tarea)
+        with metricas.medir("almacen_cargar_segundos"):
+            return self.repositorio.sincronizar(tarea.reportar_progreso)
+    
+    def _eliminar(self, id_registro):
+        """
+        Elimina un registro del repositorio (en el hilo trabajador)
+        """
+        with metricas.medir("almacen_eliminar_segundos"):
+            return self.repositorio.eliminar(id_registro)
+    
+    def _buscar(self, texto):
+        """
+        Búsqueda libre en el repositorio (en el hilo trabajador)
+        """
+        with metricas.medir("busqueda_segundos"):
+            return self.repositorio.buscar(texto)
+    
+    def actualizar_conteo(self, ventana, tabla):
+        """
+        Actualiza el contador de registros con el total que la tabla ya conoce
+        """
+        total_registros = tabla.total
+        texto = f"Total de registros: {total_registros} vehículo(s) encontrado(s)"
         
-        # Eliminar label anterior si existe
-        for widget in ventana.winfo_children():
-            if isinstance(widget, tk.Label) and "registros encontrados" in widget.cget("text"):
-                widget.destroy()
+        # Reutilizar el label de la ventana si ya existe
+        label_conteo = self.etiquetas_conteo.get(ventana)
+        if label_conteo is not None and label_conteo.winfo_exists():
+            label_conteo.config(text=texto)
+            return
         
         # Crear nuevo label con conteo
         label_conteo = tk.Label(
             ventana,
-            text=f"Total de registros: {total_registros} vehículo(s) encontrado(s)",
+            text=texto,
             font=("Arial", 10, "italic"),
             fg="#7f8c8d"
         )
-        label_conteo.pack(pady=5)
\ No newline at end of file
+        label_conteo.pack(pady=5)
+        self.etiquetas_conteo[ventana] = label_conteo
+        ventana.bind("<Destroy>", lambda e: self.olvidar_ventana(e, ventana), add="+")
+    
+    def olvidar_ventana(self, event, ventana):
+        """
+        Descarta el label de conteo y la búsqueda cuando se cierra la ventana
+        """
+        if event.widget is ventana:
+            self.etiquetas_conteo.pop(ventana, None)
+            self.busquedas.pop(ventana, None)
+            self.ordenes.pop(ventana, None)
\ No newline at end of file
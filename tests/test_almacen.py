@@ -0,0 +1,231 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from Aplicacion_regex import almacen, almacen_sqlite
+from Aplicacion_regex.almacen import AlmacenRegistros
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.orden_columnas import clave_orden
+from Aplicacion_regex.repositorio import RegistroDuplicadoError, abrir_repositorio
+
+GENERADOR = GeneradorRegistros(5)
+
+
+def registros(cantidad, desde=0):
+    return list(GENERADOR.registros(cantidad, desde))
+
+
+def placas(repositorio):
+    return sorted(registro.placa for registro in repositorio.iterar())
+
+
+def abrir_jsonl(tmp_path, **opciones):
+    """AlmacenRegistros sin compactación ni instantáneas automáticas"""
+    opciones.setdefault("umbral_compactacion", 2)
+    opciones.setdefault("instantanea_automatica", False)
+    return AlmacenRegistros(str(tmp_path / "registros.jsonl"), **opciones)
+
+
+@pytest.fixture(params=["registros.jsonl", "registros.db", "registros.particiones"])
+def ruta(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+@pytest.fixture
+def repositorio(ruta):
+    opciones = {"procesos": 1, "particiones": 3} if ruta.endswith(".particiones") else {}
+    repositorio = abrir_repositorio(ruta, **opciones)
+    yield repositorio
+    repositorio.cerrar()
+
+
+def test_agregar_y_obtener(repositorio):
+    datos = registros(20)
+    ids = [repositorio.agregar(registro) for registro in datos]
+    assert repositorio.contar() == 20
+    assert len(set(ids)) == 20
+    assert repositorio.obtener(ids[3]).placa == datos[3]["placa"]
+    assert placas(repositorio) == sorted(registro["placa"] for registro in datos)
+    assert repositorio.obtener("no-existe") is None
+
+
+def test_reabrir(repositorio, ruta):
+    repositorio.agregar_lote(registros(30))
+    esperado = placas(repositorio)
+    repositorio.cerrar()
+    otro = abrir_repositorio(ruta)
+    try:
+        assert placas(otro) == esperado
+    finally:
+        otro.cerrar()
+
+
+def test_eliminar(repositorio):
+    datos = registros(5)
+    ids = repositorio.agregar_lote(datos)
+    assert repositorio.eliminar(ids[1])
+    assert not repositorio.eliminar(ids[1])
+    assert repositorio.contar() == 4
+    assert repositorio.obtener(ids[1]) is None
+    # El registro eliminado se puede volver a registrar
+    repositorio.agregar(datos[1])
+    assert repositorio.contar() == 5
+
+
+def test_eliminar_sqlite_sin_fila_no_resta_conteos(tmp_path, monkeypatch):
+    repositorio = abrir_repositorio(str(tmp_path / "registros.db"))
+    ids = repositorio.agregar_lote(registros(5))
+    antes = repositorio.estadisticas()
+    # Simula que otra instancia borró la fila entre la lectura y el DELETE
+    monkeypatch.setattr(almacen_sqlite, "SQL_POR_ID", almacen_sqlite.SQL_SELECCIONAR + " WHERE ? IS NOT NULL")
+    assert not repositorio.eliminar("no-existe")
+    assert repositorio.estadisticas() == antes
+    monkeypatch.undo()
+    assert repositorio.eliminar(ids[0])
+    assert repositorio.contar() == 4
+    repositorio.cerrar()
+
+
+def test_reabrir_tras_eliminar(repositorio, ruta):
+    ids = repositorio.agregar_lote(registros(30))
+    repositorio.eliminar(ids[7])
+    esperado = placas(repositorio)
+    repositorio.cerrar()
+    otro = abrir_repositorio(ruta)
+    try:
+        assert placas(otro) == esperado
+        assert otro.obtener(ids[7]) is None
+    finally:
+        otro.cerrar()
+
+
+def test_compactar_conserva_los_vivos(tmp_path):
+    repositorio = abrir_jsonl(tmp_path)
+    ids = repositorio.agregar_lote(registros(50))
+    for id_registro in ids[:30]:
+        repositorio.eliminar(id_registro)
+    antes = os.path.getsize(repositorio.archivo)
+    esperado = placas(repositorio)
+    repositorio.compactar()
+    assert os.path.getsize(repositorio.archivo) < antes
+    assert placas(repositorio) == esperado
+    assert repositorio.obtener(ids[40]).id == ids[40]
+    repositorio.cerrar()
+
+    otro = abrir_jsonl(tmp_path)
+    assert placas(otro) == esperado
+    assert otro.obtener(ids[40]) is not None
+    assert not [nombre for nombre in os.listdir(tmp_path) if nombre.endswith(".compactando")]
+    otro.cerrar()
+
+
+def test_buscar_por_indices(repositorio):
+    datos = registros(20)
+    ids = repositorio.agregar_lote(datos)
+    assert repositorio.buscar_por_placa(datos[4]["placa"].lower()).id == ids[4]
+    assert repositorio.buscar_por_chasis(datos[5]["chasis"]).id == ids[5]
+    assert ids[6] in [registro.id for registro in repositorio.buscar_por_cedula(datos[6]["cedula"])]
+    assert repositorio.buscar_por_placa("ZZZ999") is None
+    repositorio.eliminar(ids[4])
+    assert repositorio.buscar_por_placa(datos[4]["placa"]) is None
+
+
+def test_duplicados(repositorio):
+    datos = registros(3)
+    repositorio.agregar_lote(datos)
+    with pytest.raises(RegistroDuplicadoError) as error:
+        repositorio.agregar(dict(registros(1, 10)[0], placa=datos[0]["placa"]))
+    assert error.value.campo == "placa"
+    with pytest.raises(RegistroDuplicadoError) as error:
+        repositorio.agregar(dict(registros(1, 11)[0], chasis=datos[1]["chasis"]))
+    assert error.value.campo == "chasis"
+    # Un lote con un duplicado no guarda nada y el error indica cuál es
+    with pytest.raises(RegistroDuplicadoError) as error:
+        repositorio.agregar_lote(registros(5, 20) + [datos[2]])
+    assert error.value.valor == datos[2][error.value.campo].upper()
+    nuevo = registros(1, 30)[0]
+    with pytest.raises(RegistroDuplicadoError) as error:
+        repositorio.agregar_lote(registros(2, 31) + [nuevo, dict(registros(1, 33)[0], chasis=nuevo["chasis"])])
+    assert (error.value.campo, error.value.valor) == ("chasis", nuevo["chasis"].upper())
+    assert repositorio.contar() == 3
+
+
+def test_id_repetido_en_sqlite_no_es_duplicado(tmp_path, monkeypatch):
+    repositorio = abrir_repositorio(str(tmp_path / "registros.db"))
+    repositorio.agregar(registros(1)[0])
+    repetido = SimpleNamespace(hex=next(repositorio.iterar()).id)
+    monkeypatch.setattr(almacen_sqlite.uuid, "uuid4", lambda: repetido)
+    with pytest.raises(sqlite3.IntegrityError):
+        repositorio.agregar(registros(1, 1)[0])
+    repositorio.cerrar()
+
+
+def test_orden_por_columna(repositorio):
+    repositorio.agregar_lote(registros(40))
+    ids = repositorio.agregar_lote(registros(10, 40))
+    for id_registro in ids[::2]:
+        repositorio.eliminar(id_registro)
+    todos = sorted(repositorio.iterar(), key=clave_orden("marca"))
+    marcas = [registro.marca for registro in todos]
+    pagina = repositorio.obtener_rango(5, 10, "marca")
+    assert [registro.marca for registro in pagina] == marcas[5:15]
+    pagina = repositorio.obtener_rango(0, 7, "marca", descendente=True)
+    assert [registro.marca for registro in pagina] == marcas[::-1][:7]
+
+
+def test_sincronizar_entre_instancias(tmp_path):
+    escritor = abrir_jsonl(tmp_path)
+    lector = abrir_jsonl(tmp_path)
+    ids = escritor.agregar_lote(registros(10))
+    version = lector.sincronizar()
+    assert placas(lector) == placas(escritor)
+
+    escritor.eliminar(ids[0])
+    escritor.agregar(registros(1, 10)[0])
+    assert lector.sincronizar() > version
+    assert placas(lector) == placas(escritor)
+
+    # El lector también ve las altas que el otro hizo antes de su propia escritura
+    lector.agregar(registros(1, 11)[0])
+    assert escritor.sincronizar() and placas(escritor) == placas(lector)
+    with pytest.raises(RegistroDuplicadoError):
+        escritor.agregar(registros(1, 11)[0])
+    escritor.cerrar()
+    lector.cerrar()
+
+
+def test_sincronizar_tras_compactar_con_el_mismo_inodo(tmp_path, monkeypatch):
+    # Simula un sistema que reutiliza el inodo del archivo reemplazado
+    monkeypatch.setattr(almacen, "_firma", lambda archivo: (0, 0) if os.path.exists(archivo) else None)
+    escritor = abrir_jsonl(tmp_path)
+    lector = abrir_jsonl(tmp_path)
+    ids = escritor.agregar_lote(registros(40))
+    lector.precargar()
+    for id_registro in ids[:20]:
+        escritor.eliminar(id_registro)
+    escritor.compactar()
+    # El archivo nuevo supera lo que el lector ya había aplicado
+    escritor.agregar_lote(registros(40, 40))
+    assert os.path.getsize(escritor.archivo) > lector._desplazamiento
+    lector.sincronizar()
+    assert placas(lector) == placas(escritor)
+    escritor.cerrar()
+    lector.cerrar()
+
+
+def test_reabrir_desde_instantanea(tmp_path):
+    repositorio = abrir_jsonl(tmp_path)
+    repositorio.agregar_lote(registros(40))
+    repositorio.obtener_rango(0, 1, "marca")
+    assert repositorio.guardar_instantanea()
+    repositorio.agregar(registros(1, 40)[0])
+    esperado = placas(repositorio)
+    repositorio.cerrar()
+
+    otro = abrir_jsonl(tmp_path)
+    assert placas(otro) == esperado
+    assert [registro.id for registro in otro.obtener_rango(0, 41, "marca")] == \
+        [registro.id for registro in sorted(otro.iterar(), key=clave_orden("marca"))]
+    otro.cerrar()
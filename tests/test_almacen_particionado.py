@@ -0,0 +1,49 @@
+import json
+
+from Aplicacion_regex.almacen import AlmacenRegistros
+from Aplicacion_regex.almacen_particionado import AlmacenParticionado, main
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+
+
+def test_copiar_a_un_directorio_existente_conserva_sus_particiones(tmp_path, capsys):
+    origen = AlmacenRegistros(str(tmp_path / "origen.jsonl"), instantanea_automatica=False)
+    origen.agregar_lote(GeneradorRegistros(6).registros(30))
+    origen.cerrar()
+    destino = str(tmp_path / "registros.particiones")
+    AlmacenParticionado(destino, 3, procesos=1).cerrar()
+
+    assert main([str(tmp_path / "origen.jsonl"), destino]) == 0
+    salida = capsys.readouterr()
+    assert "se ignoran" not in salida.out
+    assert json.loads(salida.err.splitlines()[-1]) == {"copiados": 30, "particiones": 3}
+
+
+def test_procesos_en_paralelo_coinciden_con_la_serie(tmp_path):
+    directorio = tmp_path / "registros.particiones"
+    serie = AlmacenParticionado(str(directorio), 4, procesos=1)
+    datos = list(GeneradorRegistros(8).registros(400))
+    for numero in range(0, len(datos), 7):
+        datos[numero] = dict(datos[numero], correo="sin arroba")
+    serie.agregar_lote(datos)
+    marca = next(serie.iterar()).marca
+    filtrados = [registro.a_dict() for registro in serie.filtrar(modelo_desde=2000, marca=marca)]
+    invalidos = serie.revalidar()
+    todos = [registro.a_dict() for registro in serie.iterar()]
+    serie.cerrar()
+    assert filtrados and invalidos
+
+    # Sin instantáneas, la carga prepara las particiones en los trabajadores
+    for instantanea in directorio.glob("*.instantanea"):
+        instantanea.unlink()
+    paralelo = AlmacenParticionado(str(directorio), procesos=2)
+    avance = []
+    paralelo.precargar(avance.append)
+    assert [registro.a_dict() for registro in paralelo.iterar()] == todos
+    assert avance[-1] == 1
+    paralelo.cerrar()
+
+    # Sin cargar, filtrar y revalidar se reparten entre los trabajadores
+    paralelo = AlmacenParticionado(str(directorio), procesos=2)
+    assert [registro.a_dict() for registro in paralelo.filtrar(modelo_desde=2000, marca=marca)] == filtrados
+    assert paralelo.revalidar() == invalidos
+    paralelo.cerrar()
@@ -0,0 +1,21 @@
+import pytest
+
+from Aplicacion_regex.bulk import crear_parser, iterar_lotes
+
+
+def test_iterar_lotes():
+    assert list(iterar_lotes(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iterar_lotes([], 3)) == []
+
+
+@pytest.mark.parametrize("tamano", [0, -1])
+def test_tamano_de_lote_no_positivo(tamano):
+    with pytest.raises(ValueError):
+        iterar_lotes(range(7), tamano)
+
+
+@pytest.mark.parametrize("tamano", ["0", "-5", "dos"])
+def test_parser_rechaza_tamano_de_lote_no_positivo(tamano):
+    with pytest.raises(SystemExit):
+        crear_parser().parse_args(["validar", "entrada.csv", "--tamano-lote", tamano])
+    assert crear_parser().parse_args(["validar", "entrada.csv", "--tamano-lote", "10"]).tamano_lote == 10
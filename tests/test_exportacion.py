@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from Aplicacion_regex.almacen import AlmacenRegistros
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.exportacion import crear_parser, exportar, leer_columnas
+from Aplicacion_regex.validacion import CAMPOS
+
+
+def abrir(tmp_path, nombre):
+    return AlmacenRegistros(str(tmp_path / nombre), instantanea_automatica=False)
+
+
+@pytest.fixture
+def origen(tmp_path):
+    repositorio = abrir(tmp_path, "origen.jsonl")
+    repositorio.agregar_lote(GeneradorRegistros(9).registros(120))
+    yield repositorio
+    repositorio.cerrar()
+
+
+def test_formato_columnar(tmp_path, origen):
+    ruta = str(tmp_path / "exportados.vcol")
+    exportar(origen, ruta, tamano_bloque=7)
+    leidos = sorted((fila["id"],) + tuple(fila[campo] for campo in CAMPOS) for fila in leer_columnas(ruta))
+    assert leidos == sorted((registro.id,) + registro.valores() for registro in origen.iterar())
+
+
+def test_exportar_con_filtros(tmp_path, origen):
+    marca = next(origen.iterar()).marca
+    ruta = str(tmp_path / "filtrados.jsonl")
+    resumen = exportar(origen, ruta, filtros={"marca": marca}, modelo_desde=2000)
+    with open(ruta, encoding="utf-8") as archivo:
+        filas = [json.loads(linea) for linea in archivo]
+    esperados = [registro for registro in origen.iterar()
+                 if registro.marca == marca and int(registro.modelo) >= 2000]
+    assert resumen["exportados"] == len(filas) == len(esperados)
+    assert {fila["id"] for fila in filas} == {registro.id for registro in esperados}
+
+
+def test_exportar_formato_desconocido_no_deja_archivos(tmp_path, origen):
+    with pytest.raises(ValueError):
+        exportar(origen, str(tmp_path / "x.csv"), formato="xml")
+    with pytest.raises(ValueError):
+        exportar(origen, str(tmp_path / "x.csv"), filtros={"nada": "1"})
+    assert sorted(ruta.name for ruta in tmp_path.iterdir()) == ["origen.jsonl", "origen.jsonl.lock"]
+
+
+@pytest.mark.parametrize("tamano", [0, -3])
+def test_tamano_de_bloque_no_positivo_conserva_el_destino(tmp_path, origen, tamano):
+    ruta = tmp_path / "exportados.csv"
+    ruta.write_text("anterior", encoding="utf-8")
+    with pytest.raises(ValueError):
+        exportar(origen, str(ruta), tamano_bloque=tamano)
+    assert ruta.read_text(encoding="utf-8") == "anterior"
+    with pytest.raises(SystemExit):
+        crear_parser().parse_args([str(ruta), "--tamano-bloque", str(tamano)])
@@ -0,0 +1,80 @@
+import csv
+import json
+
+import pytest
+
+from Aplicacion_regex.almacen import AlmacenRegistros
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.exportacion import exportar
+from Aplicacion_regex.importacion import crear_parser, importar
+from Aplicacion_regex.validacion import CAMPOS
+
+
+def abrir(tmp_path, nombre):
+    return AlmacenRegistros(str(tmp_path / nombre), instantanea_automatica=False)
+
+
+def valores(repositorio):
+    return sorted(registro.valores() for registro in repositorio.iterar())
+
+
+@pytest.fixture
+def origen(tmp_path):
+    repositorio = abrir(tmp_path, "origen.jsonl")
+    repositorio.agregar_lote(GeneradorRegistros(9).registros(120))
+    yield repositorio
+    repositorio.cerrar()
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+def test_exportar_e_importar_conserva_los_registros(tmp_path, origen, extension):
+    ruta = str(tmp_path / f"exportados{extension}")
+    resumen = exportar(origen, ruta, tamano_bloque=25)
+    assert resumen["leidos"] == resumen["exportados"] == 120
+
+    destino = abrir(tmp_path, "destino.jsonl")
+    resumen = importar(destino, ruta, tamano_lote=50)
+    assert (resumen["total"], resumen["importadas"], resumen["invalidas"], resumen["duplicadas"]) == (120, 120, 0, 0)
+    assert valores(destino) == valores(origen)
+
+    # Importar otra vez el mismo archivo solo encuentra duplicados
+    resumen = importar(destino, ruta, tamano_lote=50)
+    assert (resumen["importadas"], resumen["duplicadas"]) == (0, 120)
+    assert destino.contar() == 120
+    destino.cerrar()
+
+
+def test_importar_reporta_invalidas_y_duplicadas(tmp_path):
+    generador = GeneradorRegistros(4)
+    filas = list(generador.registros(6))
+    filas[2] = dict(filas[2], correo="sin arroba")
+    filas[4] = dict(filas[4], placa=filas[0]["placa"])
+    ruta = tmp_path / "entrada.csv"
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=CAMPOS)
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+    destino = abrir(tmp_path, "destino.jsonl")
+    reporte = tmp_path / "reporte.jsonl"
+    resumen = importar(destino, str(ruta), reporte=str(reporte), tamano_lote=4)
+    assert (resumen["total"], resumen["importadas"], resumen["invalidas"], resumen["duplicadas"]) == (6, 4, 1, 1)
+    with open(reporte, encoding="utf-8") as archivo:
+        errores = {objeto["fila"]: objeto["errores"] for objeto in map(json.loads, archivo)}
+    assert set(errores) == {3, 5}
+    assert "correo" in errores[3] and "placa" in errores[5]
+    destino.cerrar()
+
+
+@pytest.mark.parametrize("tamano", [0, -3])
+def test_tamano_de_lote_no_positivo(tmp_path, origen, tamano):
+    ruta = str(tmp_path / "exportados.jsonl")
+    exportar(origen, ruta)
+    destino = abrir(tmp_path, "destino.jsonl")
+    reporte = tmp_path / "reporte.jsonl"
+    with pytest.raises(ValueError):
+        importar(destino, ruta, reporte=str(reporte), tamano_lote=tamano)
+    assert not reporte.exists()
+    destino.cerrar()
+    with pytest.raises(SystemExit):
+        crear_parser().parse_args([ruta, "--tamano-lote", str(tamano)])
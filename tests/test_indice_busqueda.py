@@ -0,0 +1,33 @@
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.indice_busqueda import IndiceBusqueda, coincide, plegar
+from Aplicacion_regex.vehiculo import Vehiculo
+
+REGISTROS = [Vehiculo.desde_dict(registro, id=str(numero))
+             for numero, registro in enumerate(GeneradorRegistros(7).registros(60))]
+
+
+def buscar_a_mano(registros, texto):
+    return [registro for registro in registros if coincide(registro, plegar(texto))]
+
+
+def test_eliminaciones_reconstruyen_el_indice(monkeypatch):
+    monkeypatch.setattr("Aplicacion_regex.indice_busqueda.MINIMO_RECONSTRUCCION", 10)
+    indice = IndiceBusqueda()
+    for registro in REGISTROS:
+        indice.agregar(registro)
+    for registro in REGISTROS[:45]:
+        indice.quitar(registro)
+    vivos = REGISTROS[45:]
+
+    # Solo quedan las entradas de los registros vivos
+    assert len(indice._registros) == len(vivos)
+    assert set(indice._palabras) == {
+        plegar(palabra) for registro in vivos for palabra in f"{registro.nombre} {registro.marca}".split()
+    }
+    for texto in [vivos[3].placa[:2], REGISTROS[5].placa, vivos[0].nombre.split()[0], vivos[7].cedula[:4], "a"]:
+        assert indice.buscar(texto) == buscar_a_mano(vivos, texto)
+
+    # Las altas posteriores siguen el orden de inserción
+    indice.agregar(REGISTROS[0])
+    assert indice.buscar(REGISTROS[0].placa) == [REGISTROS[0]]
+    assert indice.buscar("a") == buscar_a_mano(vivos + [REGISTROS[0]], "a")
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from Aplicacion_regex.lector_json import iterar_arreglo_json
+
+CASOS = [
+    '[-1.5e3, 2]',
+    '[1e-5,-0.25E+2 ,  300, true, null, "x", {"a": -1.5}, [1, 2.5e1]]',
+    '[{"placa": "ABC123", "marca": "Mazda ñandú"}, {"placa": "XYZ98A"}]',
+    '[ -12345678901234567890 ]',
+    '[]',
+]
+
+
+@pytest.mark.parametrize("contenido", CASOS)
+@pytest.mark.parametrize("usar_mmap", [False, True])
+def test_bloques_diminutos(tmp_path, contenido, usar_mmap):
+    ruta = tmp_path / "arreglo.json"
+    ruta.write_text(contenido, encoding="utf-8")
+    esperado = json.loads(contenido)
+    for tamano_bloque in range(1, len(contenido) + 2):
+        assert list(iterar_arreglo_json(str(ruta), usar_mmap, tamano_bloque)) == esperado, tamano_bloque
+
+
+def test_archivo_vacio(tmp_path):
+    ruta = tmp_path / "vacio.json"
+    ruta.write_text("  \n", encoding="utf-8")
+    assert list(iterar_arreglo_json(str(ruta))) == []
+
+
+@pytest.mark.parametrize("contenido", ['{"a": 1}', '[1, 2', '[1 2]'])
+def test_contenido_invalido(tmp_path, contenido):
+    ruta = tmp_path / "malo.json"
+    ruta.write_text(contenido, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iterar_arreglo_json(str(ruta), tamano_bloque=2))
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from Aplicacion_regex.orden_columnas import OrdenColumnas, clave_orden, pagina, pagina_intercalada
+from Aplicacion_regex.validacion import CAMPOS
+from Aplicacion_regex.vehiculo import Vehiculo
+
+
+def _registro(numero, marca, modelo="2001"):
+    datos = {campo: "x" for campo in CAMPOS}
+    datos.update(marca=marca, modelo=modelo)
+    return Vehiculo.desde_dict(datos, id=f"id{numero:04d}")
+
+
+def test_quitar_con_muchos_empates():
+    registros = [_registro(numero, "Mazda" if numero % 3 else "mazda") for numero in range(300)]
+    ordenes = OrdenColumnas()
+    ordenes.ordenado("marca", lambda: registros)
+    for registro in registros[::2]:
+        ordenes.quitar(registro)
+    esperado = sorted(registros[1::2], key=clave_orden("marca"))
+    assert ordenes.ordenado("marca", None) == esperado
+
+
+def test_agregar_mantiene_el_orden():
+    ordenes = OrdenColumnas()
+    ordenes.ordenado("modelo", lambda: [])
+    registros = [_registro(numero, "Kia", random.Random(numero).choice(["1999", "2010", "abc"]))
+                 for numero in range(50)]
+    for registro in registros:
+        ordenes.agregar(registro)
+    assert ordenes.ordenado("modelo", None) == sorted(registros, key=clave_orden("modelo"))
+
+
+@pytest.mark.parametrize("campo", ["marca", "modelo"])
+def test_pagina_intercalada_coincide_con_el_orden_completo(campo):
+    azar = random.Random(7)
+    clave = clave_orden(campo)
+    numero = 0
+    for _ in range(50):
+        listas = []
+        for _ in range(azar.randint(1, 5)):
+            registros = []
+            for _ in range(azar.randint(0, 20)):
+                numero += 1
+                registros.append(_registro(numero, azar.choice(["Kia", "kia", "Ñandú"]),
+                                           azar.choice(["1999", "2001", "abc"])))
+            listas.append(sorted(registros, key=clave))
+        todo = sorted((registro for lista in listas for registro in lista), key=clave)
+        for inicio in range(0, len(todo) + 2, 3):
+            for descendente in (False, True):
+                assert pagina_intercalada(listas, clave, inicio, 7, descendente) == \
+                    pagina(todo, inicio, 7, descendente)
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+
+from Aplicacion_regex import registro_vehiculo
+from Aplicacion_regex.registro_vehiculo import RegistroVehiculoApp
+from Aplicacion_regex.tareas import Tarea
+
+
+def queda_reporte(tmp_path, monkeypatch, tarea, importar):
+    """Corre _importar con la función de importación dada y retorna si quedó el reporte"""
+    reporte = tmp_path / "importacion.jsonl"
+    reporte.write_text("", encoding="utf-8")
+    monkeypatch.setattr(registro_vehiculo, "importar", importar)
+    app = SimpleNamespace(visualizador=SimpleNamespace(repositorio=None))
+    try:
+        RegistroVehiculoApp._importar(app, tarea, "entrada.csv", str(reporte))
+    except ValueError:
+        pass
+    return reporte.exists()
+
+
+def test_el_reporte_se_conserva_al_terminar(tmp_path, monkeypatch):
+    tarea = Tarea(None, "Importar registros")
+    assert queda_reporte(tmp_path, monkeypatch, tarea, lambda *args, **opciones: {})
+
+
+@pytest.mark.parametrize("final", ["falla", "cancelada"])
+def test_el_reporte_se_borra_si_nadie_lo_recibe(tmp_path, monkeypatch, final):
+    tarea = Tarea(None, "Importar registros")
+
+    def importar(*args, **opciones):
+        if final == "falla":
+            raise ValueError("archivo dañado")
+        # Cancelada después del último avance: la importación termina igual
+        tarea.cancelar()
+        return {}
+    assert not queda_reporte(tmp_path, monkeypatch, tarea, importar)
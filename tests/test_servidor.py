@@ -0,0 +1,220 @@
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+from Aplicacion_regex.almacen import AlmacenRegistros
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.servidor import ServidorValidacion
+
+
+async def _solicitar(servidor, crudo):
+    """Envía una solicitud HTTP cruda y retorna todo lo que responde el servidor"""
+    sock = servidor.sockets[0].getsockname()
+    lector, escritor = await asyncio.open_connection(sock[0], sock[1])
+    escritor.write(crudo)
+    await escritor.drain()
+    respuesta = await asyncio.wait_for(lector.read(), 5)
+    escritor.close()
+    return respuesta
+
+
+def solicitar(tmp_path, crudo, tamano_lote=2):
+    """Levanta el servicio sobre un almacén temporal y le envía una solicitud"""
+    async def correr():
+        servicio = ServidorValidacion(AlmacenRegistros(str(tmp_path / "r.jsonl")), procesos=1,
+                                      tamano_lote=tamano_lote)
+        servidor = await servicio.iniciar(puerto=0)
+        try:
+            return await _solicitar(servidor, crudo)
+        finally:
+            servidor.close()
+            await servidor.wait_closed()
+            servicio.cerrar()
+    return asyncio.run(correr())
+
+
+def _desfragmentar(cuerpo):
+    """Reconstruye un cuerpo chunked y verifica que esté bien terminado"""
+    datos = b""
+    while True:
+        linea, _, cuerpo = cuerpo.partition(b"\r\n")
+        tamaño = int(linea, 16)
+        if tamaño == 0:
+            assert cuerpo == b"\r\n"
+            return datos
+        datos += cuerpo[:tamaño]
+        assert cuerpo[tamaño:tamaño + 2] == b"\r\n"
+        cuerpo = cuerpo[tamaño + 2:]
+
+
+def _lote_chunked(*bloques):
+    """Solicitud a /validar/lote con el cuerpo en los bloques dados, sin el bloque final"""
+    cuerpo = b"".join(b"%x\r\n%s\r\n" % (len(bloque), bloque) for bloque in bloques)
+    return (b"POST /validar/lote HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n" + cuerpo)
+
+
+def test_lote_chunked_responde_una_linea_por_registro(tmp_path):
+    respuesta = solicitar(tmp_path, _lote_chunked(b'{"placa": "ABC-1234"}\n', b'[]\n{}\n') + b"0\r\n\r\n")
+    encabezados, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    assert encabezados.startswith(b"HTTP/1.1 200")
+    lineas = [json.loads(linea) for linea in _desfragmentar(cuerpo).splitlines()]
+    assert [linea["fila"] for linea in lineas] == [1, 2, 3]
+    assert not any(linea["valido"] for linea in lineas)
+
+
+def test_tamano_de_bloque_invalido_termina_la_respuesta_en_curso(tmp_path):
+    respuesta = solicitar(tmp_path, _lote_chunked(b"{}\n{}\n{}\n") + b"zz\r\n\r\n")
+    assert respuesta.count(b"HTTP/1.1") == 1
+    encabezados, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    assert encabezados.startswith(b"HTTP/1.1 200")
+    lineas = [json.loads(linea) for linea in _desfragmentar(cuerpo).splitlines()]
+    assert lineas[-1] == {"error": "Tamaño de bloque inválido"}
+
+
+def test_tamano_de_bloque_invalido_en_otra_ruta_es_400(tmp_path):
+    crudo = (b"POST /validar HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n"
+             b"zz\r\n\r\n")
+    respuesta = solicitar(tmp_path, crudo)
+    assert respuesta.startswith(b"HTTP/1.1 400")
+    assert respuesta.count(b"HTTP/1.1") == 1
+
+
+@pytest.fixture
+def conexion(tmp_path):
+    """Conexión HTTP (keep-alive) con el servicio corriendo en otro hilo"""
+    bucle = asyncio.new_event_loop()
+    servicio = ServidorValidacion(AlmacenRegistros(str(tmp_path / "r.jsonl"), instantanea_automatica=False),
+                                  procesos=1)
+    servidor = bucle.run_until_complete(servicio.iniciar(puerto=0))
+    hilo = threading.Thread(target=bucle.run_forever, daemon=True)
+    hilo.start()
+    conexion = http.client.HTTPConnection(*servidor.sockets[0].getsockname()[:2], timeout=5)
+    yield conexion
+    conexion.close()
+    bucle.call_soon_threadsafe(bucle.stop)
+    hilo.join()
+    servidor.close()
+    bucle.run_until_complete(servidor.wait_closed())
+    servicio.cerrar()
+    bucle.close()
+
+
+def pedir(conexion, metodo, ruta, cuerpo=None):
+    """Envía una solicitud y retorna (estado, JSON o bytes de la respuesta)"""
+    datos = cuerpo if cuerpo is None or isinstance(cuerpo, bytes) else json.dumps(cuerpo).encode("utf-8")
+    conexion.request(metodo, ruta, body=datos)
+    respuesta = conexion.getresponse()
+    texto = respuesta.read()
+    if texto and respuesta.getheader("Content-Type", "").startswith("application/json"):
+        return respuesta.status, json.loads(texto)
+    return respuesta.status, texto
+
+
+def test_salud_estadisticas_y_metricas(conexion):
+    assert pedir(conexion, "GET", "/salud") == (200, {"estado": "ok", "registros": 0})
+    estado, cuerpo = pedir(conexion, "GET", "/estadisticas")
+    assert estado == 200 and cuerpo["total"] == 0
+    estado, cuerpo = pedir(conexion, "GET", "/metricas")
+    assert estado == 200 and isinstance(cuerpo, bytes)
+
+
+def test_validar(conexion):
+    registro = GeneradorRegistros(2).registro(0)
+    assert pedir(conexion, "POST", "/validar", registro) == (200, {"valido": True, "errores": {}})
+    estado, cuerpo = pedir(conexion, "POST", "/validar", dict(registro, telefono="123"))
+    assert estado == 200 and not cuerpo["valido"] and list(cuerpo["errores"]) == ["telefono"]
+    assert pedir(conexion, "POST", "/validar", [1, 2])[0] == 400
+    assert pedir(conexion, "POST", "/validar", b"{no es json")[0] == 400
+
+
+def test_validar_lote(conexion):
+    generador = GeneradorRegistros(2)
+    lineas = [json.dumps(generador.registro(numero)) for numero in range(5)]
+    lineas[3] = json.dumps(dict(generador.registro(3), placa="malo"))
+    estado, cuerpo = pedir(conexion, "POST", "/validar/lote", "\n".join(lineas).encode("utf-8"))
+    assert estado == 200
+    resultados = [json.loads(linea) for linea in cuerpo.splitlines()]
+    assert [resultado["valido"] for resultado in resultados] == [True, True, True, False, True]
+    assert [resultado["fila"] for resultado in resultados] == [1, 2, 3, 4, 5]
+
+
+def test_registrar_consultar_y_eliminar(conexion):
+    generador = GeneradorRegistros(2)
+    registro = generador.registro(0)
+    estado, cuerpo = pedir(conexion, "POST", "/registros", registro)
+    assert estado == 201
+    id_registro = cuerpo["id"]
+
+    estado, cuerpo = pedir(conexion, "POST", "/registros", dict(generador.registro(1), placa=registro["placa"]))
+    assert estado == 409 and list(cuerpo["errores"]) == ["placa"]
+    assert pedir(conexion, "POST", "/registros", dict(registro, correo="x"))[0] == 422
+
+    assert pedir(conexion, "GET", f"/registros/{id_registro}") == (200, dict(registro, id=id_registro))
+    assert pedir(conexion, "GET", f"/registros?placa={registro['placa'].lower()}")[1]["id"] == id_registro
+    assert pedir(conexion, "GET", f"/registros?chasis={registro['chasis']}")[1]["id"] == id_registro
+    estado, cuerpo = pedir(conexion, "GET", f"/registros?cedula={registro['cedula']}")
+    assert estado == 200 and cuerpo["total"] == 1
+    estado, cuerpo = pedir(conexion, "GET", f"/registros?q={registro['placa'][:3]}&limite=0")
+    assert estado == 200 and cuerpo == {"total": 1, "registros": []}
+    assert pedir(conexion, "GET", "/registros?q=a&limite=diez")[0] == 400
+    assert pedir(conexion, "GET", "/registros?q=a&limite=-1")[0] == 400
+    assert pedir(conexion, "GET", "/registros")[0] == 400
+    assert pedir(conexion, "GET", "/registros?placa=ZZZ999")[0] == 404
+
+    assert pedir(conexion, "DELETE", f"/registros/{id_registro}") == (204, b"")
+    assert pedir(conexion, "DELETE", f"/registros/{id_registro}")[0] == 404
+    assert pedir(conexion, "GET", f"/registros/{id_registro}")[0] == 404
+    assert pedir(conexion, "GET", "/salud")[1]["registros"] == 0
+
+
+def test_rutas_y_metodos_desconocidos(conexion):
+    assert pedir(conexion, "GET", "/nada")[0] == 404
+    assert pedir(conexion, "DELETE", "/salud")[0] == 405
+    assert pedir(conexion, "GET", "/validar/lote")[0] == 405
+
+
+def test_falta_content_length(tmp_path):
+    respuesta = solicitar(tmp_path, b"POST /validar HTTP/1.1\r\nHost: x\r\n\r\n")
+    assert respuesta.startswith(b"HTTP/1.1 411")
+
+
+@pytest.mark.parametrize("largo", [b"abc", b"-5", b"+5", b"1e3"])
+def test_content_length_invalido_es_400(tmp_path, largo):
+    respuesta = solicitar(tmp_path, b"POST /validar HTTP/1.1\r\nHost: x\r\nContent-Length: " + largo + b"\r\n\r\n{}")
+    assert respuesta.startswith(b"HTTP/1.1 400")
+    assert b"Content-Length" in respuesta
+
+
+def test_linea_partida_entre_bloques(tmp_path):
+    respuesta = solicitar(tmp_path, _lote_chunked(b'{"pla', b'ca": "ABC123"', b"}\n{}", b"\n{}") + b"0\r\n\r\n")
+    _, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    lineas = [json.loads(linea) for linea in _desfragmentar(cuerpo).splitlines()]
+    assert [linea["fila"] for linea in lineas] == [1, 2, 3]
+    assert "placa" not in lineas[0]["errores"]
+
+
+def test_linea_demasiado_larga_en_el_lote(tmp_path, monkeypatch):
+    monkeypatch.setattr("Aplicacion_regex.servidor.MAXIMO_LINEA", 100)
+    respuesta = solicitar(tmp_path, _lote_chunked(b"{}\n", b"x" * 60, b"x" * 60 + b"\n") + b"0\r\n\r\n")
+    _, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    lineas = [json.loads(linea) for linea in _desfragmentar(cuerpo).splitlines()]
+    assert lineas[-1] == {"error": "Una línea supera 100 bytes"}
+
+
+def test_encabezado_demasiado_largo_es_413(tmp_path):
+    respuesta = solicitar(tmp_path, b"GET /salud HTTP/1.1\r\nX-Relleno: " + b"x" * 100_000 + b"\r\n\r\n")
+    assert respuesta.startswith(b"HTTP/1.1 413")
+
+
+def test_lote_http_1_0_sin_chunked(tmp_path):
+    cuerpo = b"{}\n{}\n{}\n"
+    crudo = (b"POST /validar/lote HTTP/1.0\r\nConnection: keep-alive\r\n"
+             b"Content-Length: %d\r\n\r\n" % len(cuerpo) + cuerpo)
+    encabezados, _, cuerpo = solicitar(tmp_path, crudo).partition(b"\r\n\r\n")
+    assert b"chunked" not in encabezados.lower()
+    assert b"Connection: close" in encabezados
+    assert [json.loads(linea)["fila"] for linea in cuerpo.splitlines()] == [1, 2, 3]
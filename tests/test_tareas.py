@@ -0,0 +1,76 @@
+import threading
+
+from Aplicacion_regex.tareas import EjecutorTareas
+
+
+class RaizFalsa:
+    """Reemplaza a la raíz de Tk: guarda lo agendado con after()"""
+
+    def __init__(self):
+        self.agendadas = []
+
+    def after(self, ms, funcion):
+        self.agendadas.append(funcion)
+
+    def atender(self):
+        while self.agendadas:
+            self.agendadas.pop(0)()
+
+
+def terminar(raiz, ejecutor):
+    ejecutor.cerrar()
+    raiz.atender()
+
+
+def test_entrega_el_resultado():
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz)
+    resultados = []
+    ejecutor.ejecutar(lambda tarea, x: x * 2, 21, al_terminar=resultados.append)
+    terminar(raiz, ejecutor)
+    assert resultados == [42]
+
+
+def test_entrega_el_error():
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz)
+    errores = []
+
+    def fallar(tarea):
+        raise ValueError("falla")
+
+    ejecutor.ejecutar(fallar, al_fallar=errores.append)
+    terminar(raiz, ejecutor)
+    assert [str(e) for e in errores] == ["falla"]
+
+
+def test_cancelada_durante_la_ejecucion_no_entrega_nada():
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz)
+    empezo, seguir = threading.Event(), threading.Event()
+    llamadas = []
+
+    def ordenar(tarea):
+        # Nunca reporta avance, como ordenar o guardar
+        empezo.set()
+        seguir.wait(5)
+        return "ordenado"
+
+    tarea = ejecutor.ejecutar(ordenar, al_terminar=llamadas.append, al_fallar=llamadas.append)
+    assert empezo.wait(5)
+    tarea.cancelar()
+    seguir.set()
+    terminar(raiz, ejecutor)
+    assert llamadas == []
+
+
+def test_cancelada_antes_de_entregar_no_entrega_nada():
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz)
+    llamadas = []
+    tarea = ejecutor.ejecutar(lambda tarea: "listo", al_terminar=llamadas.append)
+    ejecutor.cerrar()
+    # La función ya terminó; el resultado espera en la cola del hilo de Tk
+    tarea.cancelar()
+    raiz.atender()
+    assert llamadas == []
@@ -0,0 +1,70 @@
+import pytest
+
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.validacion import CAMPOS, MENSAJE_OBLIGATORIO, REGLAS, Validacion
+
+VALIDO = {
+    "placa": "ABC123", "marca": "Mazda", "modelo": "2015", "color": "Rojo",
+    "chasis": "9BWZZZ377VT004251", "motor": "M4X2025", "cedula": "1032456789",
+    "nombre": "Ana María Pérez", "correo": "ana.perez@correo.com", "telefono": "3001234567",
+}
+
+INVALIDOS = {
+    "placa": ["AB1234", "ABC1234", "ABCD12"],
+    "marca": ["Mazda3", "Kia!"],
+    "modelo": ["1899", "2027", "dos mil", "20.5"],
+    "color": ["Rojo oscuro", "Azul2"],
+    "chasis": ["9BWZZZ377VT00425", "9BWZZZ377VT0042511", "9BWZZZ377VT00425-"],
+    "motor": ["M4X-2025"],
+    "cedula": ["123456", "12345678901", "10324567a"],
+    "nombre": ["Ana_Pérez"],
+    "correo": ["ana.perez", "ana@correo", "@correo.com"],
+    "telefono": ["300123456", "30012345678", "300-1234567"],
+}
+
+
+def test_registro_valido():
+    assert Validacion.validar_registro(VALIDO) == {}
+
+
+@pytest.mark.parametrize("campo,valor", [
+    (campo, valor) for campo, valores in INVALIDOS.items() for valor in valores
+])
+def test_valor_invalido_da_el_mensaje_de_la_regla(campo, valor):
+    assert Validacion.validar_registro(dict(VALIDO, **{campo: valor})) == {campo: REGLAS[campo][1]}
+    assert Validacion.validar_campo(campo, valor) == REGLAS[campo][1]
+
+
+@pytest.mark.parametrize("campo,valor", [
+    ("placa", "ABC12D"), ("placa", "abc123"), ("modelo", "1900"), ("modelo", "2026"), ("modelo", 2015),
+    ("cedula", "1234567"), ("marca", "Mercedes Benz"), ("color", "Añil"),
+])
+def test_valores_limite_aceptados(campo, valor):
+    assert Validacion.validar_registro(dict(VALIDO, **{campo: valor})) == {}
+
+
+@pytest.mark.parametrize("valor", ["", "   ", None])
+def test_campo_vacio_es_obligatorio(valor):
+    errores = Validacion.validar_registro(dict(VALIDO, placa=valor))
+    assert errores == {"placa": MENSAJE_OBLIGATORIO}
+    assert Validacion.validar_campo("placa", valor) == MENSAJE_OBLIGATORIO
+
+
+def test_registro_sin_campos():
+    assert Validacion.validar_registro({}) == {campo: MENSAJE_OBLIGATORIO for campo in CAMPOS}
+
+
+def test_espacios_alrededor_se_ignoran():
+    assert Validacion.validar_registro({campo: f"  {valor} " for campo, valor in VALIDO.items()}) == {}
+
+
+def test_validar_fila_coincide_con_validar_registro():
+    generador = GeneradorRegistros(3, proporcion_invalidos=0.3)
+    filas = [tuple(registro[campo] for campo in CAMPOS) for registro in generador.registros(500)]
+    filas += [
+        tuple(f" {VALIDO[campo]}" for campo in CAMPOS),
+        tuple(2015 if campo == "modelo" else VALIDO[campo] for campo in CAMPOS),
+        tuple("" for campo in CAMPOS),
+    ]
+    for valores in filas:
+        assert Validacion.validar_fila(valores) == Validacion.validar_registro(dict(zip(CAMPOS, valores)))
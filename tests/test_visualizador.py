@@ -0,0 +1,29 @@
+import json
+import threading
+
+from Aplicacion_regex import visualizador_registros
+from Aplicacion_regex.datos_sinteticos import GeneradorRegistros
+from Aplicacion_regex.tareas import EjecutorTareas
+from Aplicacion_regex.visualizador_registros import VisualizadorRegistros
+from tests.test_tareas import RaizFalsa, terminar
+
+
+def test_la_migracion_corre_en_el_hilo_trabajador(tmp_path, monkeypatch):
+    monkeypatch.setattr(visualizador_registros, "ARCHIVO_REGISTROS", str(tmp_path / "registros.jsonl"))
+    legado = tmp_path / "registros.json"
+    legado.write_text(json.dumps(list(GeneradorRegistros(2).registros(15))), encoding="utf-8")
+    raiz = RaizFalsa()
+    ejecutor = EjecutorTareas(raiz)
+    visualizador = VisualizadorRegistros(None, ejecutor)
+    visualizador.archivo_legado = str(legado)
+    hilos = []
+    migrar = visualizador.repositorio.migrar_desde_json
+    monkeypatch.setattr(visualizador.repositorio, "migrar_desde_json",
+                        lambda archivo: hilos.append(threading.current_thread()) or migrar(archivo))
+
+    visualizador.cargar()
+    visualizador.cargar()
+    terminar(raiz, ejecutor)
+    assert len(hilos) == 1 and hilos[0] is not threading.main_thread()
+    assert visualizador.repositorio.contar() == 15
+    visualizador.repositorio.cerrar()